@@ -0,0 +1,97 @@
+"""
+Benchmarks MTDataLoader end to end against the synthetic terminal in `mt_fake`. Covers `get_price_data` for each
+request type, `rates_to_frame`, `get_symbols` and `categories`, and reports throughput and peak traced memory. Results
+can be written as JSON to track regressions between commits.
+
+Usage: python -m benchmarks.bench_loader [--bars N] [--symbols N] [--latency S] [--repeat N] [--json PATH]
+"""
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+from datetime import datetime as dt, timedelta
+from typing import Callable, Dict, Any, List
+
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import FakeTerminal
+from mt5_dataloader.mt_utils import MTResolutions, MTRequests, SymbolCategories
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """
+    Returns best wall time in seconds and peak traced memory in MB.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': best, 'peak_mb': peak / 1024 ** 2}
+
+
+def run(num_bars: int, num_symbols: int, latency: float, repeat: int) -> List[Dict[str, Any]]:
+    backend = FakeTerminal(num_symbols=num_symbols, latency=latency)
+    loader = MTDataLoader(path='fake', backend=backend)
+    symbol = 'EURUSD'
+    resolution = MTResolutions.RESOLUTION_M1
+
+    # Window covering the last `num_bars` bars, for DATE and RANGE requests
+    rates = backend.copy_rates_from_pos(symbol, resolution.value, 0, num_bars)
+    start_date = dt(1970, 1, 1) + timedelta(seconds=int(rates['time'][0]))
+    end_date = dt(1970, 1, 1) + timedelta(seconds=int(rates['time'][-1]))
+
+    def uncached(func: Callable[[], Any]) -> Callable[[], Any]:
+        # Symbol lookups are served from the catalog, so each run starts from a fresh snapshot
+        return lambda: (loader.symbol_catalog.invalidate(), func())
+
+    cases = {
+        'get_price_data[POSITION]': (lambda: loader.get_price_data(
+            symbol, resolution, MTRequests.POSITION, num_bars=num_bars), num_bars),
+        'get_price_data[DATE]': (lambda: loader.get_price_data(
+            symbol, resolution, MTRequests.DATE, end_date=end_date, num_bars=num_bars), num_bars),
+        'get_price_data[RANGE]': (lambda: loader.get_price_data(
+            symbol, resolution, MTRequests.RANGE, start_date=start_date, end_date=end_date), num_bars),
+        'rates_to_frame': (lambda: MTDataLoader.rates_to_frame(rates), num_bars),
+        'get_symbols': (uncached(lambda: loader.get_symbols(SymbolCategories.FX_MAJORS.value)), num_symbols),
+        'categories': (uncached(loader.categories), num_symbols),
+    }
+
+    results = list()
+    for name, (func, items) in cases.items():
+        result = measure(func, repeat)
+        result.update(name=name, items=items, items_per_second=items / result['seconds'])
+        results.append(result)
+    return results
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--bars', type=int, default=1_000_000, help="Bars per price request.")
+    parser.add_argument('--symbols', type=int, default=10_000, help="Symbols returned by the fake terminal.")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds of simulated latency per terminal call.")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per case. The best run is reported.")
+    parser.add_argument('--json', default=None, help="Writes results to this path as JSON.")
+    args = parser.parse_args(argv)
+
+    results = run(args.bars, args.symbols, args.latency, args.repeat)
+
+    print(f"{'case':>26} {'items':>10} {'time (ms)':>10} {'items/s':>14} {'peak (MB)':>10}")
+    for result in results:
+        print(f"{result['name']:>26} {result['items']:>10} {result['seconds'] * 1000:>10.1f} "
+              f"{result['items_per_second']:>14,.0f} {result['peak_mb']:>10.1f}")
+
+    if args.json is not None:
+        with open(args.json, 'w') as f:
+            json.dump({'python': platform.python_version(), 'bars': args.bars, 'symbols': args.symbols,
+                       'latency': args.latency, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,75 @@
+"""
+Benchmarks `MTDataLoader.rates_to_frame` against the previous DataFrame-based conversion path. Reports wall time and
+peak traced memory for large synthetic rate arrays.
+
+Usage: python -m benchmarks.bench_rates_to_frame [num_bars ...]
+"""
+import sys
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import RATES_DTYPE
+
+
+def make_rates(num_bars: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    rates = np.zeros(num_bars, dtype=RATES_DTYPE)
+    rates['time'] = 1_600_000_000 + 60 * np.arange(num_bars)
+    close = 1.1 + np.cumsum(rng.normal(0, 1e-4, num_bars))
+    rates['open'] = np.roll(close, 1)
+    rates['high'] = np.maximum(rates['open'], close) + 5e-5
+    rates['low'] = np.minimum(rates['open'], close) - 5e-5
+    rates['close'] = close
+    rates['tick_volume'] = rng.integers(1, 500, num_bars)
+    rates['spread'] = rng.integers(0, 20, num_bars)
+    return rates
+
+
+def legacy_rates_to_frame(rates: np.ndarray) -> pd.DataFrame:
+    data = pd.DataFrame(data=rates)
+    data['time'] = pd.to_datetime(data['time'], unit='s')
+    data = data.loc[:, ['time', 'open', 'high', 'low', 'close', 'spread']]
+    data = data.set_index('time', drop=True)
+    data.index.name = 'date'
+    return data
+
+
+def measure(func: Callable[[], pd.DataFrame], repeat: int = 5) -> Tuple[float, float]:
+    """
+    Returns best wall time in seconds and peak traced memory in MB.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1024 ** 2
+
+
+def main(sizes) -> None:
+    cases = {
+        'legacy': legacy_rates_to_frame,
+        'float64': lambda r: MTDataLoader.rates_to_frame(r),
+        'float32': lambda r: MTDataLoader.rates_to_frame(r, price_dtype=np.float32),
+        'float64+volumes': lambda r: MTDataLoader.rates_to_frame(r, volumes=True),
+    }
+    print(f"{'bars':>10} {'path':>16} {'time (ms)':>10} {'peak (MB)':>10}")
+    for num_bars in sizes:
+        rates = make_rates(num_bars)
+        for name, func in cases.items():
+            elapsed, peak = measure(lambda: func(rates))
+            print(f"{num_bars:>10} {name:>16} {elapsed * 1000:>10.1f} {peak:>10.1f}")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1_000_000, 5_000_000])
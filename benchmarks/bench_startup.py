@@ -0,0 +1,69 @@
+"""
+Benchmarks process startup: time to import the package modules and latency of the first requests, each measured in a
+fresh interpreter so that module caches do not hide regressions. Requests run against the synthetic terminal in
+`mt_fake`.
+
+Usage: python -m benchmarks.bench_startup [--repeat N] [--json PATH]
+"""
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, List
+
+# Each snippet prints the seconds measured inside a fresh interpreter
+SNIPPETS = {
+    'import mt5_dataloader.mt_dataloader': """
+import time
+start = time.perf_counter()
+import mt5_dataloader.mt_dataloader
+print(time.perf_counter() - start)
+""",
+    'first get_symbols': """
+import time
+start = time.perf_counter()
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import FakeTerminal
+MTDataLoader(path='fake', backend=FakeTerminal()).get_symbols('FX Majors')
+print(time.perf_counter() - start)
+""",
+    'first get_price_data': """
+import time
+start = time.perf_counter()
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import FakeTerminal
+from mt5_dataloader.mt_utils import MTResolutions, MTRequests
+MTDataLoader(path='fake', backend=FakeTerminal()).get_price_data(
+    'EURUSD', MTResolutions.RESOLUTION_M1, MTRequests.POSITION, num_bars=1000)
+print(time.perf_counter() - start)
+""",
+}
+
+
+def run(repeat: int) -> Dict[str, Dict[str, float]]:
+    results = dict()
+    for name, snippet in SNIPPETS.items():
+        samples = [float(subprocess.run([sys.executable, '-c', snippet], check=True, capture_output=True,
+                                        text=True).stdout.split()[-1]) for _ in range(repeat)]
+        results[name] = {'best_ms': min(samples) * 1000, 'median_ms': sorted(samples)[len(samples) // 2] * 1000}
+    return results
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5, help="Fresh interpreters per case.")
+    parser.add_argument('--json', default=None, help="Writes results to this path as JSON.")
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat)
+    print(f"{'case':>36} {'best (ms)':>10} {'median (ms)':>12}")
+    for name, result in results.items():
+        print(f"{name:>36} {result['best_ms']:>10.1f} {result['median_ms']:>12.1f}")
+
+    if args.json is not None:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -3,5 +3,10 @@ This contains constants
 """
 
 COLUMNS=['date','open','high','low','close','spread']
+PRICE_COLUMNS=['open','high','low','close']
+VOLUME_COLUMNS=['tick_volume','real_volume']
 TICK_VALUE = "trade_tick_value"
-POINT = "point"
\ No newline at end of file
+POINT = "point"
+DIGITS = "digits"
+CONTRACT_SIZE = "trade_contract_size"
+COPY_TICKS_ALL = -1
\ No newline at end of file
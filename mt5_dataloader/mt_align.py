@@ -0,0 +1,267 @@
+"""
+This module aligns many symbols on a common time grid. Bar times of every symbol are merged into one sorted grid, and
+bars are scattered into a dense `(time, symbol, field)` tensor with a `(time, symbol)` validity mask, without building
+DataFrames. New bars extend the grid in place, refilling only the rows they touch.
+"""
+from typing import Optional, Union, Dict, List, Sequence
+
+import numpy as np
+
+from .mt_pricedata import PriceData
+from constants import constants as c
+
+# None leaves missing bars as NaN. `ffill` repeats the previous bar of the symbol. `prev_close` fills flat bars at the
+# previous close, with the previous spread and zero volumes.
+FILLS = (None, 'ffill', 'prev_close')
+
+# Grid rows aligned at once when building. Sized so that one symbol-major block stays in cache.
+BUILD_CHUNK = 4096
+
+
+def merge_times(times: Sequence[np.ndarray]) -> np.ndarray:
+    """
+    Sorted union of sorted int64 time arrays. The stable sort detects the sorted runs and merges them, i.e. a k-way
+    merge in O(n log k).
+    """
+    if len(times) == 0:
+        return np.array([], dtype=np.int64)
+    merged = np.sort(np.concatenate(times), kind='stable')
+    if len(merged) == 0:
+        return merged
+    return merged[np.flatnonzero(np.diff(merged, prepend=merged[0] - 1))]
+
+
+class AlignedBars:
+
+    def __init__(
+            self,
+            data: Union[Dict[str, PriceData], List[PriceData]],
+            fields: Sequence[str] = tuple(c.PRICE_COLUMNS),
+            fill: Optional[str] = None,
+            dtype: Union[str, np.dtype] = np.float64):
+        """
+        Parameters
+        ----------
+            data: Dict[str, PriceData] or List[PriceData]
+                Data to align, e.g. the output of `get_price_data_many`. Symbols keep the order given.
+
+            fields: List[str] = ['open', 'high', 'low', 'close']
+                Columns stacked along the last axis. `spread` and volume columns may be added.
+
+            fill: str = None
+                Fill policy for symbols without a bar at a grid time: None, `ffill` or `prev_close`. Times before the
+                first bar of a symbol stay NaN. The mask only marks actual bars.
+
+            dtype: np.dtype = np.float64
+                Dtype of the tensor. Use `np.float32` to halve memory.
+        """
+        if fill not in FILLS:
+            raise ValueError(f"Invalid fill policy: {fill}. Valid policies: {list(FILLS)}")
+        if fill == 'prev_close' and 'close' not in fields:
+            raise ValueError("`prev_close` fill requires the close field.")
+        data = self.by_symbol(data)
+        self.symbols = list(data.keys())
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.fields = list(fields)
+        self.fill = fill
+        self.dtype = np.dtype(dtype)
+        self.length = 0
+        self.grid = np.empty(0, dtype=np.int64)
+        self.tensor = np.empty((0, len(self.symbols), len(self.fields)), dtype=self.dtype)
+        self.valid = np.empty((0, len(self.symbols)), dtype=bool)
+        self.build(data)
+
+    @staticmethod
+    def by_symbol(data: Union[Dict[str, PriceData], List[PriceData]]) -> Dict[str, PriceData]:
+        if isinstance(data, dict):
+            return data
+        return {price_data.symbol: price_data for price_data in data}
+
+    @property
+    def times(self) -> np.ndarray:
+        """
+        Grid times in epoch seconds.
+        """
+        return self.grid[:self.length]
+
+    @property
+    def values(self) -> np.ndarray:
+        """
+        Tensor of shape (time, symbol, field).
+        """
+        return self.tensor[:self.length]
+
+    @property
+    def mask(self) -> np.ndarray:
+        """
+        Mask of shape (time, symbol), True where the symbol has a bar.
+        """
+        return self.valid[:self.length]
+
+    def __len__(self) -> int:
+        return self.length
+
+    def field(self, name: str) -> np.ndarray:
+        """
+        Values of one field, of shape (time, symbol).
+        """
+        return self.values[:, :, self.fields.index(name)]
+
+    @staticmethod
+    def capacity(length: int) -> int:
+        """
+        Buffer rows for `length` grid times, with headroom so that appending bars is amortized O(new bars).
+        """
+        return length + max(length // 8, 1024)
+
+    def reserve(self, length: int) -> None:
+        if length <= len(self.grid):
+            return
+        capacity = self.capacity(length)
+        grid = np.empty(capacity, dtype=np.int64)
+        tensor = np.full((capacity,) + self.tensor.shape[1:], np.nan, dtype=self.dtype)
+        valid = np.zeros((capacity,) + self.valid.shape[1:], dtype=bool)
+        grid[:self.length] = self.times
+        tensor[:self.length] = self.values
+        valid[:self.length] = self.mask
+        self.grid, self.tensor, self.valid = grid, tensor, valid
+
+    def build(self, data: Dict[str, PriceData]) -> None:
+        """
+        Aligns the initial data. The grid is processed in chunks of rows: every symbol is gathered into a small
+        symbol-major block, with the fill applied, and each block is transposed into the tensor, so writes to the
+        tensor stay contiguous.
+        """
+        grid = merge_times([price_data.times for price_data in data.values()])
+        length = len(grid)
+        capacity = self.capacity(length)
+        self.grid = np.empty(capacity, dtype=np.int64)
+        self.grid[:length] = grid
+        self.tensor = np.empty((capacity, len(self.symbols), len(self.fields)), dtype=self.dtype)
+        self.tensor[length:] = np.nan
+        self.valid = np.zeros((capacity, len(self.symbols)), dtype=bool)
+        self.length = length
+
+        series = [(price_data.times, self.field_block(price_data)) for price_data in data.values()]
+        prices = [index for index, field in enumerate(self.fields) if field in c.PRICE_COLUMNS]
+        volumes = [index for index, field in enumerate(self.fields) if field in c.VOLUME_COLUMNS]
+        close = self.fields.index('close') if self.fill == 'prev_close' else None
+        for start in range(0, length, BUILD_CHUNK):
+            chunk = grid[start:start + BUILD_CHUNK]
+            block = np.empty((len(self.symbols), len(self.fields), len(chunk)), dtype=self.dtype)
+            for column, (times, values) in enumerate(series):
+                if len(times) == 0:
+                    block[column] = np.nan
+                    continue
+                # Last bar at or before each grid time
+                source = np.searchsorted(times, chunk, side='right') - 1
+                exact = times[source] == chunk
+                exact &= source >= 0
+                np.take(values, source, axis=1, out=block[column])
+                missing = ~exact if self.fill is None else source < 0
+                block[column][:, missing] = np.nan
+                if close is not None:
+                    filled = ~exact & (source >= 0)
+                    block[column][np.ix_(prices, filled)] = block[column, close, filled]
+                    block[column][np.ix_(volumes, filled)] = 0
+                self.valid[start:start + len(chunk), column] = exact
+            self.tensor[start:start + len(chunk)] = block.transpose(2, 0, 1)
+
+    def field_block(self, price_data: PriceData) -> np.ndarray:
+        """
+        Fields of one symbol as a (field, bar) block. Uses the price block of compact data without copying when the
+        fields and dtype match.
+        """
+        if price_data.compact and self.fields == c.PRICE_COLUMNS and price_data.prices.dtype == self.dtype:
+            return price_data.prices
+        return np.stack([price_data.column(field).astype(self.dtype, copy=False) for field in self.fields])
+
+    def extend(self, data: Union[Dict[str, PriceData], List[PriceData]]) -> int:
+        """
+        Adds bars to the grid, overwriting bars at existing times, e.g. the still-forming bar. Bars newer than the
+        last grid time are appended in place. Older bars at times missing from the grid are inserted, which copies the
+        buffers. Returns the number of grid times added.
+        """
+        data = self.by_symbol(data)
+        unknown = [symbol for symbol in data if symbol not in self.symbol_index]
+        if unknown:
+            raise ValueError(f"Symbols not in the aligned set: {unknown}")
+        data = {symbol: price_data for symbol, price_data in data.items() if len(price_data) > 0}
+        if not data:
+            return 0
+
+        times = merge_times([price_data.times for price_data in data.values()])
+        old_length = self.length
+        if old_length == 0 or times[0] > self.grid[old_length - 1]:
+            new_times = times
+        else:
+            tail = self.times[np.searchsorted(self.times, times[0]):]
+            new_times = times[~np.isin(times, tail, assume_unique=True)]
+
+        first_row = old_length
+        if len(new_times) > 0 and old_length > 0 and new_times[0] < self.grid[old_length - 1]:
+            positions = np.searchsorted(self.times, new_times)
+            first_row = int(positions[0])
+            self.insert(positions, new_times)
+        elif len(new_times) > 0:
+            self.reserve(old_length + len(new_times))
+            self.grid[old_length:old_length + len(new_times)] = new_times
+            self.length += len(new_times)
+
+        grid = self.times
+        for symbol, price_data in data.items():
+            column = self.symbol_index[symbol]
+            rows = np.searchsorted(grid, price_data.times)
+            first_row = min(first_row, int(rows[0]))
+            for index, field in enumerate(self.fields):
+                self.tensor[rows, column, index] = price_data.column(field)
+            self.valid[rows, column] = True
+
+        if self.fill is not None:
+            self.refill(first_row)
+        return len(new_times)
+
+    def insert(self, positions: np.ndarray, new_times: np.ndarray) -> None:
+        """
+        Inserts grid times before `positions`, copying the buffers.
+        """
+        length = self.length + len(new_times)
+        self.grid = np.insert(self.times, positions, new_times)
+        self.tensor = np.insert(self.values, positions, np.nan, axis=0)
+        self.valid = np.insert(self.mask, positions, False, axis=0)
+        self.length = length
+        self.reserve(length)
+
+    def refill(self, first_row: int) -> None:
+        """
+        Fills rows from `first_row` on. Rows before it are already filled, so the row before `first_row` seeds the
+        fill. Real bars are never overwritten, so filled entries are recomputed from the mask alone.
+        """
+        start = max(first_row - 1, 0)
+        block = self.tensor[start:self.length]
+        close = self.fields.index('close') if self.fill == 'prev_close' else None
+        for column in range(len(self.symbols)):
+            valid = self.valid[start:self.length, column]
+            if first_row > 0:
+                # The seed row counts as a bar wherever it holds a bar or a filled value
+                valid = valid.copy()
+                valid[0] = not np.isnan(block[0, column, 0])
+            missing = np.flatnonzero(~valid)
+            if len(missing) == 0:
+                continue
+            real = np.flatnonzero(valid)
+            previous = np.searchsorted(real, missing) - 1
+            missing, source = missing[previous >= 0], real[previous[previous >= 0]]
+            if len(missing) == 0:
+                continue
+
+            if self.fill == 'ffill':
+                block[missing, column] = block[source, column]
+                continue
+            for index, field in enumerate(self.fields):
+                if field in c.PRICE_COLUMNS:
+                    block[missing, column, index] = block[source, column, close]
+                elif field in c.VOLUME_COLUMNS:
+                    block[missing, column, index] = 0
+                else:
+                    block[missing, column, index] = block[source, column, index]
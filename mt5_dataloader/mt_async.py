@@ -0,0 +1,248 @@
+"""
+This module contains an asyncio front-end for MTDataLoader. The MT5 API is not thread-safe, so every terminal call
+runs on one dedicated thread fed by a priority queue, while frame conversion runs on a thread pool. The event loop is
+never blocked. Identical concurrent requests share a single terminal call, run at the highest priority among their
+callers.
+"""
+import queue
+import asyncio
+import datetime
+import itertools
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Union, Any, Callable, Dict, Tuple, AsyncIterator
+
+from .mt_dataloader import MTDataLoader
+from .mt_pricedata import PriceData
+from .mt_requestcache import RequestCache, RequestKey
+from .mt_utils import MTRequests, MTResolutions, MTPriority
+
+
+class TerminalJob:
+    """
+    Call queued for the terminal thread. A job may be queued more than once, at a higher priority each time, and runs
+    from whichever entry is taken first.
+    """
+    __slots__ = ('func', 'args', 'future', 'loop', 'claimed')
+
+    def __init__(self, func: Callable, args: Tuple, future: asyncio.Future, loop: asyncio.AbstractEventLoop):
+        self.func = func
+        self.args = args
+        self.future = future
+        self.loop = loop
+        # Only set by the terminal thread
+        self.claimed = False
+
+
+class Flight:
+    """
+    Request in flight, shared by every caller that joined it. `priority` is the highest priority among them.
+    """
+    __slots__ = ('priority', 'promoted', 'job', 'future')
+
+    def __init__(self, priority: MTPriority):
+        self.priority = priority
+        self.promoted = asyncio.Event()
+        self.job: Optional[TerminalJob] = None
+        self.future: Optional[asyncio.Future] = None
+
+
+class AsyncMTDataLoader:
+
+    def __init__(
+            self,
+            loader: Optional[MTDataLoader] = None,
+            max_bulk_pending: int = 8,
+            conversion_workers: int = 2,
+            **kwargs):
+        """
+        Parameters
+        ----------
+            loader: MTDataLoader = None
+                Loader to wrap. If None, a new loader is created with the remaining keyword arguments.
+
+            max_bulk_pending: int = 8
+                Maximum number of `MTPriority.BULK` requests queued or running at once. Further bulk requests wait
+                before reaching the terminal queue, so live requests are never stuck behind a large backfill.
+
+            conversion_workers: int = 2
+                Number of threads used for frame conversion.
+        """
+        self.loader = loader if loader is not None else MTDataLoader(**kwargs)
+        self.max_bulk_pending = max_bulk_pending
+        self.jobs = queue.PriorityQueue()
+        self.sequence = itertools.count()
+        self.converter = ThreadPoolExecutor(max_workers=conversion_workers)
+        self.inflight: Dict[RequestKey, Flight] = dict()
+        self.bulk_slots = None
+        self.terminal = threading.Thread(target=self.__run_terminal, name='mt5-terminal', daemon=True)
+        self.terminal.start()
+
+    def __run_terminal(self) -> None:
+        """
+        Runs terminal jobs one at a time in priority order.
+        """
+        while True:
+            _, _, job = self.jobs.get()
+            if job is None:
+                break
+            if job.claimed:
+                # Already run from an entry queued at a higher priority
+                continue
+            job.claimed = True
+            try:
+                result = job.func(*job.args)
+            except BaseException as e:
+                job.loop.call_soon_threadsafe(self.__set_exception, job.future, e)
+            else:
+                job.loop.call_soon_threadsafe(self.__set_result, job.future, result)
+
+    @staticmethod
+    def __set_result(future: asyncio.Future, result: Any) -> None:
+        if not future.done():
+            future.set_result(result)
+
+    @staticmethod
+    def __set_exception(future: asyncio.Future, exception: BaseException) -> None:
+        if not future.done():
+            future.set_exception(exception)
+
+    def run_terminal(self, func: Callable, *args, priority: MTPriority = MTPriority.NORMAL) -> asyncio.Future:
+        """
+        Schedules a call on the terminal thread. Lower priority values run first, FIFO within a priority.
+        """
+        return self.__submit(func, args, priority).future
+
+    def __submit(self, func: Callable, args: Tuple, priority: MTPriority) -> TerminalJob:
+        loop = asyncio.get_running_loop()
+        job = TerminalJob(func, args, loop.create_future(), loop)
+        self.jobs.put((priority.value, next(self.sequence), job))
+        return job
+
+    def __promote(self, flight: Flight, priority: MTPriority) -> None:
+        """
+        Raises the priority of a request in flight. A queued job is queued again at the new priority.
+        """
+        flight.priority = priority
+        flight.promoted.set()
+        if flight.job is not None and not flight.job.claimed:
+            self.jobs.put((priority.value, next(self.sequence), flight.job))
+
+    @contextlib.asynccontextmanager
+    async def __slot(self, flight: Flight) -> AsyncIterator[None]:
+        """
+        Limits the number of bulk requests in flight. A bulk request promoted while waiting for a slot stops waiting.
+        """
+        if flight.priority != MTPriority.BULK:
+            yield
+            return
+        if self.bulk_slots is None:
+            self.bulk_slots = asyncio.Semaphore(self.max_bulk_pending)
+        acquire = asyncio.ensure_future(self.bulk_slots.acquire())
+        promoted = asyncio.ensure_future(flight.promoted.wait())
+        await asyncio.wait((acquire, promoted), return_when=asyncio.FIRST_COMPLETED)
+        promoted.cancel()
+        if not acquire.done():
+            acquire.cancel()
+        acquired = acquire.done() and not acquire.cancelled()
+        try:
+            yield
+        finally:
+            if acquired:
+                self.bulk_slots.release()
+
+    async def get_price_data(
+            self,
+            symbol: str,
+            resolution: Union[str, MTResolutions],
+            request_type: Union[str, MTRequests],
+            start_date: Optional[Union[datetime.datetime, datetime.date]] = None,
+            end_date: Optional[Union[datetime.datetime, datetime.date]] = None,
+            start_index: Optional[int] = 0,
+            num_bars: Optional[int] = 99000,
+            priority: MTPriority = MTPriority.NORMAL) -> Optional[PriceData]:
+        """
+        Fetches price data without blocking the event loop. See `MTDataLoader.get_price_data` for parameters.
+
+        Parameters
+        ----------
+            priority: MTPriority = MTPriority.NORMAL
+                `LIVE` requests run before queued `NORMAL` and `BULK` requests. `BULK` requests are also subject to
+                `max_bulk_pending`. A request joining an identical request already in flight shares its result. If
+                it has a higher priority, the shared request is moved up to it.
+        """
+        resolution, request_type, start_date, end_date = self.loader.normalize_request(
+            resolution, request_type, start_date, end_date)
+        key = RequestCache.key(symbol, resolution, request_type, start_date, end_date, start_index, num_bars)
+
+        if self.loader.request_cache is not None:
+            cached = self.loader.request_cache.get(key)
+            if cached is not None:
+                return cached
+
+        flight = self.inflight.get(key)
+        if flight is None:
+            flight = Flight(priority)
+            flight.future = asyncio.ensure_future(self.__load(
+                key, symbol, resolution, request_type, start_date, end_date, start_index, num_bars, flight))
+            self.inflight[key] = flight
+            flight.future.add_done_callback(lambda _: self.inflight.pop(key, None))
+        elif priority.value < flight.priority.value:
+            self.__promote(flight, priority)
+
+        return await asyncio.shield(flight.future)
+
+    async def __load(
+            self,
+            key: RequestKey,
+            symbol: str,
+            resolution: int,
+            request_type: MTRequests,
+            start_date: Optional[datetime.datetime],
+            end_date: Optional[datetime.datetime],
+            start_index: int,
+            num_bars: int,
+            flight: Flight) -> Optional[PriceData]:
+        async with self.__slot(flight):
+            flight.job = self.__submit(
+                self.loader.fetch_rates, (symbol, resolution, request_type, start_date, end_date, start_index,
+                                          num_bars), flight.priority)
+            rates = await flight.job.future
+
+        if rates is None:
+            print(f"No data available for: {symbol} {MTResolutions.timeframe(resolution=resolution)}")
+
+            return None
+
+        loop = asyncio.get_running_loop()
+        price_data = await loop.run_in_executor(self.converter, self.loader.to_price_data, symbol, resolution, rates)
+
+        if self.loader.request_cache is not None:
+            self.loader.request_cache.put(key, price_data)
+
+        return price_data
+
+    async def get_symbols(self, category: str, priority: MTPriority = MTPriority.NORMAL) -> List[str]:
+        return await self.run_terminal(self.loader.get_symbols, category, priority=priority)
+
+    async def categories(self, priority: MTPriority = MTPriority.NORMAL) -> List[str]:
+        return await self.run_terminal(self.loader.categories, priority=priority)
+
+    async def get_symbol_properties(self, symbol: str,
+                                    priority: MTPriority = MTPriority.NORMAL) -> Tuple[float, float]:
+        return await self.run_terminal(self.loader.get_symbol_properties, symbol, priority=priority)
+
+    def close(self) -> None:
+        """
+        Stops the terminal thread once queued jobs are done, and the conversion pool.
+        """
+        self.jobs.put((float('inf'), next(self.sequence), None))
+        self.terminal.join()
+        self.converter.shutdown()
+
+    async def __aenter__(self) -> 'AsyncMTDataLoader':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
@@ -0,0 +1,199 @@
+"""
+This module contains the backend interface used by MTDataLoader for every terminal call. The default backend
+delegates to the MetaTrader5 module, which is only imported when the backend is created. Other backends, such as the
+synthetic terminal in `mt_fake`, allow the loader to run without a terminal. `SharedConnection` defers terminal launch
+to the first call, and `shared_connection` returns the single terminal connection of the process.
+"""
+import os
+import importlib
+import threading
+from typing import Any, Optional, Tuple
+
+
+class MTBackend:
+    """
+    Terminal API used by MTDataLoader. Methods follow the signatures and return values of the MetaTrader5 module:
+    rates and ticks are numpy structured arrays, and None is returned on failure.
+    """
+
+    def initialize(self, path: str) -> bool:
+        raise NotImplementedError
+
+    def account_info(self) -> Any:
+        raise NotImplementedError
+
+    def last_error(self) -> Tuple[int, str]:
+        raise NotImplementedError
+
+    def copy_rates_from_pos(self, symbol: str, timeframe: int, start_pos: int, count: int) -> Any:
+        raise NotImplementedError
+
+    def copy_rates_from(self, symbol: str, timeframe: int, date_from: Any, count: int) -> Any:
+        raise NotImplementedError
+
+    def copy_rates_range(self, symbol: str, timeframe: int, date_from: Any, date_to: Any) -> Any:
+        raise NotImplementedError
+
+    def copy_ticks_from(self, symbol: str, date_from: Any, count: int, flags: int) -> Any:
+        raise NotImplementedError
+
+    def copy_ticks_range(self, symbol: str, date_from: Any, date_to: Any, flags: int) -> Any:
+        raise NotImplementedError
+
+    def symbols_get(self, group: Optional[str] = None) -> Any:
+        raise NotImplementedError
+
+    def symbol_info(self, symbol: str) -> Any:
+        raise NotImplementedError
+
+
+class MetaTrader5Backend(MTBackend):
+    """
+    Backend for a MetaTrader5 terminal. Functions are looked up on the module at call time.
+    """
+
+    def __init__(self):
+        try:
+            self.mt5 = importlib.import_module('MetaTrader5')
+        except ImportError as e:
+            raise ImportError(f"MetaTrader5 is required for the terminal backend. Install it with "
+                              f"`pip install MetaTrader5` (Windows only), or pass another backend. Exception: {e}")
+
+    def initialize(self, path: str) -> bool:
+        return self.mt5.initialize(path)
+
+    def account_info(self) -> Any:
+        return self.mt5.account_info()
+
+    def last_error(self) -> Tuple[int, str]:
+        return self.mt5.last_error()
+
+    def copy_rates_from_pos(self, symbol: str, timeframe: int, start_pos: int, count: int) -> Any:
+        return self.mt5.copy_rates_from_pos(symbol, timeframe, start_pos, count)
+
+    def copy_rates_from(self, symbol: str, timeframe: int, date_from: Any, count: int) -> Any:
+        return self.mt5.copy_rates_from(symbol, timeframe, date_from, count)
+
+    def copy_rates_range(self, symbol: str, timeframe: int, date_from: Any, date_to: Any) -> Any:
+        return self.mt5.copy_rates_range(symbol, timeframe, date_from, date_to)
+
+    def copy_ticks_from(self, symbol: str, date_from: Any, count: int, flags: int) -> Any:
+        return self.mt5.copy_ticks_from(symbol, date_from, count, flags)
+
+    def copy_ticks_range(self, symbol: str, date_from: Any, date_to: Any, flags: int) -> Any:
+        return self.mt5.copy_ticks_range(symbol, date_from, date_to, flags)
+
+    def symbols_get(self, group: Optional[str] = None) -> Any:
+        if group is None:
+            return self.mt5.symbols_get()
+        return self.mt5.symbols_get(group=group)
+
+    def symbol_info(self, symbol: str) -> Any:
+        return self.mt5.symbol_info(symbol)
+
+
+class SharedConnection(MTBackend):
+    """
+    Wraps a backend and launches the terminal on the first call instead of on creation. Loaders holding the same
+    connection launch the terminal once.
+    """
+
+    def __init__(self, backend: MTBackend, path: Optional[str] = None):
+        """
+        Parameters
+        ----------
+            backend: MTBackend
+                Backend serving the requests.
+
+            path: str = None
+                Path to the MT5 executable. The terminal is not launched if None.
+        """
+        self.backend = backend
+        self.path = path
+        self.connected = False
+        self.lock = threading.Lock()
+
+    def connect(self) -> None:
+        """
+        Launches the terminal unless it is already connected. Runs once per connection, and again on the next call if
+        the launch failed.
+        """
+        if self.connected:
+            return
+        with self.lock:
+            if self.connected:
+                return
+            if self.backend.account_info() is None and self.path is not None:
+                try:
+                    launched = self.backend.initialize(self.path)
+                except Exception as e:
+                    raise RuntimeError(f"Failed to launch MetaTrader5. Exception: {e}")
+                if not launched:
+                    raise RuntimeError(f"Failed to launch MetaTrader5. Error: {self.backend.last_error()}")
+            self.connected = True
+
+    def initialize(self, path: str) -> bool:
+        self.path = path
+        self.connect()
+        return True
+
+    def account_info(self) -> Any:
+        self.connect()
+        return self.backend.account_info()
+
+    def last_error(self) -> Tuple[int, str]:
+        return self.backend.last_error()
+
+    def copy_rates_from_pos(self, symbol: str, timeframe: int, start_pos: int, count: int) -> Any:
+        self.connect()
+        return self.backend.copy_rates_from_pos(symbol, timeframe, start_pos, count)
+
+    def copy_rates_from(self, symbol: str, timeframe: int, date_from: Any, count: int) -> Any:
+        self.connect()
+        return self.backend.copy_rates_from(symbol, timeframe, date_from, count)
+
+    def copy_rates_range(self, symbol: str, timeframe: int, date_from: Any, date_to: Any) -> Any:
+        self.connect()
+        return self.backend.copy_rates_range(symbol, timeframe, date_from, date_to)
+
+    def copy_ticks_from(self, symbol: str, date_from: Any, count: int, flags: int) -> Any:
+        self.connect()
+        return self.backend.copy_ticks_from(symbol, date_from, count, flags)
+
+    def copy_ticks_range(self, symbol: str, date_from: Any, date_to: Any, flags: int) -> Any:
+        self.connect()
+        return self.backend.copy_ticks_range(symbol, date_from, date_to, flags)
+
+    def symbols_get(self, group: Optional[str] = None) -> Any:
+        self.connect()
+        return self.backend.symbols_get(group)
+
+    def symbol_info(self, symbol: str) -> Any:
+        self.connect()
+        return self.backend.symbol_info(symbol)
+
+
+default_connection: Optional[SharedConnection] = None
+default_connection_lock = threading.Lock()
+
+
+def shared_connection(path: Optional[str] = None) -> SharedConnection:
+    """
+    Returns the process-wide connection to the MetaTrader5 terminal, creating it on first use. An empty path is unset.
+    Until the terminal is connected, a new path replaces the previous one. The MetaTrader5 module supports one terminal
+    per process, so requesting another path once connected raises RuntimeError.
+    """
+    global default_connection
+    path = path or None
+    with default_connection_lock:
+        if default_connection is None:
+            default_connection = SharedConnection(MetaTrader5Backend(), path)
+        elif path is None or path == default_connection.path:
+            pass
+        elif not default_connection.connected:
+            default_connection.path = path
+        elif default_connection.path is not None and \
+                os.path.normcase(os.path.normpath(path)) != os.path.normcase(os.path.normpath(default_connection.path)):
+            raise RuntimeError(f"MetaTrader5 supports one terminal per process. The connection already uses "
+                               f"{default_connection.path}, not {path}.")
+        return default_connection
@@ -0,0 +1,350 @@
+"""
+This module contains a resumable bulk backfill scheduler. A spec of symbols or categories, resolutions and a date range
+is expanded into a graph of range jobs, one chain of date windows per symbol and resolution. Job states are appended to
+a journal after every job and compacted into the checkpoint when a run ends, so an interrupted run resumes where it
+stopped. Terminal calls are rate limited, and failed jobs are retried with exponential backoff.
+"""
+import os
+import json
+import time
+import heapq
+import datetime
+from collections import namedtuple, defaultdict, deque
+from typing import Optional, List, Union, Dict, Callable, Any
+
+from .mt_dataloader import MTDataLoader
+from .mt_pricedata import PriceData
+from .mt_utils import MTRequests, MTResolutions
+
+BackfillJob = namedtuple('BackfillJob', ['id', 'symbol', 'resolution', 'start', 'end', 'next'])
+
+# Job states. Jobs are finished once `done`, `empty` (no data after all attempts) or `failed`.
+PENDING = 'pending'
+DONE = 'done'
+EMPTY = 'empty'
+FAILED = 'failed'
+FINISHED = (DONE, EMPTY, FAILED)
+
+# Spec entries defining the date windows, and so the jobs. Checkpoints with the same windows are resumed, whatever
+# their symbols and resolutions.
+WINDOW_KEYS = ('start_date', 'end_date', 'chunk')
+
+
+class BackfillScheduler:
+
+    def __init__(
+            self,
+            loader: MTDataLoader,
+            checkpoint_path: str,
+            consumer: Optional[Callable[[PriceData], Any]] = None,
+            export: bool = False,
+            max_calls_per_second: Optional[float] = None,
+            max_attempts: int = 5,
+            backoff: float = 1.0,
+            max_backoff: float = 300.0,
+            verbose: bool = True):
+        """
+        Parameters
+        ----------
+            loader: MTDataLoader
+                Loader used for terminal calls. Data is stored through its on-disk cache and exporter, if configured.
+
+            checkpoint_path: str
+                JSON file holding the plan and job states. Job states of an existing checkpoint with the same date
+                range and chunk are resumed, and jobs of new symbols or resolutions are added to it. States of
+                finished jobs are appended to `checkpoint_path.journal` until the run ends.
+
+            consumer: Callable[[PriceData], Any] = None
+                Called with the data of every finished job, e.g. to write to a research store.
+
+            export: bool = False
+                Exports the data of every job with the loader's exporter.
+
+            max_calls_per_second: float = None
+                Rate limit for terminal calls. No limit if None.
+
+            max_attempts: int = 5
+                Attempts per job raising an error before it is marked `failed`. Jobs for which the terminal returns
+                no data, e.g. windows before the start of a symbol's history, are marked `empty` without retries.
+
+            backoff: float = 1.0
+                Seconds before the first retry of a job. Doubles on every attempt.
+
+            max_backoff: float = 300.0
+                Longest wait between attempts of a job.
+
+            verbose: bool = True
+                Prints progress, throughput and ETA after every job.
+        """
+        if export and loader.exporter is None:
+            raise ValueError("No export directory specified. Set `export_dir` on the loader to export data.")
+        self.loader = loader
+        self.checkpoint_path = checkpoint_path
+        self.consumer = consumer
+        self.export = export
+        self.min_interval = 1.0 / max_calls_per_second if max_calls_per_second else 0.0
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.verbose = verbose
+
+        self.spec = None
+        self.jobs: Dict[str, BackfillJob] = dict()
+        self.states: Dict[str, Dict[str, Any]] = dict()
+        # States of checkpointed jobs outside the current plan, kept in the checkpoint
+        self.kept: Dict[str, Dict[str, Any]] = dict()
+        self.journal = None
+        self.ready = deque()
+        self.retries = list()
+        self.last_call = 0.0
+        self.started = None
+        self.jobs_run = 0
+        self.bars: Dict[int, int] = defaultdict(int)
+        self.seconds: Dict[int, float] = defaultdict(float)
+
+    def plan(
+            self,
+            start_date: datetime.datetime,
+            end_date: datetime.datetime,
+            symbols: Optional[List[str]] = None,
+            categories: Optional[List[str]] = None,
+            resolutions: Optional[List[Union[int, MTResolutions]]] = None,
+            chunk: datetime.timedelta = datetime.timedelta(days=30)) -> int:
+        """
+        Expands a spec into jobs and loads matching job states from the checkpoint. Returns the number of jobs left.
+
+        Parameters
+        ----------
+            start_date: datetime
+                Start of the backfilled range.
+
+            end_date: datetime
+                End of the backfilled range.
+
+            symbols: List[str] = None
+                Symbols to backfill.
+
+            categories: List[str] = None
+                Categories whose symbols are added to `symbols`, see `MTDataLoader.get_symbols`.
+
+            resolutions: List[MTResolutions] = None
+                Resolutions to backfill. Defaults to all resolutions.
+
+            chunk: timedelta = 30 days
+                Date window of a single job.
+        """
+        if chunk <= datetime.timedelta(0):
+            raise ValueError(f"Invalid chunk size: {chunk}. Chunk size must be positive.")
+        categories = list(categories) if categories is not None else list()
+        symbols = list(symbols) if symbols is not None else list()
+        requested = list(symbols)
+        for category in categories:
+            symbols.extend(symbol for symbol in self.loader.get_symbols(category) if symbol not in symbols)
+        resolutions = list(MTResolutions) if resolutions is None else resolutions
+        resolutions = [MTDataLoader.get_resolution(resolution).value for resolution in resolutions]
+        _, _, start_date, end_date = MTDataLoader.normalize_request(
+            resolutions[0], MTRequests.RANGE, start_date, end_date)
+
+        self.spec = {'symbols': requested, 'categories': categories, 'resolutions': resolutions,
+                     'start_date': start_date.isoformat(), 'end_date': end_date.isoformat(),
+                     'chunk': chunk.total_seconds()}
+        windows = list()
+        window_start = start_date
+        while window_start <= end_date:
+            window_end = min(window_start + chunk - datetime.timedelta(seconds=1), end_date)
+            windows.append((window_start, window_end))
+            window_start = window_end + datetime.timedelta(seconds=1)
+
+        # Each symbol and resolution is a chain of windows. Jobs are built backwards so each links to the next.
+        self.jobs = dict()
+        chains = list()
+        for symbol in symbols:
+            for resolution in resolutions:
+                next_id = None
+                for window_start, window_end in reversed(windows):
+                    job_id = f"{symbol}/{MTResolutions.timeframe(resolution)}/{window_start:%Y%m%d%H%M%S}"
+                    self.jobs[job_id] = BackfillJob(job_id, symbol, resolution, window_start, window_end, next_id)
+                    next_id = job_id
+                chains.append(next_id)
+
+        self.states = {job_id: {'state': PENDING, 'attempts': 0, 'bars': 0} for job_id in self.jobs}
+        self.kept = dict()
+        checkpoint = self.load_checkpoint()
+        if checkpoint is not None and all(checkpoint['spec'].get(key) == self.spec[key] for key in WINDOW_KEYS):
+            for job_id, state in checkpoint['jobs'].items():
+                if job_id not in self.states:
+                    self.kept[job_id] = state
+                # Jobs that failed in a previous run are retried
+                elif state['state'] in (DONE, EMPTY):
+                    self.states[job_id] = state
+        self.save_checkpoint()
+
+        self.ready = deque()
+        self.retries = list()
+        for job_id in reversed(chains):
+            self.push_chain(job_id)
+        return self.remaining()
+
+    def push_chain(self, job_id: Optional[str]) -> None:
+        """
+        Queues the first unfinished job of a chain, starting from `job_id`. Windows of a series run in order, and a
+        series is finished before the next one starts, so data reaches the cache and exporter in order.
+        """
+        while job_id is not None and self.states[job_id]['state'] in FINISHED:
+            job_id = self.jobs[job_id].next
+        if job_id is not None:
+            self.ready.appendleft(self.jobs[job_id])
+
+    @property
+    def journal_path(self) -> str:
+        return f"{self.checkpoint_path}.journal"
+
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """
+        Loads the checkpoint with the job states of its journal applied, if any.
+        """
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, 'r') as f:
+            checkpoint = json.load(f)
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Last line cut short by an interrupted write
+                        break
+                    checkpoint['jobs'][entry.pop('id')] = entry
+        return checkpoint
+
+    def save_checkpoint(self) -> None:
+        """
+        Writes all job states to the checkpoint and clears the journal.
+        """
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'spec': self.spec, 'jobs': {**self.kept, **self.states}}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def append_journal(self, job_id: str) -> None:
+        """
+        Appends the state of a job to the journal, so that checkpointing a job does not rewrite every other job.
+        """
+        if self.journal is None:
+            self.journal = open(self.journal_path, 'a')
+        self.journal.write(json.dumps({'id': job_id, **self.states[job_id]}) + '\n')
+        self.journal.flush()
+
+    def remaining(self) -> int:
+        return sum(1 for state in self.states.values() if state['state'] not in FINISHED)
+
+    def next_job(self) -> Optional[BackfillJob]:
+        """
+        Returns the next job: a retry whose backoff has elapsed, else a ready job, else waits for the earliest retry.
+        """
+        if len(self.retries) > 0 and (self.retries[0][0] <= time.monotonic() or len(self.ready) == 0):
+            retry_at, _, job_id = heapq.heappop(self.retries)
+            time.sleep(max(retry_at - time.monotonic(), 0.0))
+            return self.jobs[job_id]
+        if len(self.ready) > 0:
+            return self.ready.popleft()
+        return None
+
+    def run(self, max_jobs: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Runs jobs until all are finished, or `max_jobs` have run. Returns the final progress. The journal is compacted
+        into the checkpoint when the run ends.
+        """
+        if self.spec is None:
+            raise RuntimeError("No backfill planned. Call `plan` first.")
+        self.started = time.monotonic()
+        num_jobs = 0
+        while max_jobs is None or num_jobs < max_jobs:
+            job = self.next_job()
+            if job is None:
+                break
+            self.run_job(job)
+            self.append_journal(job.id)
+            self.jobs_run += 1
+            num_jobs += 1
+            if self.verbose:
+                self.report(job)
+        self.save_checkpoint()
+        return self.progress()
+
+    def run_job(self, job: BackfillJob) -> None:
+        state = self.states[job.id]
+        wait = self.last_call + self.min_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self.last_call = time.monotonic()
+
+        state['attempts'] += 1
+        state.pop('error', None)
+        started = time.perf_counter()
+        try:
+            rates = self.loader.fetch_rates(job.symbol, job.resolution, MTRequests.RANGE, job.start, job.end)
+            price_data = self.loader.to_price_data(job.symbol, job.resolution, rates) if rates is not None else None
+        except Exception as e:
+            price_data = None
+            state['error'] = repr(e)
+        self.seconds[job.resolution] += time.perf_counter() - started
+
+        if price_data is None and 'error' not in state:
+            state['state'] = EMPTY
+            self.push_chain(job.next)
+            return
+        if price_data is None:
+            if state['attempts'] >= self.max_attempts:
+                state['state'] = FAILED
+                self.push_chain(job.next)
+            else:
+                delay = min(self.backoff * 2 ** (state['attempts'] - 1), self.max_backoff)
+                heapq.heappush(self.retries, (time.monotonic() + delay, self.jobs_run, job.id))
+            return
+
+        state['state'] = DONE
+        state['bars'] = len(price_data)
+        self.bars[job.resolution] += len(price_data)
+        self.push_chain(job.next)
+        if self.export:
+            self.loader.exporter.export(price_data)
+        if self.consumer is not None:
+            self.consumer(price_data)
+
+    def throughput(self) -> Dict[str, float]:
+        """
+        Bars per second of terminal and conversion time, per resolution, for jobs run in this session.
+        """
+        return {MTResolutions.timeframe(resolution): self.bars[resolution] / seconds
+                for resolution, seconds in self.seconds.items() if seconds > 0}
+
+    def progress(self) -> Dict[str, Any]:
+        """
+        Job counts by state, bars fetched and an ETA in seconds based on the average job time of this session.
+        """
+        counts = defaultdict(int)
+        for state in self.states.values():
+            counts[state['state']] += 1
+        finished = sum(counts[state] for state in FINISHED)
+        elapsed = time.monotonic() - self.started if self.started is not None else 0.0
+        remaining = len(self.states) - finished
+        eta = elapsed / self.jobs_run * remaining if self.jobs_run > 0 else None
+        return {'total': len(self.states), 'finished': finished, 'done': counts[DONE], 'empty': counts[EMPTY],
+                'failed': counts[FAILED], 'bars': sum(state['bars'] for state in self.states.values()),
+                'elapsed': elapsed, 'eta': eta}
+
+    def report(self, job: BackfillJob) -> None:
+        progress = self.progress()
+        state = self.states[job.id]
+        eta = datetime.timedelta(seconds=round(progress['eta'])) if progress['eta'] is not None else '-'
+        bars_per_second = self.throughput().get(MTResolutions.timeframe(job.resolution), 0.0)
+        print(f"[{progress['finished']}/{progress['total']}] {job.symbol} {MTResolutions.timeframe(job.resolution)} "
+              f"{job.start:%Y-%m-%d} - {job.end:%Y-%m-%d}: {state['state']}, {state['bars']} bars, "
+              f"{bars_per_second:,.0f} bars/s, ETA {eta}")
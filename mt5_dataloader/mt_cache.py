@@ -0,0 +1,231 @@
+"""
+This module contains a persistent on-disk cache for historical bars. Bars are stored as Parquet files partitioned by
+symbol, timeframe and month, together with an index of the date ranges already fetched from the terminal. Range
+requests that are fully covered are answered from disk, and only the missing head or tail is requested from MT5.
+"""
+import os
+import json
+import time
+import shutil
+import datetime
+from typing import Optional, List, Tuple, Dict
+
+
+from .mt_lazy import LazyModule
+from .mt_utils import MTResolutions
+from constants import constants as c
+
+pd = LazyModule('pandas')
+
+Interval = Tuple[datetime.datetime, datetime.datetime]
+
+# Smallest distance between two bar times. Used to build closed intervals around covered ranges.
+EPSILON = datetime.timedelta(seconds=1)
+
+# Bars closing after `now - SETTLE_PERIOD` may still be forming (or carry a broker time offset) and are never
+# marked as covered, so they are re-fetched on the next request.
+SETTLE_PERIOD = datetime.timedelta(days=1)
+
+
+class BarCache:
+
+    index_file = 'index.json'
+
+    def __init__(self, root: str, max_bytes: Optional[int] = None):
+        """
+        Parameters
+        ----------
+            root: str
+                Directory where the cache is stored. Created if it does not exist.
+
+            max_bytes: int = None
+                Size cap for the cache on disk. When exceeded, the least recently used symbol/resolution series are
+                evicted. No cap if None.
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+        self.index = self.load_index()
+
+    @staticmethod
+    def key(symbol: str, resolution: int) -> str:
+        return f"{symbol}/{MTResolutions.timeframe(resolution)}"
+
+    def series_path(self, symbol: str, resolution: int) -> str:
+        return os.path.join(self.root, symbol, MTResolutions.timeframe(resolution))
+
+    def partition_path(self, symbol: str, resolution: int, month: 'pd.Period') -> str:
+        return os.path.join(self.series_path(symbol, resolution), f"{month.strftime('%Y-%m')}.parquet")
+
+    def load_index(self) -> Dict[str, dict]:
+        path = os.path.join(self.root, self.index_file)
+        if not os.path.exists(path):
+            return dict()
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def save_index(self) -> None:
+        path = os.path.join(self.root, self.index_file)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, path)
+
+    def covered(self, symbol: str, resolution: int) -> List[Interval]:
+        """
+        Returns the date ranges already stored for a symbol and resolution.
+        """
+        entry = self.index.get(self.key(symbol, resolution))
+        if entry is None:
+            return list()
+        return [(datetime.datetime.fromisoformat(lo), datetime.datetime.fromisoformat(hi))
+                for lo, hi in entry['coverage']]
+
+    def missing(self, symbol: str, resolution: int, start: datetime.datetime,
+                end: datetime.datetime) -> List[Interval]:
+        """
+        Returns the parts of [start, end] that are not yet stored in the cache. Each interval can be passed directly
+        to `copy_rates_range`.
+        """
+        gaps = list()
+        cursor = start
+        for lo, hi in self.covered(symbol, resolution):
+            if hi < cursor:
+                continue
+            if lo > end:
+                break
+            if lo > cursor:
+                gaps.append((cursor, lo - EPSILON))
+            cursor = max(cursor, hi + EPSILON)
+            if cursor > end:
+                break
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def read(self, symbol: str, resolution: int, start: datetime.datetime,
+             end: datetime.datetime) -> 'pd.DataFrame':
+        """
+        Reads stored bars within [start, end].
+        """
+        frames = list()
+        for month in pd.period_range(start=start, end=end, freq='M'):
+            path = self.partition_path(symbol, resolution, month)
+            if os.path.exists(path):
+                frames.append(pd.read_parquet(path))
+
+        self.touch(symbol, resolution)
+
+        if len(frames) == 0:
+            return pd.DataFrame(columns=c.PRICE_COLUMNS + ['spread'] + c.VOLUME_COLUMNS,
+                                index=pd.DatetimeIndex([], name='date'))
+
+        data = pd.concat(frames)
+        return data.loc[start:end]
+
+    def write(self, symbol: str, resolution: int, data: 'pd.DataFrame', start: datetime.datetime,
+              end: datetime.datetime) -> None:
+        """
+        Merges freshly fetched bars into their monthly partitions and marks [start, end] as covered.
+
+        Parameters
+        ----------
+            data: pd.DataFrame
+                Bars returned by the terminal for the requested range, as built by `MTDataLoader.rates_to_frame`
+                with float64 prices and volume columns
+
+            start: datetime
+                Start of the range that was requested from the terminal
+
+            end: datetime
+                End of the range that was requested from the terminal
+        """
+        if len(data) > 0:
+            for month, chunk in data.groupby(data.index.to_period('M')):
+                path = self.partition_path(symbol, resolution, month)
+                if os.path.exists(path):
+                    chunk = pd.concat([pd.read_parquet(path), chunk])
+                    chunk = chunk[~chunk.index.duplicated(keep='last')].sort_index()
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                chunk.to_parquet(path)
+
+        # Only bars that are guaranteed to be closed count towards coverage
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        settled = now - SETTLE_PERIOD
+        hi = min(end, settled)
+        if len(data) > 0:
+            last_bar = data.index[-1].to_pydatetime()
+            if last_bar + datetime.timedelta(seconds=MTResolutions.seconds(resolution)) > settled:
+                hi = min(hi, last_bar - EPSILON)
+
+        coverage = self.covered(symbol, resolution)
+        if hi >= start:
+            coverage.append((start, hi))
+        self.index[self.key(symbol, resolution)] = {
+            'coverage': [[lo.isoformat(), hi.isoformat()] for lo, hi in self.merge(coverage)],
+            'last_access': time.time()
+        }
+        self.save_index()
+        self.enforce_limit(keep=self.key(symbol, resolution))
+
+    @staticmethod
+    def merge(intervals: List[Interval]) -> List[Interval]:
+        """
+        Merges overlapping and adjacent intervals.
+        """
+        merged = list()
+        for lo, hi in sorted(intervals):
+            if merged and lo <= merged[-1][1] + EPSILON:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+            else:
+                merged.append((lo, hi))
+        return merged
+
+    def touch(self, symbol: str, resolution: int) -> None:
+        entry = self.index.get(self.key(symbol, resolution))
+        if entry is not None:
+            entry['last_access'] = time.time()
+
+    def invalidate(self, symbol: Optional[str] = None, resolution: Optional[int] = None) -> None:
+        """
+        Removes stored bars. If no symbol is specified, the whole cache is cleared. If no resolution is specified, all
+        resolutions for the symbol are removed.
+        """
+        for key in list(self.index.keys()):
+            key_symbol, key_timeframe = key.rsplit('/', 1)
+            if symbol is not None and key_symbol != symbol:
+                continue
+            if resolution is not None and key_timeframe != MTResolutions.timeframe(resolution):
+                continue
+            self.remove(key)
+        self.save_index()
+
+    def remove(self, key: str) -> None:
+        key_symbol, key_timeframe = key.rsplit('/', 1)
+        del self.index[key]
+        shutil.rmtree(os.path.join(self.root, key_symbol, key_timeframe), ignore_errors=True)
+
+    def size(self) -> int:
+        """
+        Total size of stored partitions in bytes.
+        """
+        total = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith('.parquet'):
+                    total += os.path.getsize(os.path.join(dirpath, name))
+        return total
+
+    def enforce_limit(self, keep: Optional[str] = None) -> None:
+        """
+        Evicts least recently used series until the cache fits within `max_bytes`. The series specified by `keep` is
+        evicted last.
+        """
+        if self.max_bytes is None:
+            return
+        lru = sorted(self.index.items(), key=lambda item: (item[0] == keep, item[1]['last_access']))
+        for key, _ in lru:
+            if self.size() <= self.max_bytes:
+                break
+            self.remove(key)
+        self.save_index()
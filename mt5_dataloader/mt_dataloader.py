@@ -3,27 +3,82 @@ This module contains methods to extract historical price data from the MetaTrade
 MetaTrader5 API. 
 """
 import os 
+import time
+import types
 import datetime
-from typing import Optional, List, Union, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Union, Any, Tuple, Dict, Iterator, Callable
 
-import pandas as pd
-import MetaTrader5 as mt5
+import numpy as np
 from tenacity import retry, stop_after_attempt, retry_if_exception_type
 
+from .mt_backend import MTBackend, SharedConnection, shared_connection
+from .mt_cache import BarCache
+from .mt_export import MTExporter
+from .mt_lazy import LazyModule
+from .mt_metrics import MTEvent, MTHook
 from .mt_pricedata import PriceData
-from .mt_utils import MTRequests, MTResolutions, SymbolCategories
+from .mt_replay import RecordingBackend
+from .mt_requestcache import RequestCache
+from .mt_resample import bar_window, sources as resample_sources
+from .mt_symbols import SymbolCatalog
+from .mt_ticks import TickData
+from .mt_utils import MTRequests, MTResolutions, MTPhases, SymbolCategories
 from constants import constants as c
 
+pd = LazyModule('pandas')
+
+
+def record_retry(retry_state: Any) -> None: 
+    """ 
+    Tenacity `before_sleep` callback emitting a retry event for the loader method being retried. 
+    """
+    loader, symbol = retry_state.args[0], retry_state.args[1] if len(retry_state.args) > 1 else None
+    loader.emit(retry_state.fn.__name__, MTPhases.RETRY, symbol=symbol)
+
+
+class hybridmethod: 
+    """ 
+    Method with separate class and instance implementations. Called on the class, the decorated function is bound to 
+    the class, as a classmethod. Called on an instance, the function registered with `instance` is bound to it. 
+    """
+    def __init__(self, func: Callable): 
+        self.func = func
+        self.instance_func = func
+        self.__doc__ = func.__doc__
+
+    def instance(self, func: Callable) -> 'hybridmethod': 
+        self.instance_func = func
+        return self
+
+    def __get__(self, obj: Any, owner: type) -> Callable: 
+        if obj is None: 
+            return types.MethodType(self.func, owner)
+        return types.MethodType(self.instance_func, obj)
+
 
 class MTDataLoader: 
 
     valid_requests = [request.value for request in MTRequests.__members__.values()]
     valid_resolutions = [resolution.value for resolution in MTResolutions.__members__.values()]
+    symbol_catalog = SymbolCatalog()
 
     def __init__(
             self, 
             path: str = None,
-            envpath_key: str = 'MT5_PATH'):
+            envpath_key: str = 'MT5_PATH',
+            cache_dir: Optional[str] = None,
+            cache_max_bytes: Optional[int] = None,
+            price_dtype: Union[str, np.dtype] = np.float64,
+            volumes: bool = False,
+            derive_resolutions: bool = False,
+            request_cache_bytes: Optional[int] = None,
+            live_ttl: float = 1.0,
+            backend: Optional[MTBackend] = None,
+            record_path: Optional[str] = None,
+            compact: bool = False,
+            export_dir: Optional[str] = None,
+            export_format: str = 'parquet'):
         """ 
         Initialize instance variables 
 
@@ -37,10 +92,73 @@ class MTDataLoader:
 
             envpath_key:str = MT5_PATH
                 Default key for environment variable if no path is specified for MT5 executable. 
+
+            cache_dir:str = None
+                Directory for the on-disk bar cache. If specified, `range` requests are served from the cache and only
+                missing ranges are requested from the terminal. Requires `pyarrow`. Cache is disabled if None. 
+
+            cache_max_bytes:int = None
+                Size cap for the on-disk bar cache. Least recently used series are evicted when exceeded. 
+
+            price_dtype:np.dtype = np.float64
+                Dtype of OHLC columns in returned data. Use `np.float32` to halve memory for large requests. 
+
+            volumes:bool = False
+                Keeps `tick_volume` and `real_volume` columns in returned data. 
+
+            derive_resolutions:bool = False
+                Serves cached `range` requests by resampling finer bars already in the on-disk cache, e.g. H1 from M1,
+                instead of calling the terminal. Requires `cache_dir`. 
+
+            request_cache_bytes:int = None
+                Memory budget for the in-process cache of `get_price_data` results. Identical requests are served from 
+                memory until evicted. Cache is disabled if None. 
+
+            live_ttl:float = 1.0
+                Seconds before cached requests that may change with new bars expire: `pos` requests, and requests
+                ending close to now.
+
+            backend:MTBackend = None
+                Terminal API used for all requests. Defaults to the MetaTrader5 terminal connection shared by all 
+                loaders in the process. See `mt_backend` and `mt_fake.FakeTerminal`. 
+
+            record_path:str = None
+                Directory of an archive recording every terminal response. Recorded runs can be repeated offline by 
+                passing `mt_replay.ReplayBackend(record_path)` as the backend. Recording is disabled if None. 
+
+            compact:bool = False
+                Returns `PriceData` backed by contiguous numpy arrays instead of a DataFrame. `data` is built on first 
+                access. Reduces memory when holding many series. 
+
+            export_dir:str = None
+                Directory for data exported with `get_price_data(..., export=True)`. See `mt_export.MTExporter`. 
+
+            export_format:str = 'parquet'
+                Export format: `parquet`, `feather` or `npy`. 
+
+        The terminal is launched on the first request rather than here. Use `launch_mt5` to launch it eagerly. 
         """
 
         self.path = self.get_path(envpath_key, path)
-        self.launch_mt5()
+        if backend is None: 
+            self.connection = shared_connection(self.path)
+        elif isinstance(backend, SharedConnection): 
+            self.connection = backend
+        else: 
+            self.connection = SharedConnection(backend, self.path)
+        self.backend = self.connection
+        if record_path is not None: 
+            self.backend = RecordingBackend(self.backend, record_path)
+        if backend is not None or record_path is not None: 
+            self.symbol_catalog = SymbolCatalog(backend=self.backend)
+        self.cache = BarCache(cache_dir, cache_max_bytes) if cache_dir is not None else None
+        self.price_dtype = price_dtype
+        self.volumes = volumes
+        self.derive_resolutions = derive_resolutions
+        self.request_cache = RequestCache(request_cache_bytes, live_ttl) if request_cache_bytes is not None else None
+        self.compact = compact
+        self.exporter = MTExporter(export_dir, export_format) if export_dir is not None else None
+        self.hooks: List[MTHook] = list()
         
         
     @staticmethod
@@ -56,15 +174,40 @@ class MTDataLoader:
 
     def launch_mt5(self) -> None: 
         """ 
-        Launches the MT5 terminal. This is needed in order to get historical data. 
+        Launches the MT5 terminal. This is needed in order to get historical data, and otherwise happens on the first 
+        request. Loaders sharing a connection launch the terminal once. 
         """
-        if mt5.account_info() is None and self.path is not None: 
-            try: 
-                launched = mt5.initialize(self.path)
-            except Exception as e: 
-                raise RuntimeError(f"Failed to launch MetaTrader5. Exception: {e}") 
+        self.connection.connect()
     
-    @retry(stop=stop_after_attempt(3), retry=retry_if_exception_type(KeyError))
+    def add_hook(self, hook: MTHook) -> None: 
+        """ 
+        Registers a callable receiving an `MTEvent` for each phase of loader calls, e.g. `mt_metrics.MetricsAggregator`. 
+        Events are only built while at least one hook is registered. 
+        """
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: MTHook) -> None: 
+        self.hooks.remove(hook)
+
+    def emit(
+            self,
+            operation: str,
+            phase: MTPhases,
+            started: Optional[float] = None,
+            symbol: Optional[str] = None,
+            bars: int = 0,
+            nbytes: int = 0) -> None: 
+        """ 
+        Sends an event to all hooks. `started` is a `time.perf_counter` value, and is None for counter events. 
+        """
+        if not self.hooks: 
+            return 
+        seconds = time.perf_counter() - started if started is not None else 0.0
+        event = MTEvent(operation, phase.value, seconds, symbol, bars, nbytes)
+        for hook in self.hooks: 
+            hook(event)
+
+    @retry(stop=stop_after_attempt(3), retry=retry_if_exception_type(KeyError), before_sleep=record_retry)
     def get_price_data(
             self,
             symbol: str,
@@ -113,62 +256,504 @@ class MTDataLoader:
                 Used when `request_type` is set to `pos`
 
             export: bool
-                Exports data to csv. Not implemented.     
+                Exports data to `export_dir` on a background thread. Only bars newer than the last exported bar of 
+                the series are written. Call `exporter.flush()` to wait for pending exports. 
         """
+        if export and self.exporter is None: 
+            raise ValueError("No export directory specified. Set `export_dir` to export data.")
 
-        resolution = self.get_resolution(resolution).value 
-        request_type = self.get_request_type(request_type) 
+        started = time.perf_counter()
+        resolution, request_type, start_date, end_date = self.normalize_request(
+            resolution, request_type, start_date, end_date)
+        self.emit('get_price_data', MTPhases.VALIDATE, started, symbol)
+
+        key = None
+        if self.request_cache is not None: 
+            key = self.request_cache.key(symbol, resolution, request_type, start_date, end_date, start_index, num_bars)
+            cached = self.request_cache.get(key)
+            if cached is not None: 
+                if export: 
+                    self.exporter.export(cached)
+                return cached
+
+        rates = self.fetch_rates(symbol, resolution, request_type, start_date, end_date, start_index, num_bars)
+
+        if rates is None: 
+            print(f"No data available for: {symbol} {MTResolutions.timeframe(resolution=resolution)}") 
+
+            return None 
         
+        price_data = self.to_price_data(symbol, resolution, rates)
+
+        if key is not None: 
+            self.request_cache.put(key, price_data)
+
+        if export: 
+            self.exporter.export(price_data)
+        
+        return price_data
 
-        rates = None
+    @classmethod
+    def normalize_request(
+            cls,
+            resolution: Union[str, MTResolutions],
+            request_type: Union[str, MTRequests],
+            start_date: Optional[Union[datetime.datetime, datetime.date]] = None,
+            end_date: Optional[Union[datetime.datetime, datetime.date]] = None) -> Tuple[int, MTRequests, 
+                                                                                         Optional[datetime.datetime], 
+                                                                                         Optional[datetime.datetime]]:
+        """ 
+        Validates a request and returns the resolution value, request type and dates as datetime. 
+        """
+        resolution = cls.get_resolution(resolution).value 
+        request_type = cls.get_request_type(request_type) 
+        start_date, end_date = cls.__validate_dates(request_type, start_date, end_date)
+
+        return resolution, request_type, start_date, end_date
+
+    def fetch_rates(
+            self,
+            symbol: str,
+            resolution: int,
+            request_type: MTRequests,
+            start_date: Optional[datetime.datetime] = None,
+            end_date: Optional[datetime.datetime] = None,
+            start_index: int = 0,
+            num_bars: int = 99000) -> Any: 
+        """
+        Terminal phase of `get_price_data`. Takes a request as returned by `normalize_request` and returns raw rates, 
+        or a frame when served from the on-disk cache, without conversion. Returns None if no data is available. 
+        """
+        started = time.perf_counter()
         try:
-            if request_type == MTRequests.POSITION: 
-                # Gets historical data based on position. 
-                rates = mt5.copy_rates_from_pos(symbol, resolution, start_index, num_bars)
+            rates = self.__fetch(symbol, resolution, request_type, start_date, end_date, start_index, num_bars)
+        except KeyError:
+            rates = None
+
+        if rates is None: 
+            self.emit('get_price_data', MTPhases.NO_DATA, symbol=symbol)
+        elif self.hooks: 
+            nbytes = rates.nbytes if isinstance(rates, np.ndarray) else int(rates.memory_usage().sum())
+            self.emit('get_price_data', MTPhases.TERMINAL, started, symbol, len(rates), nbytes)
+        return rates
+
+    def to_price_data(self, symbol: str, resolution: int, rates: Any) -> PriceData: 
+        """ 
+        Conversion phase of `get_price_data`. Builds `PriceData` from the output of `fetch_rates`. 
+        """
+        started = time.perf_counter()
+        if self.compact: 
+            price_data = PriceData.from_rates(symbol, resolution, rates, self.price_dtype, self.volumes)
+        else: 
+            df = rates
+            if not isinstance(df, pd.DataFrame): 
+                df = self.rates_to_frame(rates, self.price_dtype, self.volumes)
+            price_data = PriceData(symbol, resolution, df)
+
+        if self.hooks: 
+            self.emit('get_price_data', MTPhases.CONVERT, started, symbol, len(price_data), price_data.nbytes)
+        return price_data
+
+    def get_price_data_many(
+            self,
+            symbols: List[str],
+            resolution: Union[str, MTResolutions],
+            request_type: Union[str, MTRequests],
+            start_date: Optional[Union[datetime.datetime, datetime.date]] = None,
+            end_date: Optional[Union[datetime.datetime, datetime.date]] = None,
+            start_index: Optional[int] = 0,
+            num_bars: Optional[int] = 99000,
+            panel: bool = False,
+            max_workers: int = 4) -> Tuple[Union[Dict[str, PriceData], 'pd.DataFrame'], Dict[str, Exception]]:
+        """
+        Fetches price data for several symbols in one batch. 
+
+        Requests are validated once. Terminal calls run back to back on a single worker thread, since the MT5 API is 
+        not thread-safe, while frame conversion of completed symbols runs on a thread pool. A failing symbol does not 
+        abort the batch. 
+
+        Parameters
+        ----------
+            symbols: List[str]
+                Symbols to fetch data. e.g. output of `get_symbols` 
+
+            panel: bool = False 
+                If True, returns a single frame indexed by the union of timestamps, with (symbol, field) MultiIndex 
+                columns. Otherwise returns a dict of `PriceData` keyed by symbol. 
+
+            max_workers: int = 4
+                Number of threads used for frame conversion. 
+
+            See `get_price_data` for the remaining parameters. 
+
+        Returns
+        -------
+            Tuple of the fetched data and a dict of symbol to exception for symbols that failed or returned no data. 
+        """
+        resolution, request_type, start_date, end_date = self.normalize_request(
+            resolution, request_type, start_date, end_date)
+
+        results = dict()
+        failures = dict()
+        with ThreadPoolExecutor(max_workers=1) as terminal, ThreadPoolExecutor(max_workers=max_workers) as pool: 
+            fetches = [
+                (symbol, terminal.submit(
+                    self.fetch_rates, symbol, resolution, request_type, start_date, end_date, start_index, num_bars)) 
+                for symbol in symbols]
             
-            elif request_type == MTRequests.DATE:
-                # Gets historical data based on date 
-                if end_date is None:
-                    raise ValueError("No end date specified")
-                
-                end_date = self.__dates_as_datetime(end_date) 
-                
-                rates = mt5.copy_rates_from(symbol, resolution, end_date, num_bars)
+            conversions = list()
+            for symbol, future in fetches: 
+                try:
+                    result = future.result()
+                except Exception as e: 
+                    failures[symbol] = e
+                    continue
+                if result is None: 
+                    failures[symbol] = LookupError(
+                        f"No data available for: {symbol} {MTResolutions.timeframe(resolution=resolution)}")
+                    continue
+                conversions.append((symbol, pool.submit(self.to_price_data, symbol, resolution, result)))
+
+            for symbol, future in conversions: 
+                try:
+                    results[symbol] = future.result()
+                except Exception as e: 
+                    failures[symbol] = e
+
+        if panel: 
+            frames = {symbol: price.data for symbol, price in results.items()}
+            if len(frames) == 0: 
+                return pd.DataFrame(), failures
+            return pd.concat(frames, axis=1, names=['symbol', 'field']).sort_index(), failures
+        
+        return results, failures
+
+    def iter_price_data(
+            self,
+            symbol: str,
+            resolution: Union[str, MTResolutions],
+            start_date: Union[datetime.datetime, datetime.date],
+            end_date: Union[datetime.datetime, datetime.date],
+            chunk: Union[int, datetime.timedelta] = 50000) -> Iterator[PriceData]:
+        """
+        Fetches a date range in bounded windows, yielding one `PriceData` per window. Only one window is held in memory 
+        at a time, so memory stays flat regardless of the length of the range. 
+
+        Windows are closed, non-overlapping intervals, and bars at or before the last yielded bar are dropped, so no 
+        boundary bar is yielded twice. Windows without bars are skipped. Windows for which the terminal returns no 
+        data are skipped too, and reported with a printed message and a `nodata` event, so the rest of the range is 
+        still fetched. 
+
+        Parameters
+        ----------
+            symbol: str
+                Symbol to fetch data
+
+            resolution: MTResolutions
+                Timeframe/resolution. See MTResolutions 
+
+            start_date: datetime
+                Start date for historical data. 
+
+            end_date: datetime
+                End date for historical data. 
+
+            chunk: int | timedelta = 50000
+                Window size, either as a number of bars of the requested resolution or as a timedelta. 
+        """
+        resolution = self.get_resolution(resolution).value 
+        start_date, end_date = self.__validate_dates(MTRequests.RANGE, start_date, end_date)
+
+        if isinstance(chunk, int): 
+            chunk = datetime.timedelta(seconds=chunk * MTResolutions.seconds(resolution))
+        if chunk <= datetime.timedelta(0): 
+            raise ValueError(f"Invalid chunk size: {chunk}. Chunk size must be positive.")
+
+        last_bar = None
+        window_start = start_date
+        while window_start <= end_date: 
+            window_end = min(window_start + chunk - datetime.timedelta(seconds=1), end_date)
+
+            try:
+                df = self.__fetch(symbol, resolution, MTRequests.RANGE, window_start, window_end, 0, 0)
+            except KeyError: 
+                df = None 
+
+            if df is None: 
+                print(f"No data available for: {symbol} {MTResolutions.timeframe(resolution=resolution)} "
+                      f"{window_start} - {window_end}") 
+                self.emit('iter_price_data', MTPhases.NO_DATA, symbol=symbol)
+                window_start = window_end + datetime.timedelta(seconds=1)
+                continue
+            
+            if not isinstance(df, pd.DataFrame): 
+                df = self.rates_to_frame(df, self.price_dtype, self.volumes)
             
-            elif request_type == MTRequests.RANGE:
-                # Gets historical data based on date range
-                if start_date is None or end_date is None:
-                    raise ValueError("Incomplete dates. Query requires start date and end date.") 
-                
-                start_date = self.__dates_as_datetime(start_date) 
-                end_date = self.__dates_as_datetime(end_date) 
-
-                if end_date < start_date:
-                    raise ValueError(f"Invalid Dates. Start Date: {start_date} cannot be greater than End Date: \
-                        {end_date}.")
-                
-                
-                rates = mt5.copy_rates_range(symbol, resolution, start_date, end_date)
-
-            else:
-                # This is unlikely to happen since if request is invalid, a KeyError will be thrown
-                raise ValueError(f"Something went wrong. Request Type may be invalid")
+            if last_bar is not None: 
+                df = df.loc[df.index > last_bar]
 
-        except KeyError:
-            print(f"No data available for: {symbol} {MTResolutions.timeframe(resolution=resolution)}") 
+            if len(df) > 0: 
+                last_bar = df.index[-1]
+                yield PriceData(symbol, resolution, df)
 
-            return None
+            window_start = window_end + datetime.timedelta(seconds=1)
 
-        if rates is None: 
-            print(f"No data available for: {symbol} {MTResolutions.timeframe(resolution=resolution)}") 
+    def stream_price_data(
+            self,
+            symbol: str,
+            resolution: Union[str, MTResolutions],
+            start_date: Union[datetime.datetime, datetime.date],
+            end_date: Union[datetime.datetime, datetime.date],
+            consumer: Callable[[PriceData], Any],
+            chunk: Union[int, datetime.timedelta] = 50000) -> int:
+        """
+        Passes each window from `iter_price_data` to `consumer` as soon as it is fetched, e.g. a writer appending to 
+        disk or a running aggregator. Returns the total number of bars processed. Windows without data are skipped, 
+        see `iter_price_data`. 
+        """
+        num_bars = 0
+        for price in self.iter_price_data(symbol, resolution, start_date, end_date, chunk=chunk): 
+            consumer(price)
+            num_bars += len(price.data)
+        
+        return num_bars
+
+    def get_tick_data(
+            self,
+            symbol: str,
+            request_type: Union[str, MTRequests],
+            start_date: Optional[Union[datetime.datetime, datetime.date]] = None,
+            end_date: Optional[Union[datetime.datetime, datetime.date]] = None,
+            num_ticks: Optional[int] = 100000,
+            flags: Optional[int] = None) -> Optional[TickData]:
+        """
+        Fetches tick data from MT5 history. 
+
+        Parameters
+        ----------
+            symbol: str
+                Symbol to fetch data
+
+            request_type: str 
+                Determines how MT5 will get tick data, either by:
+                    1. `date` - Gets `num_ticks` ticks starting from `start_date`. Required parameter: `start_date` 
+                    2. `range` - Gets ticks within a range of dates. Required parameters: `start_date`, `end_date` 
+                `pos` is not supported for ticks. 
+
+            start_date: datetime
+                Start date for tick data. 
+
+            end_date: datetime
+                End date for tick data. Used when `request_type` is set to `range` 
+
+            num_ticks: int 
+                Number of ticks to fetch. Used when `request_type` is set to `date` 
+
+            flags: int 
+                Type of ticks to fetch. Defaults to all ticks (`mt5.COPY_TICKS_ALL`)
+        """
+        started = time.perf_counter()
+        request_type = self.get_request_type(request_type) 
+        flags = c.COPY_TICKS_ALL if flags is None else flags
+
+        if request_type == MTRequests.DATE: 
+            if start_date is None: 
+                raise ValueError("No start date specified")
+            
+            start_date = self.__dates_as_datetime(start_date) 
+            self.emit('get_tick_data', MTPhases.VALIDATE, started, symbol)
+            started = time.perf_counter()
+            ticks = self.backend.copy_ticks_from(symbol, start_date, num_ticks, flags)
+        
+        elif request_type == MTRequests.RANGE: 
+            start_date, end_date = self.__validate_dates(request_type, start_date, end_date)
+            self.emit('get_tick_data', MTPhases.VALIDATE, started, symbol)
+            started = time.perf_counter()
+            ticks = self.backend.copy_ticks_range(symbol, start_date, end_date, flags)
+        
+        else: 
+            raise ValueError(f"Request type not supported for ticks: {request_type}")
+
+        if ticks is None: 
+            self.emit('get_tick_data', MTPhases.NO_DATA, symbol=symbol)
+            print(f"No tick data available for: {symbol}")
 
             return None 
+        
+        self.emit('get_tick_data', MTPhases.TERMINAL, started, symbol, len(ticks), ticks.nbytes)
+        started = time.perf_counter()
+        tick_data = TickData.from_ticks(symbol, ticks, self.price_dtype)
+        self.emit('get_tick_data', MTPhases.CONVERT, started, symbol, len(tick_data), tick_data.nbytes)
+        return tick_data
+
+    def iter_tick_data(
+            self,
+            symbol: str,
+            start_date: Union[datetime.datetime, datetime.date],
+            end_date: Union[datetime.datetime, datetime.date],
+            chunk: datetime.timedelta = datetime.timedelta(hours=1),
+            flags: Optional[int] = None) -> Iterator[TickData]:
+        """
+        Fetches ticks within a date range in bounded time windows, yielding one `TickData` per window. 
+
+        Each window keeps ticks in [window start, window end), and the last window also keeps ticks at `end_date`, so 
+        ticks sharing a second across a window boundary are yielded exactly once. Windows without ticks are skipped. 
+
+        Parameters
+        ----------
+            chunk: timedelta = 1 hour
+                Length of each window. 
+
+            See `get_tick_data` for the remaining parameters. 
+        """
+        start_date, end_date = self.__validate_dates(MTRequests.RANGE, start_date, end_date)
+        flags = c.COPY_TICKS_ALL if flags is None else flags
+
+        if chunk <= datetime.timedelta(0): 
+            raise ValueError(f"Invalid chunk size: {chunk}. Chunk size must be positive.")
+
+        window_start = start_date
+        while window_start <= end_date: 
+            window_end = min(window_start + chunk, end_date)
+            ticks = self.backend.copy_ticks_range(symbol, window_start, window_end, flags)
+
+            if ticks is None: 
+                print(f"No tick data available for: {symbol}")
+
+                return 
+            
+            ticks = TickData.from_ticks(symbol, ticks, self.price_dtype)
+            lo = self.__epoch_msc(window_start)
+            hi = self.__epoch_msc(window_end)
+            if window_end < end_date: 
+                keep = (ticks.time_msc >= lo) & (ticks.time_msc < hi)
+            else: 
+                keep = (ticks.time_msc >= lo) & (ticks.time_msc < hi + 1000)
+            
+            if keep.any(): 
+                yield TickData(symbol, ticks.time_msc[keep], ticks.bid[keep], ticks.ask[keep], ticks.flags[keep])
+
+            if window_end >= end_date: 
+                break
+            window_start = window_end
+
+    @staticmethod
+    def __epoch_msc(target: datetime.datetime) -> int: 
+        """
+        Converts a naive datetime, in terminal time, to epoch milliseconds as used by `time_msc`. 
+        """
+        return int((target - datetime.datetime(1970, 1, 1)) / datetime.timedelta(milliseconds=1))
+
+    @classmethod
+    def __validate_dates(
+            cls,
+            request_type: MTRequests,
+            start_date: Optional[Union[datetime.datetime, datetime.date]],
+            end_date: Optional[Union[datetime.datetime, datetime.date]]) -> Tuple[Optional[datetime.datetime], 
+                                                                                 Optional[datetime.datetime]]:
+        """
+        Checks that dates required by the request type are specified, and converts them to datetime. 
+        """
+        if request_type == MTRequests.DATE:
+            if end_date is None:
+                raise ValueError("No end date specified")
+            
+            end_date = cls.__dates_as_datetime(end_date) 
+        
+        elif request_type == MTRequests.RANGE:
+            if start_date is None or end_date is None:
+                raise ValueError("Incomplete dates. Query requires start date and end date.") 
+            
+            start_date = cls.__dates_as_datetime(start_date) 
+            end_date = cls.__dates_as_datetime(end_date) 
+
+            if end_date < start_date:
+                raise ValueError(f"Invalid Dates. Start Date: {start_date} cannot be greater than End Date: \
+                    {end_date}.")
+        
+        return start_date, end_date
 
-        df = self.rates_to_frame(rates)
+    def __fetch(
+            self,
+            symbol: str,
+            resolution: int,
+            request_type: MTRequests,
+            start_date: Optional[datetime.datetime],
+            end_date: Optional[datetime.datetime],
+            start_index: int,
+            num_bars: int) -> Any: 
+        """
+        Gets raw rates for a validated request from MT5, or a frame from the on-disk cache for `range` requests when 
+        the cache is enabled. Returns None if no data is available. 
+        """
+        if request_type == MTRequests.POSITION: 
+            # Gets historical data based on position. 
+            return self.backend.copy_rates_from_pos(symbol, resolution, start_index, num_bars)
         
-        price_data = PriceData(symbol, resolution, df)
+        elif request_type == MTRequests.DATE:
+            # Gets historical data based on date 
+            return self.backend.copy_rates_from(symbol, resolution, end_date, num_bars)
         
-        return price_data
+        elif request_type == MTRequests.RANGE:
+            # Gets historical data based on date range
+            if self.cache is not None: 
+                derived = self.__derived_range(symbol, resolution, start_date, end_date) \
+                    if self.derive_resolutions else None
+                if derived is not None: 
+                    return derived
+                return self.__cached_range(symbol, resolution, start_date, end_date)
+            
+            return self.backend.copy_rates_range(symbol, resolution, start_date, end_date)
+
+        # This is unlikely to happen since if request is invalid, a KeyError will be thrown
+        raise ValueError(f"Something went wrong. Request Type may be invalid")
+
+    def __cached_range(
+            self, 
+            symbol: str, 
+            resolution: int, 
+            start_date: datetime.datetime, 
+            end_date: datetime.datetime) -> Optional['pd.DataFrame']: 
+        """ 
+        Serves a `range` request from the on-disk cache, fetching only the missing head, tail or inner gaps from MT5. 
+        The cache holds float64 prices and both volume columns, shared by loaders of any settings. 
+        """
+        for gap_start, gap_end in self.cache.missing(symbol, resolution, start_date, end_date): 
+            rates = self.backend.copy_rates_range(symbol, resolution, gap_start, gap_end)
+            if rates is None: 
+                return None 
+            
+            self.cache.write(symbol, resolution, self.rates_to_frame(rates, np.float64, True), gap_start, gap_end)
+
+        return self.__select_columns(self.cache.read(symbol, resolution, start_date, end_date))
+
+    def __select_columns(self, data: 'pd.DataFrame') -> 'pd.DataFrame': 
+        """ 
+        Applies `price_dtype` and `volumes` to a frame read from the on-disk cache. 
+        """
+        columns = c.PRICE_COLUMNS + ['spread'] + (c.VOLUME_COLUMNS if self.volumes else [])
+        return data[columns].astype({col: self.price_dtype for col in c.PRICE_COLUMNS})
+
+    def __derived_range(
+            self, 
+            symbol: str, 
+            resolution: int, 
+            start_date: datetime.datetime, 
+            end_date: datetime.datetime) -> Optional['pd.DataFrame']: 
+        """ 
+        Builds a `range` request from finer bars that fully cover it in the on-disk cache. Returns None if no finer 
+        resolution is fully cached. 
+        """
+        lo, hi = bar_window(start_date, end_date, resolution)
+        for source in resample_sources(resolution): 
+            if len(self.cache.missing(symbol, source, lo, hi)) > 0: 
+                continue
+            
+            price = PriceData(symbol, source, self.cache.read(symbol, source, lo, hi)).resample(resolution)
+
+            return self.__select_columns(price.data.loc[start_date:end_date])
+        
+        return None
 
     @staticmethod 
     def timeframe(resolution: Union[int, MTResolutions]) -> str: 
@@ -213,57 +798,108 @@ class MTDataLoader:
             raise TypeError(f"Invalid datetime type for: {target}. Value must be: `datetime.datetime` or `datetime.date`")
 
     @staticmethod 
-    def rates_to_frame(rates: Any) -> pd.DataFrame:
+    def rates_to_frame(
+            rates: Any, 
+            price_dtype: Union[str, np.dtype] = np.float64, 
+            volumes: bool = False) -> 'pd.DataFrame':
         """ 
         Converts raw rates into dataframe with OHLC columns.
+
+        Columns are built directly from the fields of the structured array returned by MT5, and epoch seconds are
+        reinterpreted as a datetime64 index, so no intermediate frame or Series is created. Fields that already have
+        the requested dtype are referenced without copying.
+
+        Parameters
+        ----------
+            rates: np.ndarray
+                Structured array returned by `copy_rates_*`, or any mapping of field name to values. 
+
+            price_dtype: np.dtype = np.float64
+                Dtype of the OHLC columns. 
+
+            volumes: bool = False
+                Keeps `tick_volume` and `real_volume` columns. 
         """
-        data = pd.DataFrame(data=rates)
-        data['time'] = pd.to_datetime(data['time'], unit='s')
-        data = data.loc[:, ['time', 'open', 'high', 'low', 'close', 'spread']]
-        data = data.set_index('time', drop=True)
-        data.index.name = 'date'
+        columns = c.PRICE_COLUMNS + ['spread'] + (c.VOLUME_COLUMNS if volumes else [])
+        fields = dict()
+        for col in columns:
+            values = np.asarray(rates[col])
+            if col in c.PRICE_COLUMNS: 
+                values = values.astype(price_dtype, copy=False)
+            fields[col] = values
 
-        return data 
+        time = np.asarray(rates['time'], dtype=np.int64).view('datetime64[s]')
+        index = pd.DatetimeIndex(time, name='date', copy=False)
 
-    @staticmethod 
-    def get_symbols(category: str) -> List[str]:
+        return pd.DataFrame(fields, index=index, columns=columns, copy=False)
+
+    @hybridmethod
+    def get_symbols(cls, category: str) -> List[str]:
         """
         Gets list of symbols under a specified category
 
+        Called on the class, e.g. `MTDataLoader.get_symbols(category)`, symbols come from the class-level catalog of 
+        the MetaTrader5 terminal. Called on an instance, they come from the catalog of its backend. 
         """
-        symbols = mt5.symbols_get()
-        symbols_list = list()
-        for sym in symbols: 
-            sym_dict = sym._asdict()
-            path, name = sym_dict['path'], sym_dict['name']
-            if category not in path:
-                continue 
-            symbols_list.append(name)
+        return cls.symbol_catalog.get_symbols(category)
 
-        return symbols_list 
+    @get_symbols.instance
+    def get_symbols(self, category: str) -> List[str]:
+        started = time.perf_counter()
+        symbols = self.symbol_catalog.get_symbols(category)
+        self.emit('get_symbols', MTPhases.SYMBOLS, started)
+        return symbols
 
-    @staticmethod 
-    def categories() -> List[str]:
+    @hybridmethod
+    def categories(cls) -> List[str]:
         """ 
-        Gets list of categories derived from symbols path
+        Gets list of categories derived from symbols path. Uses the class-level catalog when called on the class, and 
+        the catalog of the instance backend otherwise. 
         """
-        symbols = mt5.symbols_get()
-        cats = list()
-        for sym in symbols:
-            sym_dict = sym._asdict()
-            cat = '\\'.join(sym_dict['path'].split('\\')[:-1])
-            
-            cats.append(cat)
-        
-        return list(set(cats)) 
-    
+        return cls.symbol_catalog.categories()
 
-    @classmethod 
+    @categories.instance
+    def categories(self) -> List[str]:
+        started = time.perf_counter()
+        categories = self.symbol_catalog.categories()
+        self.emit('categories', MTPhases.SYMBOLS, started)
+        return categories
+
+    @hybridmethod
     @retry(stop=stop_after_attempt(3), retry=retry_if_exception_type(KeyError))
     def get_symbol_properties(cls, symbol: str) -> Tuple[float, float]: 
-
-        symbol_info = mt5.symbol_info(symbol)._asdict()
-        tick_value = symbol_info[c.TICK_VALUE]
-        trade_points = symbol_info[c.POINT]
+        """ 
+        Gets tick value and point of a symbol. Uses the class-level catalog when called on the class, and the catalog 
+        of the instance backend otherwise. 
+        """
+        try: 
+            properties = cls.symbol_catalog.properties([symbol])
+        except KeyError: 
+            cls.symbol_catalog.invalidate()
+            properties = cls.symbol_catalog.properties([symbol])
+        return properties.at[symbol, c.TICK_VALUE], properties.at[symbol, c.POINT]
+
+    @get_symbol_properties.instance
+    @retry(stop=stop_after_attempt(3), retry=retry_if_exception_type(KeyError), before_sleep=record_retry)
+    def get_symbol_properties(self, symbol: str) -> Tuple[float, float]: 
+
+        properties = self.get_symbol_properties_many([symbol])
+        tick_value = properties.at[symbol, c.TICK_VALUE]
+        trade_points = properties.at[symbol, c.POINT]
         return tick_value, trade_points
-    
+
+    def get_symbol_properties_many(self, symbols: List[str]) -> 'pd.DataFrame': 
+        """ 
+        Gets tick value, point, digits and contract size for several symbols from the symbol catalog. 
+
+        If a symbol is missing, the catalog is refreshed once before raising KeyError, in case it was added to the 
+        terminal after the last snapshot. 
+        """
+        started = time.perf_counter()
+        try:
+            properties = self.symbol_catalog.properties(symbols)
+        except KeyError: 
+            self.symbol_catalog.invalidate()
+            properties = self.symbol_catalog.properties(symbols)
+        self.emit('get_symbol_properties', MTPhases.SYMBOLS, started)
+        return properties
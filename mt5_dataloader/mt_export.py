@@ -0,0 +1,244 @@
+"""
+This module contains the export pipeline for `PriceData`. Bars are written as Parquet, Feather (Arrow IPC) or raw `.npy`
+files, partitioned by symbol, timeframe and date. The manifest records the time ranges exported for each series, and
+each export adds part files holding only bars outside them, so existing files are never rewritten. Writes run on a
+background thread, so exports overlap with the next terminal fetch.
+"""
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional, List, Dict, Tuple
+
+import numpy as np
+
+from .mt_lazy import LazyModule
+from .mt_pricedata import PriceData
+from .mt_utils import MTResolutions
+from constants import constants as c
+
+pd = LazyModule('pandas')
+pa = LazyModule('pyarrow')
+pq = LazyModule('pyarrow.parquet')
+feather = LazyModule('pyarrow.feather')
+
+FORMATS = {'parquet': 'parquet', 'feather': 'arrow', 'npy': 'npy'}
+PARTITIONS = {'day': ('datetime64[D]', '%Y-%m-%d'), 'month': ('datetime64[M]', '%Y-%m'),
+              'year': ('datetime64[Y]', '%Y')}
+
+
+class MTExporter:
+
+    manifest_file = 'manifest.json'
+
+    def __init__(
+            self,
+            root: str,
+            fmt: str = 'parquet',
+            partition: str = 'month',
+            compression: Optional[str] = None,
+            max_pending: int = 4):
+        """
+        Parameters
+        ----------
+            root: str
+                Export directory. Files are written to `root/symbol/timeframe/partition/`.
+
+            fmt: str = 'parquet'
+                `parquet`, `feather` (Arrow IPC) or `npy`. Parquet and Feather require `pyarrow`. `.npy` files hold
+                a structured array and can be opened with `np.load(path, mmap_mode='r')`.
+
+            partition: str = 'month'
+                Partition size: `day`, `month` or `year`.
+
+            compression: str = None
+                Compression codec for Parquet and Feather, e.g. `zstd` or `uncompressed`. Library default if None.
+
+            max_pending: int = 4
+                Exports queued for the writer thread before `export` blocks. Bounds memory held by pending exports.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Invalid export format: {fmt}. Valid formats: {list(FORMATS)}")
+        if partition not in PARTITIONS:
+            raise ValueError(f"Invalid partition: {partition}. Valid partitions: {list(PARTITIONS)}")
+        self.root = root
+        self.fmt = fmt
+        self.partition = partition
+        self.compression = compression
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(1)
+        self.pending: List[Future] = list()
+        self.lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self.manifest = self.load_manifest()
+
+    @staticmethod
+    def key(symbol: str, resolution: int) -> str:
+        return f"{symbol}/{MTResolutions.timeframe(resolution)}"
+
+    def series_path(self, symbol: str, resolution: int) -> str:
+        return os.path.join(self.root, symbol, MTResolutions.timeframe(resolution))
+
+    def load_manifest(self) -> Dict[str, dict]:
+        path = os.path.join(self.root, self.manifest_file)
+        if not os.path.exists(path):
+            return dict()
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def save_manifest(self) -> None:
+        path = os.path.join(self.root, self.manifest_file)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, path)
+
+    def last_time(self, symbol: str, resolution: int) -> Optional[int]:
+        """
+        Opening time in epoch seconds of the last exported bar of a series.
+        """
+        ranges = self.ranges(symbol, resolution)
+        return ranges[-1][1] if ranges else None
+
+    def ranges(self, symbol: str, resolution: int) -> List[Tuple[int, int]]:
+        """
+        Sorted, disjoint [first, last] opening times in epoch seconds of the exported spans of a series. Every bar
+        opening within a span has been exported.
+        """
+        entry = self.manifest.get(self.key(symbol, resolution))
+        if entry is None:
+            return list()
+        return [tuple(span) for span in entry['ranges']]
+
+    def export(self, price_data: PriceData) -> Future:
+        """
+        Queues `PriceData` for export and returns immediately. Bars within ranges already exported for the series are
+        skipped, so overlapping exports and streamed chunks only add new bars, older or newer. Blocks while
+        `max_pending` exports are queued.
+        """
+        with self.lock:
+            self.pending = [future for future in self.pending if not future.done()]
+            if len(self.pending) >= self.max_pending:
+                self.pending[0].result()
+            future = self.executor.submit(self.write, price_data)
+            self.pending.append(future)
+        return future
+
+    def flush(self) -> None:
+        """
+        Waits for queued exports and raises the first export error, if any.
+        """
+        with self.lock:
+            pending, self.pending = self.pending, list()
+        for future in pending:
+            future.result()
+
+    def close(self) -> None:
+        self.flush()
+        self.executor.shutdown()
+
+    def __enter__(self) -> 'MTExporter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def write(self, price_data: PriceData) -> int:
+        """
+        Writes new bars of `PriceData` to their partitions on the calling thread. Returns the number of bars written.
+        """
+        symbol, resolution = price_data.symbol, price_data.resolution
+        times = price_data.times
+        if len(times) == 0:
+            return 0
+        ranges = self.ranges(symbol, resolution)
+        new = np.ones(len(times), dtype=bool)
+        if ranges:
+            starts, ends = np.array(ranges, dtype=np.int64).T
+            span = np.searchsorted(starts, times, side='right') - 1
+            new = (span < 0) | (times > ends[np.maximum(span, 0)])
+
+        # Parts are runs of new bars within one partition
+        dtype, label = PARTITIONS[self.partition]
+        keys = times.view('datetime64[s]').astype(dtype)
+        breaks = np.flatnonzero((keys[1:] != keys[:-1]) | (new[1:] != new[:-1])) + 1
+        bounds = np.concatenate([[0], breaks, [len(times)]])
+
+        series_path = self.series_path(symbol, resolution)
+        columns = {col: price_data.column(col) for col in price_data.columns}
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            if not new[lo]:
+                continue
+            directory = os.path.join(series_path, keys[lo].astype(object).strftime(label))
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{times[lo]:011d}_{times[hi - 1]:011d}.{FORMATS[self.fmt]}")
+            self.write_part(path, times[lo:hi], {col: values[lo:hi] for col, values in columns.items()})
+
+        written = int(new.sum())
+        if written > 0:
+            ranges.append((int(times[0]), int(times[-1])))
+            merged = list()
+            for start, end in sorted(ranges):
+                if merged and start <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+            self.manifest[self.key(symbol, resolution)] = {'ranges': merged}
+            self.save_manifest()
+        return written
+
+    def write_part(self, path: str, times: np.ndarray, columns: Dict[str, np.ndarray]) -> None:
+        tmp_path = f"{path}.tmp"
+        if self.fmt == 'npy':
+            dtype = [('time', '<i8')] + [(col, values.dtype.str) for col, values in columns.items()]
+            rates = np.empty(len(times), dtype=dtype)
+            rates['time'] = times
+            for col, values in columns.items():
+                rates[col] = values
+            with open(tmp_path, 'wb') as f:
+                np.save(f, rates)
+        else:
+            arrays = [pa.array(times.view('datetime64[s]'))] + [pa.array(values) for values in columns.values()]
+            table = pa.Table.from_arrays(arrays, names=['date'] + list(columns))
+            if self.fmt == 'parquet':
+                pq.write_table(table, tmp_path, compression=self.compression or 'snappy')
+            else:
+                feather.write_feather(table, tmp_path, compression=self.compression)
+        os.replace(tmp_path, path)
+
+    def parts(self, symbol: str, resolution: int) -> List[str]:
+        """
+        Paths of all exported part files of a series, oldest first.
+        """
+        series_path = self.series_path(symbol, resolution)
+        if not os.path.exists(series_path):
+            return list()
+        parts = list()
+        for directory in sorted(os.listdir(series_path)):
+            names = sorted(name for name in os.listdir(os.path.join(series_path, directory))
+                           if name.endswith(f".{FORMATS[self.fmt]}"))
+            parts.extend(os.path.join(series_path, directory, name) for name in names)
+        return parts
+
+    def read(self, symbol: str, resolution: int) -> 'pd.DataFrame':
+        """
+        Reads an exported series back as a DataFrame indexed by date. Feather and `.npy` parts are memory-mapped.
+        """
+        frames = list()
+        for path in self.parts(symbol, resolution):
+            if self.fmt == 'npy':
+                rates = np.load(path, mmap_mode='r')
+                index = pd.DatetimeIndex(rates['time'].view('datetime64[s]'), name='date')
+                frames.append(pd.DataFrame({col: rates[col] for col in rates.dtype.names[1:]}, index=index))
+                continue
+            if self.fmt == 'parquet':
+                table = pq.read_table(path)
+            else:
+                table = feather.read_table(path, memory_map=True)
+            frames.append(table.to_pandas().set_index('date'))
+
+        if len(frames) == 0:
+            return pd.DataFrame(columns=c.PRICE_COLUMNS + ['spread'], index=pd.DatetimeIndex([], name='date'))
+        data = pd.concat(frames)
+        data.index = data.index.astype('datetime64[s]')
+        return data
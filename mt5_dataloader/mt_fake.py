@@ -0,0 +1,274 @@
+"""
+This module contains a deterministic in-process terminal backend. Rates, ticks and symbols are generated on demand
+with the same layout as the MetaTrader5 module, so the loader can be tested and benchmarked without a terminal.
+Prices are a pure function of symbol and time, so overlapping requests always agree.
+"""
+import time
+import zlib
+import datetime
+from collections import namedtuple
+from typing import Any, Optional, Tuple, List
+
+import numpy as np
+
+from .mt_backend import MTBackend
+from .mt_resample import bar_start
+from .mt_utils import MTResolutions, SymbolCategories
+
+# Layouts of the structured arrays returned by `copy_rates_*` and `copy_ticks_*`
+RATES_DTYPE = np.dtype([('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+                        ('tick_volume', '<u8'), ('spread', '<i4'), ('real_volume', '<u8')])
+TICKS_DTYPE = np.dtype([('time', '<i8'), ('bid', '<f8'), ('ask', '<f8'), ('last', '<f8'), ('volume', '<u8'),
+                        ('time_msc', '<i8'), ('flags', '<u4'), ('volume_real', '<f8')])
+
+# TICK_FLAG_BID | TICK_FLAG_ASK
+TICK_FLAGS = 6
+
+SymbolInfo = namedtuple('SymbolInfo', ['name', 'path', 'description', 'trade_tick_value', 'point', 'digits',
+                                       'trade_contract_size', 'visible'])
+AccountInfo = namedtuple('AccountInfo', ['login', 'server', 'currency'])
+
+FX_MAJORS = ['EURUSD', 'GBPUSD', 'USDCHF', 'USDJPY', 'USDCAD', 'AUDUSD']
+
+
+def mix(values: np.ndarray, seed: int) -> np.ndarray:
+    """
+    SplitMix64 hash of each value, mapped to uniform floats in [0, 1).
+    """
+    x = values.astype(np.uint64) + np.uint64(seed)
+    x = x * np.uint64(0x9E3779B97F4A7C15)
+    x ^= x >> np.uint64(30)
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x = x * np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return (x >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+def to_epoch(value: Any) -> int:
+    """
+    Converts a date argument, as accepted by the MetaTrader5 module, to epoch seconds.
+    """
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            return int(value.timestamp())
+        return int((value - datetime.datetime(1970, 1, 1)).total_seconds())
+    if isinstance(value, datetime.date):
+        return int((datetime.datetime(value.year, value.month, value.day) - datetime.datetime(1970, 1, 1)).days
+                   * 86400)
+    return int(value)
+
+
+class FakeTerminal(MTBackend):
+
+    def __init__(
+            self,
+            num_symbols: int = 100,
+            now: datetime.datetime = datetime.datetime(2024, 6, 28, 12),
+            history_start: datetime.datetime = datetime.datetime(2000, 1, 3),
+            latency: float = 0.0,
+            latency_per_bar: float = 0.0,
+            tick_interval_ms: int = 250,
+            seed: int = 0):
+        """
+        Parameters
+        ----------
+            num_symbols: int = 100
+                Number of symbols returned by `symbols_get`, spread across `SymbolCategories`. FX majors are always
+                included.
+
+            now: datetime
+                Current terminal time. Position requests count back from the bar containing `now`.
+
+            history_start: datetime
+                No bars or ticks exist before this date.
+
+            latency: float = 0.0
+                Seconds slept on every call, to simulate terminal round-trips.
+
+            latency_per_bar: float = 0.0
+                Additional seconds slept for every bar or tick returned.
+
+            tick_interval_ms: int = 250
+                Milliseconds between generated ticks.
+
+            seed: int = 0
+                Seed for generated prices.
+        """
+        self.now = to_epoch(now)
+        self.history_start = to_epoch(history_start)
+        self.latency = latency
+        self.latency_per_bar = latency_per_bar
+        self.tick_interval_ms = tick_interval_ms
+        self.seed = seed
+        self.calls = 0
+        self.symbols = self.make_symbols(num_symbols)
+        self.symbols_by_name = {sym.name: sym for sym in self.symbols}
+
+    @staticmethod
+    def make_symbols(num_symbols: int) -> List[SymbolInfo]:
+        categories = [category.value for category in SymbolCategories if category != SymbolCategories.FX_MAJORS]
+        symbols = [SymbolInfo(name, f"Forex\\{SymbolCategories.FX_MAJORS.value}\\{name}", name,
+                              1.0, 0.001 if name.endswith('JPY') else 0.00001, 3 if name.endswith('JPY') else 5,
+                              100000.0, True)
+                   for name in FX_MAJORS]
+        for i in range(max(num_symbols - len(symbols), 0)):
+            category = categories[i % len(categories)]
+            name = f"SYM{i:05d}"
+            symbols.append(SymbolInfo(name, f"{category}\\{name}", name, 0.01, 0.01, 2, 1.0, True))
+        return symbols
+
+    def wait(self, num_items: int = 0) -> None:
+        self.calls += 1
+        delay = self.latency + self.latency_per_bar * num_items
+        if delay > 0:
+            time.sleep(delay)
+
+    def symbol_seed(self, symbol: str) -> int:
+        return zlib.crc32(symbol.encode()) + self.seed
+
+    def price(self, symbol: str, times: np.ndarray) -> np.ndarray:
+        """
+        Mid price at each epoch second. A sum of slow cycles with a small hashed noise term.
+        """
+        seed = self.symbol_seed(symbol)
+        base = 1.0 + (seed % 1000) / 10.0
+        t = times.astype(np.float64)
+        phase = (seed % 97) / 97.0 * 2 * np.pi
+        trend = 0.05 * np.sin(2 * np.pi * t / (86400 * 365.25) + phase) \
+            + 0.02 * np.sin(2 * np.pi * t / (86400 * 29.3) + 2 * phase) \
+            + 0.005 * np.sin(2 * np.pi * t / (3600 * 7.7) + 3 * phase)
+        noise = (mix(times, seed) - 0.5) * 0.002
+        return base * (1.0 + trend + noise)
+
+    def bar_times(self, timeframe: int, start: int, end: int) -> np.ndarray:
+        """
+        Opening times of bars in [start, end]. Intraday and daily bars skip weekends.
+        """
+        start = max(start, self.history_start)
+        end = min(end, self.now)
+        if end < start:
+            return np.array([], dtype=np.int64)
+
+        if timeframe == MTResolutions.RESOLUTION_MN1.value:
+            months = np.arange(np.datetime64(start, 's').astype('datetime64[M]'),
+                               np.datetime64(end, 's').astype('datetime64[M]') + 1)
+            times = months.astype('datetime64[s]').astype(np.int64)
+        else:
+            step = 604800 if timeframe == MTResolutions.RESOLUTION_W1.value else MTResolutions.seconds(timeframe)
+            first = bar_start(np.array([start]), timeframe)[0]
+            times = np.arange(first, end + 1, step, dtype=np.int64)
+            if timeframe != MTResolutions.RESOLUTION_W1.value:
+                weekday = (times // 86400 + 3) % 7
+                times = times[weekday < 5]
+        return times
+
+    def times_before(self, timeframe: int, end: int, count: int) -> np.ndarray:
+        """
+        Opening times of the last `count` bars opening at or before `end`.
+        """
+        span = count * MTResolutions.seconds(timeframe) * 2 + 7 * 86400
+        while True:
+            times = self.bar_times(timeframe, end - span, end)
+            if len(times) >= count or end - span <= self.history_start:
+                return times[-count:] if count > 0 else times[:0]
+            span *= 2
+
+    def rates(self, symbol: str, timeframe: int, times: np.ndarray) -> np.ndarray:
+        seed = self.symbol_seed(symbol)
+        step = MTResolutions.seconds(timeframe)
+        rates = np.zeros(len(times), dtype=RATES_DTYPE)
+        open_ = self.price(symbol, times)
+        close = self.price(symbol, times + step - 1)
+        wick = np.abs(open_ - close) * 0.5 + open_ * 0.0002 * mix(times, seed + 1)
+        rates['time'] = times
+        rates['open'] = open_
+        rates['close'] = close
+        rates['high'] = np.maximum(open_, close) + wick * mix(times, seed + 2)
+        rates['low'] = np.minimum(open_, close) - wick * mix(times, seed + 3)
+        rates['tick_volume'] = (1 + 500 * mix(times, seed + 4)).astype(np.uint64)
+        rates['spread'] = (5 + 20 * mix(times, seed + 5)).astype(np.int32)
+        return rates
+
+    def ticks(self, symbol: str, time_msc: np.ndarray) -> np.ndarray:
+        info = self.symbols_by_name[symbol]
+        seed = self.symbol_seed(symbol)
+        ticks = np.zeros(len(time_msc), dtype=TICKS_DTYPE)
+        bid = self.price(symbol, time_msc // 1000) * (1.0 + (mix(time_msc, seed + 6) - 0.5) * 1e-5)
+        ticks['time'] = time_msc // 1000
+        ticks['time_msc'] = time_msc
+        ticks['bid'] = bid
+        ticks['ask'] = bid + info.point * (5 + np.floor(20 * mix(time_msc, seed + 5)))
+        ticks['flags'] = TICK_FLAGS
+        return ticks
+
+    def tick_times(self, start_msc: int, end_msc: int) -> np.ndarray:
+        start_msc = max(start_msc, self.history_start * 1000)
+        end_msc = min(end_msc, self.now * 1000)
+        first = -(-start_msc // self.tick_interval_ms) * self.tick_interval_ms
+        times = np.arange(first, end_msc + 1, self.tick_interval_ms, dtype=np.int64)
+        weekday = (times // 86400000 + 3) % 7
+        return times[weekday < 5]
+
+    def initialize(self, path: str) -> bool:
+        self.wait()
+        return True
+
+    def account_info(self) -> Any:
+        return AccountInfo(0, 'FakeTerminal', 'USD')
+
+    def last_error(self) -> Tuple[int, str]:
+        return 1, 'Success'
+
+    def copy_rates_from_pos(self, symbol: str, timeframe: int, start_pos: int, count: int) -> Optional[np.ndarray]:
+        if symbol not in self.symbols_by_name:
+            self.wait()
+            return None
+        times = self.times_before(timeframe, self.now, start_pos + count)
+        times = times[:len(times) - start_pos] if start_pos > 0 else times
+        self.wait(len(times))
+        return self.rates(symbol, timeframe, times)
+
+    def copy_rates_from(self, symbol: str, timeframe: int, date_from: Any, count: int) -> Optional[np.ndarray]:
+        if symbol not in self.symbols_by_name:
+            self.wait()
+            return None
+        times = self.times_before(timeframe, to_epoch(date_from), count)
+        self.wait(len(times))
+        return self.rates(symbol, timeframe, times)
+
+    def copy_rates_range(self, symbol: str, timeframe: int, date_from: Any, date_to: Any) -> Optional[np.ndarray]:
+        if symbol not in self.symbols_by_name:
+            self.wait()
+            return None
+        start, end = to_epoch(date_from), to_epoch(date_to)
+        times = self.bar_times(timeframe, start, end)
+        times = times[times >= start]
+        self.wait(len(times))
+        return self.rates(symbol, timeframe, times)
+
+    def copy_ticks_from(self, symbol: str, date_from: Any, count: int, flags: int) -> Optional[np.ndarray]:
+        if symbol not in self.symbols_by_name:
+            self.wait()
+            return None
+        start_msc = to_epoch(date_from) * 1000
+        span = count * self.tick_interval_ms * 2 + 3 * 86400000
+        times = self.tick_times(start_msc, start_msc + span)[:count]
+        self.wait(len(times))
+        return self.ticks(symbol, times)
+
+    def copy_ticks_range(self, symbol: str, date_from: Any, date_to: Any, flags: int) -> Optional[np.ndarray]:
+        if symbol not in self.symbols_by_name:
+            self.wait()
+            return None
+        times = self.tick_times(to_epoch(date_from) * 1000, to_epoch(date_to) * 1000 + 999)
+        self.wait(len(times))
+        return self.ticks(symbol, times)
+
+    def symbols_get(self, group: Optional[str] = None) -> Tuple[SymbolInfo, ...]:
+        self.wait(len(self.symbols))
+        return tuple(self.symbols)
+
+    def symbol_info(self, symbol: str) -> Optional[SymbolInfo]:
+        self.wait()
+        return self.symbols_by_name.get(symbol)
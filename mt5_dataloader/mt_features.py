@@ -0,0 +1,336 @@
+"""
+This module contains a feature pipeline for bar data. Features are declared once, e.g. `['returns', 'atr_14',
+'volatility_20']`, and computed with numpy kernels over the bars of all series at once, concatenated into one array.
+Results are kept per series. Appended bars only compute the new rows, from the tail of the stored inputs that their
+rolling windows reach.
+"""
+from collections import namedtuple
+from typing import Optional, Union, Dict, List, Tuple, Sequence, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .mt_pricedata import PriceData
+
+SeriesKey = Tuple[str, int]
+Batch = Union['PriceData', List['PriceData'], Dict[str, 'PriceData']]
+
+# New bars computed per pass over concatenated series. Small passes keep temporary arrays in cache, while the short
+# tails of incremental updates of many series still run in one pass.
+BATCH_ROWS = 1 << 16
+
+# Input series and rolling statistic of each feature kind. Features without a statistic are the input itself.
+KERNELS = {
+    'returns': ('returns', None),
+    'log_returns': ('log_returns', None),
+    'atr': ('true_range', 'mean'),
+    'volatility': ('log_returns', 'std'),
+    'spread_mean': ('spread', 'mean'),
+    'spread_std': ('spread', 'std'),
+}
+
+
+class Feature(namedtuple('Feature', ['kind', 'window'], defaults=(None,))):
+    """
+    Feature declaration. `window` is the number of bars of rolling features. `atr` is the simple moving average of
+    the true range, and `volatility` the standard deviation of log returns.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def parse(cls, feature: Union[str, 'Feature']) -> 'Feature':
+        """
+        Parses names such as `returns` or `atr_14`.
+        """
+        if isinstance(feature, Feature):
+            return feature.validate()
+        kind, _, window = feature.rpartition('_')
+        if kind in KERNELS and window.isdigit():
+            return cls(kind, int(window)).validate()
+        return cls(feature).validate()
+
+    def validate(self) -> 'Feature':
+        if self.kind not in KERNELS:
+            raise ValueError(f"Invalid feature: {self.kind}. Valid features: {list(KERNELS)}")
+        statistic = KERNELS[self.kind][1]
+        if statistic is None and self.window is not None:
+            raise ValueError(f"{self.kind} does not take a window.")
+        if statistic is not None and (self.window is None or self.window < (2 if statistic == 'std' else 1)):
+            raise ValueError(f"Invalid window for {self.kind}: {self.window}")
+        return self
+
+    @property
+    def name(self) -> str:
+        return self.kind if self.window is None else f"{self.kind}_{self.window}"
+
+    @property
+    def input(self) -> str:
+        return KERNELS[self.kind][0]
+
+
+def inputs(
+        close: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        spread: np.ndarray,
+        prev_close: np.ndarray,
+        starts: np.ndarray,
+        names: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    Input series of concatenated bars. `prev_close` holds the close before the first bar of each segment, NaN at the
+    start of a series.
+    """
+    previous = np.empty(len(close), dtype=np.float64)
+    previous[1:] = close[:-1]
+    previous[starts] = prev_close
+    values = dict()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if 'returns' in names:
+            values['returns'] = close / previous - 1
+        if 'log_returns' in names:
+            values['log_returns'] = np.log(close / previous)
+    if 'true_range' in names:
+        # fmax and fmin ignore the missing close before the first bar, leaving high - low
+        values['true_range'] = np.fmax(high, previous) - np.fmin(low, previous)
+    if 'spread' in names:
+        values['spread'] = spread.astype(np.float64)
+    return values
+
+
+def rolling(values: np.ndarray, window: int, starts: np.ndarray, std: bool) -> Dict[str, np.ndarray]:
+    """
+    Rolling mean, and standard deviation if `std`, over `window` rows of concatenated segments starting at `starts`.
+    Windows do not cross segments, and rows whose window holds a NaN or crosses the start of their segment are NaN,
+    as with `pandas` rolling windows. Sums are differences of running sums, so each statistic is one pass.
+    """
+    n = len(values)
+    # Invalid rows are counted with a difference array: +1 where an invalid run starts, -1 after it ends
+    marks = np.zeros(n + window, dtype=np.int32)
+    np.add.at(marks, starts, 1)
+    np.add.at(marks, starts + window - 1, -1)
+    finite = np.isfinite(values)
+    missing = np.flatnonzero(~finite)
+    if len(missing) > 0:
+        values = np.where(finite, values, 0.0)
+        np.add.at(marks, missing, 1)
+        np.add.at(marks, missing + window, -1)
+    invalid = np.cumsum(marks[:n]) > 0
+
+    def window_sums(series: np.ndarray) -> np.ndarray:
+        running = np.empty(n + 1)
+        running[0] = 0.0
+        np.cumsum(series, out=running[1:])
+        sums = np.empty(n)
+        sums[:window - 1] = np.nan
+        if n >= window:
+            np.subtract(running[window:], running[:n + 1 - window], out=sums[window - 1:])
+        return sums
+
+    total = window_sums(values)
+    results = dict()
+    if std:
+        variance = window_sums(values * values)
+        variance -= total * total / window
+        variance /= window - 1
+        np.maximum(variance, 0.0, out=variance)
+        np.sqrt(variance, out=variance)
+        variance[invalid] = np.nan
+        results['std'] = variance
+    total /= window
+    total[invalid] = np.nan
+    results['mean'] = total
+    return results
+
+
+class SeriesState:
+    """
+    Features of one series, in buffers grown with headroom so that appends are amortized O(new bars), and the last
+    closes and inputs reached by the rolling windows of later bars.
+    """
+    __slots__ = ('length', 'last_time', 'tails', 'features')
+
+    def __init__(self, tail_names: Sequence[str], feature_names: Sequence[str]):
+        self.length = 0
+        self.last_time = None
+        self.tails = {name: np.empty(0) for name in tail_names}
+        self.features = {name: np.empty(0) for name in feature_names}
+
+    def tail(self, name: str, row: int, num_rows: int) -> np.ndarray:
+        """
+        Stored values of rows [row - num_rows, row), clipped to the rows still stored.
+        """
+        values = self.tails[name]
+        end = len(values) - (self.length - row)
+        return values[max(end - num_rows, 0):end]
+
+    def reserve(self, length: int) -> None:
+        capacity = len(next(iter(self.features.values()), ()))
+        if length <= capacity:
+            return
+        capacity = length + max(length // 8, 1024)
+        for name, values in self.features.items():
+            self.features[name] = np.empty(capacity)
+            self.features[name][:self.length] = values[:self.length]
+
+    def write(
+            self,
+            row: int,
+            last_time: int,
+            tails: Dict[str, np.ndarray],
+            features: Dict[str, np.ndarray],
+            keep: int) -> None:
+        """
+        Writes rows from `row` on, keeping the last `keep` values of each tail.
+        """
+        end = row + len(next(iter(tails.values())))
+        if self.length == 0:
+            # New series keep the computed arrays instead of copying them
+            self.features = dict(features)
+        else:
+            self.reserve(end)
+            for name, values in features.items():
+                self.features[name][row:end] = values
+        for name, values in tails.items():
+            stored = self.tail(name, row, min(row, keep))
+            self.tails[name] = np.concatenate((stored, values))[-keep:]
+        self.length = end
+        self.last_time = last_time
+
+
+class FeaturePipeline:
+
+    def __init__(self, features: Sequence[Union[str, Feature]]):
+        """
+        Parameters
+        ----------
+            features: List[str] or List[Feature]
+                Features to compute: `returns`, `log_returns`, and `atr_<window>`, `volatility_<window>`,
+                `spread_mean_<window>` and `spread_std_<window>` for rolling features, e.g. `atr_14`.
+        """
+        self.features = [Feature.parse(feature) for feature in features]
+        self.input_names = sorted({feature.input for feature in self.features})
+        self.states: Dict[SeriesKey, SeriesState] = dict()
+
+    @staticmethod
+    def key(price_data: 'PriceData') -> SeriesKey:
+        return price_data.symbol, price_data.resolution
+
+    def get(self, symbol: str, resolution: int) -> Dict[str, np.ndarray]:
+        """
+        Features of a series, as views of the stored buffers. Views are overwritten by later updates, so copy them
+        to keep a snapshot.
+        """
+        state = self.states[(symbol, resolution)]
+        return {name: values[:state.length] for name, values in state.features.items()}
+
+    def compute(self, data: Batch) -> Dict[SeriesKey, Dict[str, np.ndarray]]:
+        """
+        Computes features from scratch for every series given, replacing stored results.
+        """
+        data = self.as_list(data)
+        for price_data in data:
+            self.states.pop(self.key(price_data), None)
+        return self.update(data)
+
+    def update(self, data: Batch) -> Dict[SeriesKey, Dict[str, np.ndarray]]:
+        """
+        Adds bars to stored series, or computes new series. Bars older than the last stored bar are skipped, a bar at
+        the time of the last stored bar replaces it, e.g. the still-forming bar, and newer bars are appended. Data
+        may overlap the stored bars, e.g. a window of `LiveBars`.
+
+        Returns
+        -------
+            Features of the updated series, keyed by (symbol, resolution).
+        """
+        batch = list()
+        for price_data in self.as_list(data):
+            key = self.key(price_data)
+            state = self.states.get(key)
+            if state is None:
+                state = self.states[key] = SeriesState(['close'] + self.input_names, [f.name for f in self.features])
+            times = price_data.times
+            skip, row = 0, state.length
+            if state.length > 0:
+                skip = int(np.searchsorted(times, state.last_time, side='left'))
+                if skip < len(times) and times[skip] == state.last_time:
+                    row -= 1
+            if skip < len(times):
+                batch.append((key, state, price_data, skip, row))
+
+        # Series are processed in passes of about BATCH_ROWS new bars, to bound temporary arrays
+        rows = 0
+        first = 0
+        for i, (_, _, price_data, skip, _) in enumerate(batch):
+            rows += len(price_data) - skip
+            if rows >= BATCH_ROWS or i == len(batch) - 1:
+                self.run(batch[first:i + 1])
+                first, rows = i + 1, 0
+        return {key: self.get(*key) for key, *_ in batch}
+
+    @staticmethod
+    def as_list(data: Batch) -> List['PriceData']:
+        if isinstance(data, dict):
+            return list(data.values())
+        if isinstance(data, (list, tuple)):
+            return list(data)
+        return [data]
+
+    def run(self, batch: List[Tuple[SeriesKey, SeriesState, 'PriceData', int, int]]) -> None:
+        """
+        Computes the new rows of every series in one pass. New bars of all series are concatenated, inputs are
+        computed for them, and each rolling feature runs once over the new inputs prefixed with the stored inputs
+        its window reaches.
+        """
+        lengths = np.array([len(price_data) - skip for _, _, price_data, skip, _ in batch])
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+        def column(name: str) -> np.ndarray:
+            return np.concatenate([price_data.column(name)[skip:] for _, _, price_data, skip, _ in batch])
+
+        close = column('close').astype(np.float64, copy=False)
+        prev_close = np.array([state.tail('close', row, 1)[0] if row > 0 else np.nan
+                               for _, state, _, _, row in batch])
+        new_inputs = inputs(close, column('high'), column('low'), column('spread'), prev_close, starts,
+                            self.input_names)
+
+        new_features = dict()
+        for (name, window), features in self.rolling_groups().items():
+            if window is None:
+                for feature in features:
+                    new_features[feature.name] = new_inputs[name]
+                continue
+            # Stored input rows reached by the windows of the first new rows
+            heads = [min(window - 1, row) for _, _, _, _, row in batch]
+            parts = list()
+            for (_, state, _, _, row), head, start, length in zip(batch, heads, starts, lengths):
+                parts.append(state.tail(name, row, head))
+                parts.append(new_inputs[name][start:start + length])
+            segment_lengths = lengths + np.array(heads)
+            segment_starts = np.concatenate(([0], np.cumsum(segment_lengths)[:-1]))
+            stats = rolling(np.concatenate(parts), window, segment_starts,
+                            any(KERNELS[feature.kind][1] == 'std' for feature in features))
+            # Keep the rows of new bars only
+            new_rows = slice(None)
+            if any(heads):
+                new_rows = np.ones(int(segment_lengths.sum()), dtype=bool)
+                for segment_start, head in zip(segment_starts, heads):
+                    new_rows[segment_start:segment_start + head] = False
+            for feature in features:
+                new_features[feature.name] = stats[KERNELS[feature.kind][1]][new_rows]
+
+        keep = max([2] + [feature.window for feature in self.features if feature.window is not None])
+        for (_, state, price_data, _, row), start, length in zip(batch, starts, lengths):
+            rows = slice(start, start + length)
+            tails = {name: values[rows] for name, values in new_inputs.items()}
+            tails['close'] = close[rows]
+            state.write(row, int(price_data.times[-1]), tails,
+                        {name: values[rows] for name, values in new_features.items()}, keep)
+
+    def rolling_groups(self) -> Dict[Tuple[str, Optional[int]], List[Feature]]:
+        """
+        Features grouped by input and window, so that features sharing a window share its sums.
+        """
+        groups = dict()
+        for feature in self.features:
+            groups.setdefault((feature.input, feature.window), list()).append(feature)
+        return groups
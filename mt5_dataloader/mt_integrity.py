@@ -0,0 +1,285 @@
+"""
+This module contains vectorized integrity checks and repairs for bar data. A check is a single O(n) pass over the
+time and OHLC arrays of a `PriceData`, detecting non-monotonic times, duplicates, missing bars against the resolution
+step and a session calendar, bars outside the calendar, inconsistent OHLC values, zero-range bars and spread outliers.
+"""
+from collections import namedtuple
+from typing import Optional, Dict, Tuple
+
+import numpy as np
+
+from .mt_pricedata import PriceData
+from .mt_resample import bars_to_frame
+from .mt_utils import MTResolutions
+from constants import constants as c
+
+# `weekdays` trades Monday to Friday in terminal time. None treats every step as a trading slot.
+CALENDARS = ('weekdays', None)
+
+# Days between the Monday before the epoch and the epoch (a Thursday)
+MONDAY_OFFSET = 3
+
+
+class IntegrityReport(namedtuple('IntegrityReport', ['bars', 'non_monotonic', 'duplicates', 'gaps', 'missing',
+                                                     'outside_calendar', 'invalid_ohlc', 'zero_range',
+                                                     'spread_outliers'])):
+    """
+    Positions of flagged bars, in the order of the checked data. `gaps` holds the positions of bars following a gap,
+    and `missing` the number of bars missing before each of them.
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self) -> bool:
+        return all(len(getattr(self, field)) == 0 for field in self._fields[1:])
+
+    def summary(self) -> Dict[str, int]:
+        """
+        Count of flagged bars per check. `missing` is the total number of missing bars.
+        """
+        summary = {field: len(getattr(self, field)) for field in self._fields[1:]}
+        summary['bars'] = self.bars
+        summary['missing'] = int(self.missing.sum())
+        return summary
+
+
+def slots(times: np.ndarray, resolution: int, calendar: Optional[str] = 'weekdays') -> np.ndarray:
+    """
+    Index of the trading slot of each bar time, so that consecutive bars differ by one slot. Times outside the
+    calendar map to the next trading slot.
+    """
+    if resolution == MTResolutions.RESOLUTION_MN1.value:
+        return times.view('datetime64[s]').astype('datetime64[M]').astype(np.int64)
+    step = MTResolutions.seconds(resolution)
+    if calendar is None or resolution == MTResolutions.RESOLUTION_W1.value:
+        return times // step
+
+    per_day = 86400 // step
+    days = times // 86400 + MONDAY_OFFSET
+    weekday = days % 7
+    trading_days = days // 7 * 5 + np.minimum(weekday, 5)
+    return trading_days * per_day + np.where(weekday < 5, times % 86400 // step, 0)
+
+
+def advance(times: np.ndarray, offsets: np.ndarray, resolution: int, calendar: Optional[str] = 'weekdays') -> np.ndarray:
+    """
+    Opening time `offsets` trading slots after each of `times`. Times are expected to be aligned to the resolution.
+    """
+    if resolution == MTResolutions.RESOLUTION_MN1.value:
+        months = times.view('datetime64[s]').astype('datetime64[M]') + offsets
+        return months.astype('datetime64[s]').astype(np.int64)
+    step = MTResolutions.seconds(resolution)
+    if calendar is None or resolution == MTResolutions.RESOLUTION_W1.value:
+        return times + offsets * step
+
+    per_day = 86400 // step
+    slot = slots(times, resolution, calendar) + offsets
+    trading_days = slot // per_day
+    days = trading_days // 5 * 7 + trading_days % 5 - MONDAY_OFFSET
+    return days * 86400 + slot % per_day * step
+
+
+def outside_calendar(times: np.ndarray, resolution: int, calendar: Optional[str] = 'weekdays') -> np.ndarray:
+    """
+    Mask of bars opening outside the session calendar. W1 and MN1 bars are never outside.
+    """
+    if calendar is None or resolution in (MTResolutions.RESOLUTION_W1.value, MTResolutions.RESOLUTION_MN1.value):
+        return np.zeros(len(times), dtype=bool)
+    return (times + MONDAY_OFFSET * 86400) % 604800 >= 5 * 86400
+
+
+def find_gaps(
+        times: np.ndarray,
+        resolution: int,
+        calendar: Optional[str] = 'weekdays') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Positions of bars following missing bars, and the number of bars missing before each, in sorted times. Slots are
+    only computed where consecutive bars are not one step apart.
+    """
+    if resolution == MTResolutions.RESOLUTION_MN1.value:
+        candidates = np.arange(len(times) - 1)
+    else:
+        candidates = np.flatnonzero(np.diff(times) != MTResolutions.seconds(resolution))
+    skipped = slots(times[candidates + 1], resolution, calendar) - slots(times[candidates], resolution, calendar) - 1
+    gaps = np.flatnonzero(skipped > 0)
+    return candidates[gaps] + 1, skipped[gaps]
+
+
+def spread_limit(spread: np.ndarray, spread_threshold: float) -> float:
+    """
+    Median plus `spread_threshold` median absolute deviations, with a floor of one point. Integer spreads use
+    counts of each value instead of sorting.
+    """
+    if spread.dtype.kind not in 'iu' or spread.min() < 0 or spread.max() >= 1 << 20:
+        median = np.median(spread)
+        return median + spread_threshold * max(np.median(np.abs(spread - median)), 1.0)
+
+    def weighted_median(values: np.ndarray, counts: np.ndarray) -> float:
+        ranks = np.cumsum(counts)
+        total = ranks[-1]
+        lower = values[np.searchsorted(ranks, (total - 1) // 2, side='right')]
+        upper = values[np.searchsorted(ranks, total // 2, side='right')]
+        return (lower + upper) / 2
+
+    counts = np.bincount(spread)
+    values = np.arange(len(counts))
+    median = weighted_median(values, counts)
+    deviation = np.abs(values - median)
+    order = np.argsort(deviation, kind='stable')
+    return median + spread_threshold * max(weighted_median(deviation[order], counts[order]), 1.0)
+
+
+def invalid_ohlc(open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """
+    Mask of bars with high below open or close, low above open or close, non-positive low, or non-finite prices.
+    """
+    bound = np.maximum(open_, close)
+    valid = high >= bound
+    np.minimum(open_, close, out=bound)
+    valid &= low <= bound
+    valid &= low > 0
+    valid &= high < np.inf
+    return ~valid
+
+
+def check(
+        price_data: PriceData,
+        calendar: Optional[str] = 'weekdays',
+        spread_threshold: float = 10.0) -> IntegrityReport:
+    """
+    Checks bar data in a single vectorized pass.
+
+    Parameters
+    ----------
+        price_data: PriceData
+            Data to check.
+
+        calendar: str = 'weekdays'
+            Session calendar for missing bars and bars outside the calendar. `weekdays` trades Monday to Friday, and
+            None expects a bar at every step. W1 and MN1 bars are checked without a calendar.
+
+        spread_threshold: float = 10.0
+            Spreads above the median by more than `spread_threshold` times the median absolute deviation, with a
+            floor of one point, are flagged as outliers.
+    """
+    if calendar not in CALENDARS:
+        raise ValueError(f"Invalid calendar: {calendar}. Valid calendars: {CALENDARS}")
+    resolution = price_data.resolution
+    times = price_data.times
+    delta = np.diff(times)
+    non_monotonic = np.flatnonzero(delta < 0) + 1
+
+    # Duplicates, gaps and calendar checks run in time order
+    order = None
+    if len(non_monotonic) > 0:
+        order = np.argsort(times, kind='stable')
+        times = times[order]
+        delta = np.diff(times)
+    duplicates = np.flatnonzero(delta == 0) + 1
+
+    outside = np.flatnonzero(outside_calendar(times, resolution, calendar))
+    if len(outside) > 0:
+        inside = np.delete(np.arange(len(times)), outside)
+        gaps, missing = find_gaps(times[inside], resolution, calendar)
+        gaps = inside[gaps]
+    else:
+        gaps, missing = find_gaps(times, resolution, calendar)
+    if order is not None:
+        duplicates, gaps, outside = order[duplicates], order[gaps], order[outside]
+
+    high, low = price_data.column('high'), price_data.column('low')
+    invalid = np.flatnonzero(invalid_ohlc(price_data.column('open'), high, low, price_data.column('close')))
+    zero_range = np.flatnonzero(high == low)
+
+    spread = price_data.column('spread')
+    spread_outliers = np.flatnonzero(spread > spread_limit(spread, spread_threshold)) if len(spread) > 0 \
+        else np.array([], dtype=np.int64)
+
+    return IntegrityReport(len(times), non_monotonic, duplicates, gaps, missing, outside, invalid, zero_range,
+                           spread_outliers)
+
+
+def repair(
+        price_data: PriceData,
+        calendar: Optional[str] = 'weekdays',
+        dedupe: bool = True,
+        drop_invalid: bool = True,
+        drop_outside_calendar: bool = True,
+        fill: bool = False) -> PriceData:
+    """
+    Returns repaired data, sorted by time. Data that needs no repair is returned as is.
+
+    Parameters
+    ----------
+        calendar: str = 'weekdays'
+            Session calendar, see `check`.
+
+        dedupe: bool = True
+            Keeps the last bar of each duplicated time.
+
+        drop_invalid: bool = True
+            Drops bars with inconsistent or non-finite OHLC values.
+
+        drop_outside_calendar: bool = True
+            Drops bars outside the session calendar, e.g. weekend spill-over.
+
+        fill: bool = False
+            Inserts missing bars, forward-filling OHLC with the previous close, the previous spread and zero volumes.
+            Expects bar times aligned to the resolution.
+    """
+    if calendar not in CALENDARS:
+        raise ValueError(f"Invalid calendar: {calendar}. Valid calendars: {CALENDARS}")
+    resolution = price_data.resolution
+    columns = {col: price_data.column(col) for col in price_data.columns}
+    times = price_data.times
+    changed = False
+    if np.any(np.diff(times) < 0):
+        changed = True
+        order = np.argsort(times, kind='stable')
+        times = times[order]
+        columns = {col: values[order] for col, values in columns.items()}
+
+    mask = np.ones(len(times), dtype=bool)
+    if dedupe and len(times) > 0:
+        mask[:-1] = times[1:] != times[:-1]
+    if drop_invalid:
+        mask &= ~invalid_ohlc(*(columns[col] for col in c.PRICE_COLUMNS))
+    if drop_outside_calendar:
+        mask &= ~outside_calendar(times, resolution, calendar)
+    if not mask.all():
+        changed = True
+        times = times[mask]
+        columns = {col: values[mask] for col, values in columns.items()}
+
+    if fill:
+        gaps, missing = find_gaps(times, resolution, calendar)
+        if len(gaps) > 0:
+            changed = True
+            # Each bar before a gap is repeated once per missing bar
+            counts = np.ones(len(times), dtype=np.int64)
+            counts[gaps - 1] += missing
+            source = np.repeat(np.arange(len(times)), counts)
+            starts = np.cumsum(counts) - counts
+            filled = np.ones(len(source), dtype=bool)
+            filled[starts] = False
+            offsets = np.arange(len(source)) - starts[source]
+
+            previous_close = columns['close'][source[filled]]
+            for col, values in columns.items():
+                values = values[source]
+                if col in c.PRICE_COLUMNS:
+                    values[filled] = previous_close
+                elif col in c.VOLUME_COLUMNS:
+                    values[filled] = 0
+                columns[col] = values
+            times = times[source]
+            times[filled] = advance(times[filled], offsets[filled], resolution, calendar)
+
+    if not changed:
+        return price_data
+    if price_data.compact:
+        prices = np.stack([columns[col] for col in c.PRICE_COLUMNS])
+        volumes = {col: columns[col] for col in c.VOLUME_COLUMNS if col in columns}
+        return PriceData.from_arrays(price_data.symbol, resolution, np.ascontiguousarray(times), prices,
+                                     columns['spread'], volumes)
+    return PriceData(price_data.symbol, resolution, bars_to_frame({'time': times, **columns}))
@@ -0,0 +1,42 @@
+"""
+This module contains a lazily imported module proxy. Heavy dependencies such as pandas are only imported when first
+used, so importing the package and metadata-only paths stay fast.
+"""
+import importlib
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule:
+    """
+    Stands in for a module until one of its attributes is accessed. Attributes are cached on the proxy after the
+    first lookup.
+
+    Usage: `pd = LazyModule('pandas')`
+    """
+
+    def __init__(self, name: str):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def load(self) -> ModuleType:
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self.__dict__['_name'])
+            self.__dict__['_module'] = module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__['_module'] is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        value = getattr(self.load(), attr)
+        self.__dict__[attr] = value
+        return value
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self.load(), attr, value)
+
+    def __repr__(self) -> str:
+        return f"<lazy module '{self.__dict__['_name']}'>"
@@ -0,0 +1,158 @@
+"""
+This module contains incremental live bar updates. Each subscription keeps the last N bars of a symbol and resolution
+in a ring buffer. Updates only request bars from the last stored bar onwards, so their cost scales with the number of
+new bars rather than the window size. The still-forming bar is replaced on every update.
+"""
+import time
+import threading
+from typing import Optional, Union, Dict, Tuple, List
+
+import numpy as np
+
+from .mt_dataloader import MTDataLoader
+from .mt_pricedata import PriceData
+from .mt_utils import MTResolutions, MTPhases
+from constants import constants as c
+
+SubscriptionKey = Tuple[str, int]
+
+
+class BarRing:
+    """
+    Fixed-size ring buffer of bars. Every slot is stored twice, at `slot` and `slot + capacity`, so the last `size`
+    bars are always contiguous and can be returned as views.
+    """
+
+    def __init__(self, capacity: int, price_dtype: Union[str, np.dtype] = np.float64, volumes: bool = False):
+        if capacity <= 0:
+            raise ValueError(f"Invalid capacity: {capacity}. Capacity must be positive.")
+        self.capacity = capacity
+        self.count = 0
+        self.time = np.zeros(2 * capacity, dtype=np.int64)
+        self.prices = np.zeros((len(c.PRICE_COLUMNS), 2 * capacity), dtype=price_dtype)
+        self.spread = np.zeros(2 * capacity, dtype=np.int32)
+        self.volumes = {col: np.zeros(2 * capacity, dtype=np.uint64) for col in c.VOLUME_COLUMNS} if volumes \
+            else dict()
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    @property
+    def last_time(self) -> Optional[int]:
+        if self.count == 0:
+            return None
+        return int(self.time[(self.count - 1) % self.capacity])
+
+    def write(self, rates: np.ndarray, replace_last: bool = False) -> None:
+        """
+        Appends bars, replacing the last stored bar first if `replace_last`. Only the last `capacity` bars are kept.
+        """
+        if replace_last and self.count > 0:
+            self.count -= 1
+        rates = rates[-self.capacity:]
+        slots = (self.count + np.arange(len(rates))) % self.capacity
+        for offset in (0, self.capacity):
+            self.time[slots + offset] = rates['time']
+            for row, col in enumerate(c.PRICE_COLUMNS):
+                self.prices[row, slots + offset] = rates[col]
+            self.spread[slots + offset] = rates['spread']
+            for col, values in self.volumes.items():
+                values[slots + offset] = rates[col]
+        self.count += len(rates)
+
+    def window(
+            self,
+            num_bars: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Views of time, OHLC, spread and volumes for the last `num_bars` bars, oldest first.
+        """
+        size = len(self) if num_bars is None else min(num_bars, len(self))
+        end = self.count % self.capacity + self.capacity
+        start = end - size
+        volumes = {col: values[start:end] for col, values in self.volumes.items()}
+        return self.time[start:end], self.prices[:, start:end], self.spread[start:end], volumes
+
+
+class LiveBars:
+
+    def __init__(self, loader: MTDataLoader, size: int = 1000):
+        """
+        Parameters
+        ----------
+            loader: MTDataLoader
+                Loader whose backend is polled. Its `price_dtype` and `volumes` options apply to stored bars.
+
+            size: int = 1000
+                Default number of bars kept per subscription.
+        """
+        self.loader = loader
+        self.size = size
+        self.rings: Dict[SubscriptionKey, BarRing] = dict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(symbol: str, resolution: Union[int, MTResolutions]) -> SubscriptionKey:
+        return symbol, MTDataLoader.get_resolution(resolution).value
+
+    def subscribe(self, symbol: str, resolution: Union[int, MTResolutions], size: Optional[int] = None) -> int:
+        """
+        Adds a subscription and loads its initial window. Returns the number of bars loaded.
+        """
+        key = self.key(symbol, resolution)
+        with self.lock:
+            if key not in self.rings:
+                self.rings[key] = BarRing(self.size if size is None else size, self.loader.price_dtype,
+                                          self.loader.volumes)
+        return self.update_one(key)
+
+    def unsubscribe(self, symbol: str, resolution: Union[int, MTResolutions]) -> None:
+        with self.lock:
+            self.rings.pop(self.key(symbol, resolution), None)
+
+    def subscriptions(self) -> List[SubscriptionKey]:
+        return list(self.rings)
+
+    def update(self) -> Dict[SubscriptionKey, int]:
+        """
+        Polls the terminal for every subscription. Returns the number of new bars per subscription, not counting the
+        replaced forming bar.
+        """
+        return {key: self.update_one(key) for key in self.subscriptions()}
+
+    def update_one(self, key: SubscriptionKey) -> int:
+        """
+        Requests bars from the last stored bar onwards, doubling the request size until it overlaps the stored bars.
+        The last stored bar is replaced, as it may have been still forming when it was stored.
+        """
+        symbol, resolution = key
+        ring = self.rings[key]
+        last_time = ring.last_time
+        started = time.perf_counter()
+
+        count = ring.capacity if last_time is None else min(2, ring.capacity)
+        while True:
+            rates = self.loader.backend.copy_rates_from_pos(symbol, resolution, 0, count)
+            if rates is None or len(rates) == 0:
+                self.loader.emit('live_update', MTPhases.NO_DATA, symbol=symbol)
+                return 0
+            if last_time is None or rates['time'][0] <= last_time or len(rates) < count or count >= ring.capacity:
+                break
+            count = min(2 * count, ring.capacity)
+
+        if last_time is not None:
+            rates = rates[rates['time'] >= last_time]
+        replace_last = last_time is not None and len(rates) > 0 and rates['time'][0] == last_time
+        ring.write(rates, replace_last)
+
+        new_bars = len(rates) - int(replace_last)
+        self.loader.emit('live_update', MTPhases.TERMINAL, started, symbol, len(rates), rates.nbytes)
+        return new_bars
+
+    def window(self, symbol: str, resolution: Union[int, MTResolutions], num_bars: Optional[int] = None) -> PriceData:
+        """
+        Compact `PriceData` of the last `num_bars` bars, oldest first. Arrays are views of the ring buffer and are
+        overwritten by later updates, so copy them to keep a snapshot.
+        """
+        key = self.key(symbol, resolution)
+        time_, prices, spread, volumes = self.rings[key].window(num_bars)
+        return PriceData.from_arrays(symbol, key[1], time_, prices, spread, volumes)
@@ -0,0 +1,69 @@
+"""
+This module contains the instrumentation events emitted by MTDataLoader and an in-memory aggregator. Hooks are plain
+callables receiving one `MTEvent` per phase of a call. Timing phases (`validate`, `terminal`, `convert`, `symbols`)
+carry a duration, while `retry` and `nodata` events are counters.
+"""
+import threading
+from collections import namedtuple, defaultdict
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from .mt_lazy import LazyModule
+
+pd = LazyModule('pandas')
+
+MTEvent = namedtuple('MTEvent', ['operation', 'phase', 'seconds', 'symbol', 'bars', 'nbytes'])
+MTHook = Callable[[MTEvent], None]
+
+PERCENTILES = [50, 90, 99]
+
+
+class MetricsAggregator:
+    """
+    Hook collecting events in memory, summarized per operation and phase with percentile durations.
+
+    Usage: `loader.add_hook(MetricsAggregator())`
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.seconds: Dict[Tuple[str, str], List[float]] = defaultdict(list)
+        self.bars: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.nbytes: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    def __call__(self, event: MTEvent) -> None:
+        key = (event.operation, event.phase)
+        with self.lock:
+            self.seconds[key].append(event.seconds)
+            self.bars[key] += event.bars
+            self.nbytes[key] += event.nbytes
+
+    def reset(self) -> None:
+        with self.lock:
+            self.seconds.clear()
+            self.bars.clear()
+            self.nbytes.clear()
+
+    def count(self, operation: str, phase: str) -> int:
+        return len(self.seconds.get((operation, phase), []))
+
+    def summary(self) -> 'pd.DataFrame':
+        """
+        Returns one row per operation and phase with the event count, total and percentile durations in
+        milliseconds, and the bars and bytes returned.
+        """
+        with self.lock:
+            keys = sorted(self.seconds)
+            rows = list()
+            for key in keys:
+                seconds = np.array(self.seconds[key]) * 1000
+                row = {'count': len(seconds), 'total_ms': seconds.sum()}
+                row.update({f'p{p}_ms': value for p, value in zip(PERCENTILES, np.percentile(seconds, PERCENTILES))})
+                row.update(max_ms=seconds.max(), bars=self.bars[key], bytes=self.nbytes[key])
+                rows.append(row)
+
+        index = pd.MultiIndex.from_tuples(keys, names=['operation', 'phase']) if keys else \
+            pd.MultiIndex.from_arrays([[], []], names=['operation', 'phase'])
+        columns = ['count', 'total_ms'] + [f'p{p}_ms' for p in PERCENTILES] + ['max_ms', 'bars', 'bytes']
+        return pd.DataFrame(rows, index=index, columns=columns)
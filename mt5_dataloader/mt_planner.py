@@ -0,0 +1,254 @@
+"""
+This module contains a planner for batches of bar requests. Requests of the same symbol and resolution are resolved to
+absolute time spans, overlapping and adjacent `range` spans are merged into as few `copy_rates_range` calls as
+possible, and each request is sliced out of the shared result instead of being fetched on its own.
+"""
+import datetime
+from collections import namedtuple, defaultdict
+from typing import Optional, List, Union, Dict, Tuple, Any
+
+import numpy as np
+
+from .mt_dataloader import MTDataLoader
+from .mt_pricedata import PriceData, epoch_seconds
+from .mt_utils import MTRequests, MTResolutions
+
+BarRequest = namedtuple('BarRequest', ['symbol', 'resolution', 'request_type', 'start_date', 'end_date',
+                                       'start_index', 'num_bars'], defaults=(None, None, 0, 99000))
+
+# Span bounds of segments without a known first or last bar
+NO_START = np.iinfo(np.int64).min
+NO_END = np.iinfo(np.int64).max
+
+
+class PlanReport(namedtuple('PlanReport', ['requests', 'calls', 'bars_requested', 'bars_fetched'])):
+    """
+    Terminal calls made for a batch, against one call per request, and bars fetched against bars returned. Merging
+    adjacent spans may fetch a few bars no request asked for, so `bars_saved` can be negative.
+    """
+    __slots__ = ()
+
+    @property
+    def calls_saved(self) -> int:
+        return self.requests - self.calls
+
+    @property
+    def bars_saved(self) -> int:
+        return self.bars_requested - self.bars_fetched
+
+
+class Segment:
+    """
+    Bars fetched by one terminal call. Every bar opening within [start, end] is present. Segments fetched by position
+    keep `offset`, the position of their last bar counted back from the current bar.
+    """
+    __slots__ = ('price_data', 'times', 'start', 'end', 'offset')
+
+    def __init__(self, price_data: PriceData, start: int, end: int, offset: Optional[int] = None):
+        self.price_data = price_data
+        self.times = price_data.times
+        self.start = start
+        self.end = end
+        self.offset = offset
+
+    def range(self, start: int, end: int) -> Optional[PriceData]:
+        """
+        Bars opening within [start, end], or None if the segment does not span it.
+        """
+        if start < self.start or end > self.end:
+            return None
+        lo = int(np.searchsorted(self.times, start, side='left'))
+        hi = int(np.searchsorted(self.times, end, side='right'))
+        return self.price_data.slice(lo, hi)
+
+    def date(self, end: int, num_bars: int) -> Optional[PriceData]:
+        """
+        Last `num_bars` bars opening at or before `end`, or None if some of them may be missing from the segment.
+        """
+        if end < self.start or end > self.end:
+            return None
+        hi = int(np.searchsorted(self.times, end, side='right'))
+        if hi < num_bars and self.start != NO_START:
+            return None
+        return self.price_data.slice(max(hi - num_bars, 0), hi)
+
+    def position(self, start_index: int, num_bars: int) -> Optional[PriceData]:
+        """
+        Bars [start_index, start_index + num_bars) counted back from the current bar, or None if the segment was not
+        fetched by position or does not hold them.
+        """
+        if self.offset is None or start_index < self.offset:
+            return None
+        hi = len(self.times) - (start_index - self.offset)
+        if hi - num_bars < 0 and self.start != NO_START:
+            return None
+        return self.price_data.slice(max(hi - num_bars, 0), max(hi, 0))
+
+
+def merge_spans(spans: List[Tuple[int, int]], step: int) -> List[Tuple[int, int]]:
+    """
+    Merges overlapping spans, and spans starting within one bar of the end of the previous span, into sorted disjoint
+    spans.
+    """
+    merged = list()
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1] + step:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def as_datetime(epoch: int) -> datetime.datetime:
+    return datetime.datetime(1970, 1, 1) + datetime.timedelta(seconds=int(epoch))
+
+
+class RequestPlanner:
+
+    def __init__(self, loader: MTDataLoader):
+        """
+        Parameters
+        ----------
+            loader: MTDataLoader
+                Loader used for terminal calls. Range calls go through its on-disk cache, if configured.
+        """
+        self.loader = loader
+
+    def run(self, requests: List[Union[BarRequest, Dict[str, Any]]]) -> Tuple[List[Optional[PriceData]], PlanReport]:
+        """
+        Fetches a batch of requests with as few terminal calls as possible.
+
+        Requests are grouped by symbol and resolution. In each group:
+            1. `pos` requests are fetched with a single call reaching the deepest of them.
+            2. `range` requests not spanned by that call are merged into disjoint spans, one `copy_rates_range` call
+               each.
+            3. `date` requests not spanned by earlier calls are fetched latest first, so that each call may span the
+               requests ending before it.
+
+        Parameters
+        ----------
+            requests: List[BarRequest] or List[dict]
+                Requests, as `BarRequest` or dicts of `get_price_data` arguments.
+
+        Returns
+        -------
+            Tuple of the data of each request, in order, and a `PlanReport`. Data are slices of the shared results,
+            views for compact loaders, and None where no data is available.
+        """
+        requests = [request if isinstance(request, BarRequest) else BarRequest(**request) for request in requests]
+        groups = defaultdict(list)
+        for i, request in enumerate(requests):
+            resolution, request_type, start_date, end_date = self.loader.normalize_request(
+                request.resolution, request.request_type, request.start_date, request.end_date)
+            groups[(request.symbol, resolution)].append((i, request._replace(
+                resolution=resolution, request_type=request_type, start_date=start_date, end_date=end_date)))
+
+        results: List[Optional[PriceData]] = [None] * len(requests)
+        calls = 0
+        bars_fetched = 0
+        for (symbol, resolution), group in groups.items():
+            segments = self.plan_group(symbol, resolution, group, results)
+            calls += len(segments)
+            bars_fetched += sum(len(segment.times) for segment in segments if segment is not None)
+
+        for request, result in zip(requests, results):
+            if result is None:
+                print(f"No data available for: {request.symbol} {MTDataLoader.timeframe(request.resolution)}")
+        bars_requested = sum(len(result) for result in results if result is not None)
+        return results, PlanReport(len(requests), calls, bars_requested, bars_fetched)
+
+    def fetch(
+            self,
+            symbol: str,
+            resolution: int,
+            request_type: MTRequests,
+            start: int = 0,
+            end: int = 0,
+            start_index: int = 0,
+            num_bars: int = 0) -> Optional[Segment]:
+        """
+        Makes one terminal call and wraps the result in a segment. Returns None if no data is available.
+        """
+        start_date, end_date = as_datetime(start), as_datetime(end)
+        rates = self.loader.fetch_rates(symbol, resolution, request_type, start_date, end_date, start_index, num_bars)
+        if rates is None:
+            return None
+        price_data = self.loader.to_price_data(symbol, resolution, rates)
+        times = price_data.times
+        exhausted = len(times) < num_bars
+
+        if request_type == MTRequests.RANGE:
+            return Segment(price_data, start, end)
+        if request_type == MTRequests.DATE:
+            return Segment(price_data, NO_START if exhausted or len(times) == 0 else int(times[0]), end)
+        first = NO_START if exhausted or len(times) == 0 else int(times[0])
+        # Bars after the last bar of a position call only exist if it started behind the current bar
+        last = NO_END if start_index == 0 else (int(times[-1]) if len(times) > 0 else NO_START)
+        return Segment(price_data, first, last, start_index)
+
+    def plan_group(
+            self,
+            symbol: str,
+            resolution: int,
+            group: List[Tuple[int, BarRequest]],
+            results: List[Optional[PriceData]]) -> List[Optional[Segment]]:
+        """
+        Fetches the requests of one symbol and resolution, writing each slice to `results`. Returns the segments of
+        all calls made, None for calls without data.
+        """
+        by_type = defaultdict(list)
+        for i, request in group:
+            by_type[request.request_type].append((i, request))
+        fetched: List[Optional[Segment]] = list()
+        segments: List[Segment] = list()
+
+        positions = by_type[MTRequests.POSITION]
+        if positions:
+            first = min(request.start_index for _, request in positions)
+            last = max(request.start_index + request.num_bars for _, request in positions)
+            segment = self.fetch(symbol, resolution, MTRequests.POSITION, start_index=first, num_bars=last - first)
+            fetched.append(segment)
+            if segment is not None:
+                segments.append(segment)
+                for i, request in positions:
+                    results[i] = segment.position(request.start_index, request.num_bars)
+
+        ranges = [(i, epoch_seconds(request.start_date), epoch_seconds(request.end_date))
+                  for i, request in by_type[MTRequests.RANGE]]
+        pending = list()
+        for i, start, end in ranges:
+            results[i] = self.find(segments, 'range', start, end)
+            if results[i] is None:
+                pending.append((i, start, end))
+        spans = merge_spans([(start, end) for _, start, end in pending], MTResolutions.seconds(resolution))
+        for start, end in spans:
+            segment = self.fetch(symbol, resolution, MTRequests.RANGE, start, end)
+            fetched.append(segment)
+            if segment is not None:
+                segments.append(segment)
+        for i, start, end in pending:
+            results[i] = self.find(segments, 'range', start, end)
+
+        dates = [(i, epoch_seconds(request.end_date), request.num_bars) for i, request in by_type[MTRequests.DATE]]
+        dates.sort(key=lambda item: (-item[1], -item[2]))
+        for i, end, num_bars in dates:
+            results[i] = self.find(segments, 'date', end, num_bars)
+            if results[i] is not None:
+                continue
+            segment = self.fetch(symbol, resolution, MTRequests.DATE, end=end, num_bars=num_bars)
+            fetched.append(segment)
+            if segment is not None:
+                segments.append(segment)
+                results[i] = segment.date(end, num_bars)
+        return fetched
+
+    @staticmethod
+    def find(segments: List[Segment], kind: str, *args) -> Optional[PriceData]:
+        """
+        Slices a request out of the first segment spanning it.
+        """
+        for segment in segments:
+            result = getattr(segment, kind)(*args)
+            if result is not None:
+                return result
+        return None
@@ -0,0 +1,192 @@
+"""
+This module contains downsampled price plots. Series are reduced to the pixel width of the axes before drawing, with
+Largest-Triangle-Three-Buckets (LTTB) for lines and OHLC re-aggregation for candles, so rendering time does not grow
+with the number of bars. Zooming re-downsamples only the visible window.
+"""
+from typing import Optional, Tuple, Dict, Any, TYPE_CHECKING
+
+import numpy as np
+
+from .mt_lazy import LazyModule
+from constants import constants as c
+
+if TYPE_CHECKING:
+    from .mt_pricedata import PriceData
+
+mdates = LazyModule('matplotlib.dates')
+mcollections = LazyModule('matplotlib.collections')
+
+PLOT_KINDS = ('line', 'candle')
+
+# Minimum width of a candle in pixels
+CANDLE_PIXELS = 3
+
+UP_COLOR = 'tab:green'
+DOWN_COLOR = 'tab:red'
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of `threshold` points selected with Largest-Triangle-Three-Buckets. The first and last points are always
+    kept, and each bucket in between keeps the point forming the largest triangle with the point kept in the previous
+    bucket and the mean of the next bucket. One pass over the data, looping over buckets only.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+    # Means of each bucket, followed by the last point as the mean after the final bucket
+    mean_x = np.append(np.add.reduceat(x[:n - 1], starts) / counts, x[-1])
+    mean_y = np.append(np.add.reduceat(y[:n - 1], starts) / counts, y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        lo, hi = starts[bucket], ends[bucket]
+        ax, ay = x[previous], y[previous]
+        nx, ny = mean_x[bucket + 1], mean_y[bucket + 1]
+        area = np.abs((ax - nx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (ny - ay))
+        previous = lo + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def ohlc_buckets(
+        time: np.ndarray,
+        open_: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        num_buckets: int) -> Tuple[np.ndarray, ...]:
+    """
+    Re-aggregates sorted bars into at most `num_buckets` buckets of equal time span: first open, max high, min low and
+    last close. Buckets without bars are skipped. Returns the start time of each bucket, the bucket span in seconds
+    and the four price columns.
+    """
+    n = len(time)
+    if n == 0:
+        return time, 0, open_, high, low, close
+    span = max(-(-(int(time[-1]) - int(time[0]) + 1) // max(num_buckets, 1)), 1)
+    keys = (time - time[0]) // span
+    starts = np.flatnonzero(np.diff(keys, prepend=-1))
+    ends = np.append(starts[1:], n)
+    return (time[0] + keys[starts] * span, span, open_[starts], np.maximum.reduceat(high, starts),
+            np.minimum.reduceat(low, starts), close[ends - 1])
+
+
+class PricePlot:
+
+    def __init__(
+            self,
+            price_data: 'PriceData',
+            ax: Any,
+            kind: str = 'line',
+            src: str = 'close',
+            points: Optional[int] = None):
+        """
+        Parameters
+        ----------
+            price_data: PriceData
+                Data to plot.
+
+            ax: matplotlib.axes.Axes
+                Axes to draw on.
+
+            kind: str = 'line'
+                `line` plots `src`, `candle` plots OHLC candles.
+
+            src: str = 'close'
+                Column plotted by line plots.
+
+            points: int = None
+                Points drawn for lines, or candles drawn. Defaults to twice the axes width in pixels for lines, and
+                one candle per three pixels.
+        """
+        if kind not in PLOT_KINDS:
+            raise ValueError(f"Invalid plot kind: {kind}. Valid kinds: {list(PLOT_KINDS)}")
+        if kind == 'line' and src not in price_data.columns:
+            raise ValueError(f"{src} not found in columns. Columns: {price_data.columns}")
+
+        self.ax = ax
+        self.kind = kind
+        self.points = points
+        self.times = price_data.times
+        if kind == 'line':
+            self.values: Dict[str, np.ndarray] = {src: price_data.column(src)}
+        else:
+            self.values = {col: price_data.column(col) for col in c.PRICE_COLUMNS}
+        self.origin = mdates.date2num(np.datetime64(0, 's'))
+        self.artists = list()
+        self.window = None
+
+        ax.xaxis_date()
+        if len(self.times) > 0:
+            self.draw(int(self.times[0]), int(self.times[-1]))
+            ax.set_xlim(self.to_num(self.times[0]), self.to_num(self.times[-1]))
+            ax.autoscale_view(scalex=False)
+        ax.set_autoscalex_on(False)
+        ax.callbacks.connect('xlim_changed', self.on_xlim_changed)
+
+    def to_num(self, times: Any) -> Any:
+        """
+        Converts epoch seconds to matplotlib date numbers.
+        """
+        return self.origin + np.asarray(times) / 86400
+
+    def budget(self) -> int:
+        if self.points is not None:
+            return self.points
+        pixels = max(int(self.ax.bbox.width), 1)
+        return pixels * 2 if self.kind == 'line' else max(pixels // CANDLE_PIXELS, 1)
+
+    def draw(self, start: int, end: int) -> None:
+        """
+        Downsamples bars opening in [start, end], plus one bar on each side, and replaces the drawn artists.
+        """
+        lo = max(int(np.searchsorted(self.times, start, side='left')) - 1, 0)
+        hi = min(int(np.searchsorted(self.times, end, side='right')) + 1, len(self.times))
+        if self.window == (lo, hi):
+            return
+        self.window = (lo, hi)
+        for artist in self.artists:
+            artist.remove()
+        times = self.times[lo:hi]
+
+        if self.kind == 'line':
+            values = next(iter(self.values.values()))[lo:hi]
+            selected = lttb(times, values, self.budget())
+            self.artists = self.ax.plot(self.to_num(times[selected]), values[selected], linewidth=1)
+            return
+
+        start_times, span, open_, high, low, close = ohlc_buckets(
+            times, *(self.values[col][lo:hi] for col in c.PRICE_COLUMNS), self.budget())
+        x = self.to_num(start_times + span / 2)
+        half_width = span / 86400 * 0.4
+        colors = np.where(close >= open_, UP_COLOR, DOWN_COLOR)
+
+        wicks = np.stack([np.stack([x, low], axis=1), np.stack([x, high], axis=1)], axis=1)
+        bottom, top = np.minimum(open_, close), np.maximum(open_, close)
+        bodies = np.stack([np.stack([x - half_width, bottom], axis=1), np.stack([x - half_width, top], axis=1),
+                           np.stack([x + half_width, top], axis=1), np.stack([x + half_width, bottom], axis=1)],
+                          axis=1)
+        self.artists = [
+            self.ax.add_collection(mcollections.LineCollection(wicks, colors=colors, linewidths=1), autolim=False),
+            self.ax.add_collection(mcollections.PolyCollection(bodies, facecolors=colors, edgecolors=colors),
+                                   autolim=False)]
+        if len(low) > 0:
+            self.ax.update_datalim([(x[0], low.min()), (x[-1], high.max())])
+
+    def on_xlim_changed(self, ax: Any) -> None:
+        """
+        Re-downsamples the visible window after a zoom or pan.
+        """
+        left, right = ax.get_xlim()
+        self.draw(int((left - self.origin) * 86400), int(np.ceil((right - self.origin) * 86400)))
+        ax.figure.canvas.draw_idle()
@@ -0,0 +1,247 @@
+"""
+This module contains a pool of worker processes, each bound to its own MT5 terminal. The MetaTrader5 module allows a
+single terminal connection per process, so history downloads are sharded across one process per terminal. Bar arrays
+are returned through shared memory instead of pickled DataFrames.
+"""
+import queue
+import itertools
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional, List, Union, Any, Dict, Tuple
+
+import numpy as np
+
+from .mt_dataloader import MTDataLoader
+from .mt_lazy import LazyModule
+from .mt_pricedata import PriceData
+from .mt_utils import MTRequests, MTResolutions
+
+pd = LazyModule('pandas')
+
+JobKey = Tuple[str, int]
+
+# Seconds between liveness checks of the workers while waiting for results
+POLL_SECONDS = 1.0
+
+
+def frame_to_rates(data: 'pd.DataFrame') -> np.ndarray:
+    """
+    Converts a frame built by `MTDataLoader.rates_to_frame` back into a structured rates array.
+    """
+    dtype = [('time', '<i8')] + [(col, data[col].dtype.str) for col in data.columns]
+    rates = np.empty(len(data), dtype=dtype)
+    rates['time'] = data.index.values.astype('datetime64[s]').astype(np.int64)
+    for col in data.columns:
+        rates[col] = data[col].to_numpy()
+    return rates
+
+
+def run_worker(worker_id: int, path: str, loader_kwargs: Dict[str, Any], jobs: Any, results: Any) -> None:
+    """
+    Worker process loop. Connects to one terminal, then fetches rates for each job and writes them to a new shared
+    memory block. Blocks are kept open until the parent releases them, as Windows frees named shared memory once the
+    last handle is closed.
+    """
+    try:
+        loader = MTDataLoader(path=path, **loader_kwargs)
+        loader.launch_mt5()
+    except Exception as e:
+        results.put(('failed', worker_id, repr(e)))
+        return
+
+    blocks = dict()
+    while True:
+        message = jobs.get()
+        if message is None:
+            break
+
+        if message[0] == 'release':
+            block = blocks.pop(message[1], None)
+            if block is not None:
+                block.close()
+            continue
+
+        _, job_id, symbol, resolution, request_type, start_date, end_date, start_index, num_bars = message
+        try:
+            rates = loader.fetch_rates(symbol, resolution, request_type, start_date, end_date, start_index, num_bars)
+            if rates is None:
+                results.put((job_id, worker_id, None, None, 0,
+                             ('nodata', f"No data available for: {symbol} {MTResolutions.timeframe(resolution)}")))
+                continue
+            if isinstance(rates, pd.DataFrame):
+                rates = frame_to_rates(rates)
+            rates = np.ascontiguousarray(rates)
+
+            block = SharedMemory(create=True, size=max(rates.nbytes, 1))
+            np.ndarray(rates.shape, dtype=rates.dtype, buffer=block.buf)[:] = rates
+            blocks[block.name] = block
+            results.put((job_id, worker_id, block.name, rates.dtype.descr, len(rates), None))
+        except Exception as e:
+            results.put((job_id, worker_id, None, None, 0, ('error', repr(e))))
+
+    for block in blocks.values():
+        block.close()
+
+
+class MTTerminalPool:
+
+    def __init__(
+            self,
+            paths: List[str],
+            context: Optional[Any] = None,
+            **loader_kwargs):
+        """
+        Parameters
+        ----------
+            paths: List[str]
+                Paths to MT5 executables. One worker process is launched per terminal.
+
+            context: multiprocessing context = None
+                Used to create worker processes and queues. Defaults to the `spawn` context.
+
+            loader_kwargs:
+                Passed to `MTDataLoader` in each worker, e.g. `price_dtype` or `volumes`. `price_dtype`, `volumes` and
+                `compact` are also applied when converting results in the parent process.
+        """
+        self.paths = paths
+        self.context = context if context is not None else multiprocessing.get_context('spawn')
+        self.loader_kwargs = loader_kwargs
+        self.price_dtype = loader_kwargs.get('price_dtype', np.float64)
+        self.volumes = loader_kwargs.get('volumes', False)
+        self.compact = loader_kwargs.get('compact', False)
+        self.workers = list()
+        self.queues = list()
+        self.results = None
+        # Job ids increase across batches, so results left over from an earlier batch are never mistaken for jobs
+        # of the current one
+        self.job_ids = itertools.count()
+
+    def start(self) -> None:
+        """
+        Launches one worker process per terminal.
+        """
+        if len(self.workers) > 0:
+            return
+        self.results = self.context.Queue()
+        for worker_id, path in enumerate(self.paths):
+            jobs = self.context.Queue()
+            worker = self.context.Process(
+                target=run_worker, args=(worker_id, path, self.loader_kwargs, jobs, self.results))
+            worker.daemon = True
+            worker.start()
+            self.workers.append(worker)
+            self.queues.append(jobs)
+
+    def close(self) -> None:
+        """
+        Stops all worker processes.
+        """
+        for jobs in self.queues:
+            jobs.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.workers = list()
+        self.queues = list()
+
+    def __enter__(self) -> 'MTTerminalPool':
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def get_price_data_many(
+            self,
+            symbols: List[str],
+            resolutions: List[Union[int, MTResolutions]],
+            request_type: Union[str, MTRequests],
+            start_date: Optional[Any] = None,
+            end_date: Optional[Any] = None,
+            start_index: Optional[int] = 0,
+            num_bars: Optional[int] = 99000) -> Tuple[Dict[JobKey, PriceData], Dict[JobKey, Exception]]:
+        """
+        Fetches every symbol/resolution pair, sharding jobs round-robin across terminals. If a worker process exits,
+        its pending jobs fail with RuntimeError instead of being waited for.
+
+        Returns
+        -------
+            Tuple of `PriceData` keyed by (symbol, resolution value), and a dict of the same keys to exceptions for
+            jobs that failed or returned no data.
+        """
+        self.start()
+
+        requests = [MTDataLoader.normalize_request(resolution, request_type, start_date, end_date)
+                    for resolution in resolutions]
+        jobs = dict()
+        pending = [set() for _ in self.queues]
+        for i, (symbol, (resolution, request, start, end)) in enumerate(itertools.product(symbols, requests)):
+            job_id = next(self.job_ids)
+            worker_id = i % len(self.queues)
+            jobs[job_id] = (symbol, resolution)
+            self.queues[worker_id].put(
+                ('fetch', job_id, symbol, resolution, request, start, end, start_index, num_bars))
+            pending[worker_id].add(job_id)
+
+        results = dict()
+        failures = dict()
+
+        def fail_worker(worker_id: int, error: Exception) -> None:
+            for job_id in pending[worker_id]:
+                failures[jobs[job_id]] = error
+            pending[worker_id] = set()
+
+        while any(pending):
+            try:
+                message = self.results.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                for worker_id, worker in enumerate(self.workers):
+                    if pending[worker_id] and not worker.is_alive():
+                        fail_worker(worker_id, RuntimeError(
+                            f"Worker for terminal {self.paths[worker_id]} exited with code {worker.exitcode}"))
+                continue
+            if message[0] == 'failed':
+                fail_worker(message[1], RuntimeError(
+                    f"Worker for terminal {self.paths[message[1]]} failed to start: {message[2]}"))
+                continue
+
+            job_id, worker_id, name, descr, length, error = message
+            if job_id not in pending[worker_id]:
+                # Result of an earlier batch, or of a job already failed
+                if name is not None:
+                    self.discard_block(worker_id, name)
+                continue
+            pending[worker_id].discard(job_id)
+            key = symbol, resolution = jobs[job_id]
+
+            if error is not None:
+                kind, text = error
+                failures[key] = LookupError(text) if kind == 'nodata' else RuntimeError(text)
+                continue
+
+            block = SharedMemory(name=name)
+            try:
+                rates = np.ndarray(length, dtype=np.dtype(descr), buffer=block.buf).copy()
+            finally:
+                block.close()
+                block.unlink()
+            self.queues[worker_id].put(('release', name))
+
+            if self.compact:
+                results[key] = PriceData.from_rates(symbol, resolution, rates, self.price_dtype, self.volumes)
+            else:
+                df = MTDataLoader.rates_to_frame(rates, self.price_dtype, self.volumes)
+                results[key] = PriceData(symbol, resolution, df)
+
+        return results, failures
+
+    def discard_block(self, worker_id: int, name: str) -> None:
+        """
+        Frees the shared memory block of a result that is not used.
+        """
+        try:
+            block = SharedMemory(name=name)
+        except FileNotFoundError:
+            return
+        block.close()
+        block.unlink()
+        self.queues[worker_id].put(('release', name))
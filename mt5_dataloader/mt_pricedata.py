@@ -3,15 +3,34 @@ This module contains a template to building a type of PriceData. Requests to MT5
 is converted into this object. 
 """
 
-import pandas as pd
-import matplotlib.pyplot as plt
+import datetime
+from typing import Any, Optional, Union, Dict, List, Sequence
 
+import numpy as np
+
+from .mt_features import FeaturePipeline, Feature
+from .mt_lazy import LazyModule
+from .mt_plot import PricePlot
+from .mt_resample import bar_start, aggregate, bars_to_frame, can_resample
 from .mt_utils import MTResolutions
+from constants import constants as c
+
+pd = LazyModule('pandas')
+plt = LazyModule('matplotlib.pyplot')
+
+
+def epoch_seconds(value: Union[datetime.datetime, datetime.date]) -> int:
+    """
+    Converts a naive terminal-time date to epoch seconds.
+    """
+    return int(np.datetime64(value, 's').astype(np.int64))
 
 
 class PriceData:
+
+    __slots__ = ('symbol', 'resolution', 'timeframe', 'time', 'prices', 'spread', 'volumes', '_data')
     
-    def __init__(self, symbol: str, resolution: str, data: pd.DataFrame):
+    def __init__(self, symbol: str, resolution: str, data: Optional['pd.DataFrame'] = None):
         """ 
         Parameters
         ----------
@@ -22,12 +41,169 @@ class PriceData:
                 Resolution of specified data 
 
             data: pd.DataFrame
-                OHLC data 
+                OHLC data. Use `from_arrays` or `from_rates` for compact data backed by numpy arrays. 
         """
         self.symbol = symbol
         self.resolution = resolution
         self.timeframe = MTResolutions.timeframe(self.resolution)
-        self.data = data
+        # Compact data. `time` is None when backed by a DataFrame. 
+        self.time = None
+        self.prices = None
+        self.spread = None
+        self.volumes = None
+        self._data = data
+
+    @classmethod
+    def from_arrays(
+            cls, 
+            symbol: str, 
+            resolution: int, 
+            time: np.ndarray, 
+            prices: np.ndarray, 
+            spread: np.ndarray, 
+            volumes: Optional[Dict[str, np.ndarray]] = None) -> 'PriceData':
+        """ 
+        Builds compact data. The DataFrame is only built on first access of `data`. 
+
+        Parameters
+        ----------
+            time: np.ndarray 
+                Bar opening times in epoch seconds, as int64. 
+
+            prices: np.ndarray
+                OHLC block of shape (4, bars), one contiguous row per price column. 
+
+            spread: np.ndarray 
+                Spread of each bar. 
+
+            volumes: Dict[str, np.ndarray] = None
+                Volume columns, e.g. `tick_volume` and `real_volume`. 
+        """
+        price_data = cls(symbol, resolution)
+        price_data.time = time
+        price_data.prices = prices
+        price_data.spread = spread
+        price_data.volumes = volumes if volumes is not None else dict()
+        return price_data
+
+    @classmethod
+    def from_rates(
+            cls, 
+            symbol: str, 
+            resolution: int, 
+            rates: Any, 
+            price_dtype: Union[str, np.dtype] = np.float64, 
+            volumes: bool = False) -> 'PriceData':
+        """ 
+        Builds compact data from rates returned by the terminal, or from a DataFrame with a datetime index. 
+        """
+        if isinstance(rates, pd.DataFrame): 
+            time = rates.index.values.astype('datetime64[s]').astype(np.int64)
+        else: 
+            time = np.ascontiguousarray(rates['time'], dtype=np.int64)
+        prices = np.empty((len(c.PRICE_COLUMNS), len(time)), dtype=price_dtype)
+        for row, col in enumerate(c.PRICE_COLUMNS): 
+            prices[row] = np.asarray(rates[col])
+        spread = np.ascontiguousarray(rates['spread'])
+        volume_columns = {col: np.ascontiguousarray(rates[col]) for col in c.VOLUME_COLUMNS} if volumes else None
+        return cls.from_arrays(symbol, resolution, time, prices, spread, volume_columns)
+
+    @property
+    def compact(self) -> bool: 
+        return self.time is not None
+
+    @property
+    def data(self) -> 'pd.DataFrame': 
+        """ 
+        OHLC data as a DataFrame indexed by date. Compact data builds it on first access from views of its arrays. 
+        """
+        if self._data is None and self.compact: 
+            index = pd.DatetimeIndex(self.time.view('datetime64[s]'), name='date', copy=False)
+            fields = {col: self.prices[row] for row, col in enumerate(c.PRICE_COLUMNS)}
+            fields['spread'] = self.spread
+            fields.update(self.volumes)
+            self._data = pd.DataFrame(fields, index=index, columns=list(fields), copy=False)
+        return self._data
+
+    @data.setter
+    def data(self, data: 'pd.DataFrame') -> None: 
+        self._data = data
+        self.time = None
+        self.prices = None
+        self.spread = None
+        self.volumes = None
+
+    @property
+    def times(self) -> np.ndarray: 
+        """ 
+        Bar opening times in epoch seconds. 
+        """
+        if self.compact: 
+            return self.time
+        return self._data.index.values.astype('datetime64[s]').astype(np.int64)
+
+    @property
+    def values(self) -> np.ndarray: 
+        """ 
+        OHLC values of shape (bars, 4). A view of the OHLC block for compact data. 
+        """
+        if self.compact: 
+            return self.prices.T
+        return self._data[c.PRICE_COLUMNS].to_numpy()
+
+    @property
+    def columns(self) -> List[str]: 
+        if self.compact: 
+            return c.PRICE_COLUMNS + ['spread'] + list(self.volumes)
+        return list(self._data.columns)
+
+    @property
+    def nbytes(self) -> int: 
+        """ 
+        Memory used by the data. Compact data reports its arrays without building the DataFrame. 
+        """
+        if self.compact: 
+            nbytes = self.time.nbytes + self.prices.nbytes + self.spread.nbytes
+            return nbytes + sum(values.nbytes for values in self.volumes.values())
+        return int(self._data.memory_usage(index=True, deep=True).sum())
+
+    def __len__(self) -> int: 
+        return len(self.time) if self.compact else len(self._data)
+
+    def column(self, name: str) -> np.ndarray: 
+        """ 
+        Values of a single column, without building the DataFrame for compact data. 
+        """
+        if not self.compact: 
+            return self._data[name].to_numpy()
+        if name in c.PRICE_COLUMNS: 
+            return self.prices[c.PRICE_COLUMNS.index(name)]
+        if name == 'spread': 
+            return self.spread
+        return self.volumes[name]
+
+    def between(
+            self, 
+            start: Optional[Union[datetime.datetime, datetime.date]] = None, 
+            end: Optional[Union[datetime.datetime, datetime.date]] = None) -> 'PriceData': 
+        """ 
+        Selects bars opening within [start, end] with a binary search on the bar times. Compact data returns views of 
+        its arrays. 
+        """
+        times = self.times
+        lo = 0 if start is None else int(np.searchsorted(times, epoch_seconds(start), side='left'))
+        hi = len(times) if end is None else int(np.searchsorted(times, epoch_seconds(end), side='right'))
+        return self.slice(lo, hi)
+
+    def slice(self, lo: int, hi: int) -> 'PriceData': 
+        """ 
+        Selects bars [lo, hi) by position. Compact data returns views of its arrays. 
+        """
+        if not self.compact: 
+            return PriceData(self.symbol, self.resolution, self._data.iloc[lo:hi])
+        volumes = {col: values[lo:hi] for col, values in self.volumes.items()}
+        return PriceData.from_arrays(
+            self.symbol, self.resolution, self.time[lo:hi], self.prices[:, lo:hi], self.spread[lo:hi], volumes)
 
     def info(self) -> None:
         """ 
@@ -35,35 +211,82 @@ class PriceData:
         """
         print(f"Symbol: {self.symbol}")
         print(f"Resolution: {self.timeframe}")
-        print(f"Length: {len(self.data)}")
+        print(f"Length: {len(self)}")
+
+    def resample(
+            self, 
+            resolution: Union[int, MTResolutions], 
+            offset: datetime.timedelta = datetime.timedelta(0)) -> 'PriceData':
+        """ 
+        Derives bars of a coarser resolution from this data with vectorized group reductions: first open, max high, 
+        min low, last close and minimum spread. Volume columns, if present, are summed. W1 bars open on Sunday and 
+        MN1 bars on the first day of the month, in terminal time. Compact data stays compact. 
 
-    def show_plot(self, kind: str = 'line', src: str = 'close') -> None:
+        Parameters
+        ----------
+            resolution: MTResolutions 
+                Target resolution. Must be a multiple of the current resolution, or W1/MN1 from D1 or finer. 
+
+            offset: timedelta = 0
+                Shifts bar boundaries, e.g. when a broker's sessions do not start at midnight terminal time. 
         """
-        if kind == 'line':
-            self.data[src].plot(figsize=(12, 6))
-            plt.xlabel('Date')
-            plt.ylabel('Price')
-            plt.title(f'{self.symbol} ({src.capitalize()}) - {self.timeframe.upper()}')
-        elif kind == 'candle':
-            raise NotImplementedError("OHLC plot is not working properly.")
-        else: 
-            raise ValueError(f"Invalid plot kind.")
-        return None 
-        for c in self.data.columns:
-            if c not in self.cols: 
-                raise ValueError(f"{c} not found in columns. Required Columns: {self.cols}")
-            
-        if len(self.data) > 100:
-            print("Showing last 100 rows")
+        if isinstance(resolution, MTResolutions): 
+            resolution = resolution.value 
         
-        data = self.data.copy().tail(10000)
+        if not can_resample(self.resolution, resolution): 
+            raise ValueError(f"Cannot derive {MTResolutions.timeframe(resolution)} bars from {self.timeframe} bars.")
+
+        times = self.times
+        shift = int(offset.total_seconds())
+        keys = bar_start(times - shift, resolution) + shift
 
-        fig = go.Figure(data=go.Candlestick(x=data.index, open=data['open'], high=data['high'], low=data['low'], close=data['close']))
-        fig.update_layout(width=800, height=500)
+        columns = self.columns
+        sums = {col: self.column(col) for col in c.VOLUME_COLUMNS if col in columns}
+        bars = aggregate(
+            keys, 
+            self.column('open'), 
+            self.column('high'), 
+            self.column('low'), 
+            self.column('close'), 
+            self.column('spread'), 
+            **sums)
         
+        if self.compact: 
+            prices = np.stack([bars[col] for col in c.PRICE_COLUMNS])
+            volumes = {col: bars[col] for col in sums}
+            return PriceData.from_arrays(self.symbol, resolution, bars['time'], prices, bars['spread'], volumes)
+        return PriceData(self.symbol, resolution, bars_to_frame(bars))
+
+    def features(self, features: Sequence[Union[str, Feature]]) -> Dict[str, np.ndarray]: 
+        """ 
+        Computes features of this data, e.g. `['returns', 'atr_14', 'volatility_20']`. Use `mt_features.FeaturePipeline` 
+        to compute many series at once and update features incrementally as bars are appended. 
+        """
+        return FeaturePipeline(features).compute(self)[(self.symbol, self.resolution)]
+
+    def show_plot(self, kind: str = 'line', src: str = 'close', points: Optional[int] = None) -> PricePlot:
+        """
+        Plots the data, downsampled to the width of the figure. Zooming re-downsamples the visible window.
+
+        Parameters
+        ----------
+            kind: str = 'line'
+                `line` or `candle`.
+
+            src: str = 'close'
+                Column plotted by line plots.
 
-        fig.show()
+            points: int = None
+                Points drawn for lines, or candles drawn. Defaults to the pixel width of the figure. See
+                `mt_plot.PricePlot`.
         """
-        return None
+        fig, ax = plt.subplots(figsize=(12, 6))
+        plot = PricePlot(self, ax, kind, src, points)
+        ax.set_xlabel('Date')
+        ax.set_ylabel('Price')
+        label = src.capitalize() if kind == 'line' else 'OHLC'
+        ax.set_title(f'{self.symbol} ({label}) - {self.timeframe.upper()}')
+        plt.show()
+        return plot
 
 
@@ -0,0 +1,208 @@
+"""
+This module contains backends to record terminal responses to an archive and replay them offline. Rate and tick arrays
+are stored as raw structured array bytes in one data file, and an append-only index maps each request to its bytes.
+Replayed arrays are read-only views of the memory-mapped data file, so results are byte-for-byte identical to the
+recorded responses.
+"""
+import os
+import json
+import datetime
+import threading
+from collections import namedtuple
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .mt_backend import MTBackend
+
+DATA_FILE = 'data.bin'
+INDEX_FILE = 'index.jsonl'
+# Blobs start on 8 byte boundaries
+ALIGNMENT = 8
+
+
+def request_key(method: str, *args: Any) -> str:
+    """
+    Stable key for a backend call. Dates are stored in ISO format and enums by value.
+    """
+    def normalize(value: Any) -> Any:
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            return value.isoformat()
+        if isinstance(value, np.integer):
+            return int(value)
+        if hasattr(value, 'value'):
+            return value.value
+        return value
+    return json.dumps([method] + [normalize(arg) for arg in args])
+
+
+class RecordingBackend(MTBackend):
+    """
+    Wraps another backend and appends every response to the archive in `path`. Existing archives are extended, and a
+    request recorded twice is replayed with its latest response.
+    """
+
+    def __init__(self, backend: MTBackend, path: str):
+        """
+        Parameters
+        ----------
+            backend: MTBackend
+                Backend serving the requests, usually the terminal.
+
+            path: str
+                Archive directory. Created if it does not exist.
+        """
+        self.backend = backend
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self.data_file = open(os.path.join(path, DATA_FILE), 'ab')
+        self.index_file = open(os.path.join(path, INDEX_FILE), 'a')
+
+    def close(self) -> None:
+        self.data_file.close()
+        self.index_file.close()
+
+    def write(self, key: str, response: Any) -> Any:
+        if response is None:
+            entry = {'kind': 'none'}
+            blob = b''
+        elif isinstance(response, np.ndarray):
+            response = np.ascontiguousarray(response)
+            entry = {'kind': 'array', 'dtype': response.dtype.descr, 'length': len(response)}
+            blob = response.tobytes()
+        else:
+            # Terminal structs, e.g. SymbolInfo, are named tuples
+            single = hasattr(response, '_asdict')
+            records = [response] if single else response
+            entry = {'kind': 'record' if single else 'records'}
+            blob = json.dumps([record._asdict() for record in records]).encode()
+
+        with self.lock:
+            offset = self.data_file.tell()
+            padding = -offset % ALIGNMENT
+            self.data_file.write(b'\0' * padding + blob)
+            self.data_file.flush()
+            entry.update(key=key, offset=offset + padding, nbytes=len(blob))
+            self.index_file.write(json.dumps(entry) + '\n')
+            self.index_file.flush()
+        return response
+
+    def initialize(self, path: str) -> bool:
+        return self.backend.initialize(path)
+
+    def account_info(self) -> Any:
+        return self.write(request_key('account_info'), self.backend.account_info())
+
+    def last_error(self) -> Tuple[int, str]:
+        return self.backend.last_error()
+
+    def copy_rates_from_pos(self, symbol: str, timeframe: int, start_pos: int, count: int) -> Any:
+        key = request_key('copy_rates_from_pos', symbol, timeframe, start_pos, count)
+        return self.write(key, self.backend.copy_rates_from_pos(symbol, timeframe, start_pos, count))
+
+    def copy_rates_from(self, symbol: str, timeframe: int, date_from: Any, count: int) -> Any:
+        key = request_key('copy_rates_from', symbol, timeframe, date_from, count)
+        return self.write(key, self.backend.copy_rates_from(symbol, timeframe, date_from, count))
+
+    def copy_rates_range(self, symbol: str, timeframe: int, date_from: Any, date_to: Any) -> Any:
+        key = request_key('copy_rates_range', symbol, timeframe, date_from, date_to)
+        return self.write(key, self.backend.copy_rates_range(symbol, timeframe, date_from, date_to))
+
+    def copy_ticks_from(self, symbol: str, date_from: Any, count: int, flags: int) -> Any:
+        key = request_key('copy_ticks_from', symbol, date_from, count, flags)
+        return self.write(key, self.backend.copy_ticks_from(symbol, date_from, count, flags))
+
+    def copy_ticks_range(self, symbol: str, date_from: Any, date_to: Any, flags: int) -> Any:
+        key = request_key('copy_ticks_range', symbol, date_from, date_to, flags)
+        return self.write(key, self.backend.copy_ticks_range(symbol, date_from, date_to, flags))
+
+    def symbols_get(self, group: Optional[str] = None) -> Any:
+        return self.write(request_key('symbols_get', group), self.backend.symbols_get(group))
+
+    def symbol_info(self, symbol: str) -> Any:
+        return self.write(request_key('symbol_info', symbol), self.backend.symbol_info(symbol))
+
+
+class ReplayBackend(MTBackend):
+    """
+    Serves requests recorded by `RecordingBackend`. Requests missing from the archive raise LookupError instead of
+    returning no data, so a replayed run cannot silently differ from the recorded one.
+    """
+
+    def __init__(self, path: str):
+        """
+        Parameters
+        ----------
+            path: str
+                Archive directory written by `RecordingBackend`.
+        """
+        self.path = path
+        self.index: Dict[str, Dict[str, Any]] = dict()
+        with open(os.path.join(path, INDEX_FILE)) as f:
+            for line in f:
+                # A partially written last line is ignored
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self.index[entry['key']] = entry
+
+        data_path = os.path.join(path, DATA_FILE)
+        if os.path.getsize(data_path) > 0:
+            self.data = np.memmap(data_path, dtype=np.uint8, mode='r')
+        else:
+            self.data = np.empty(0, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def read(self, key: str) -> Any:
+        try:
+            entry = self.index[key]
+        except KeyError:
+            raise LookupError(f"Request not recorded in archive {self.path}: {key}")
+
+        if entry['kind'] == 'none':
+            return None
+        blob = self.data[entry['offset']:entry['offset'] + entry['nbytes']]
+        if entry['kind'] == 'array':
+            dtype = np.dtype([tuple(field) for field in entry['dtype']])
+            return blob.view(dtype) if entry['length'] > 0 else np.empty(0, dtype=dtype)
+
+        records = json.loads(blob.tobytes())
+        if records:
+            # Records of an entry share their fields
+            record_type = namedtuple('Record', records[0].keys())
+            records = [record_type(**record) for record in records]
+        return tuple(records) if entry['kind'] == 'records' else records[0]
+
+    def initialize(self, path: str) -> bool:
+        return True
+
+    def account_info(self) -> Any:
+        return self.read(request_key('account_info')) if request_key('account_info') in self.index else None
+
+    def last_error(self) -> Tuple[int, str]:
+        return 1, 'Success'
+
+    def copy_rates_from_pos(self, symbol: str, timeframe: int, start_pos: int, count: int) -> Any:
+        return self.read(request_key('copy_rates_from_pos', symbol, timeframe, start_pos, count))
+
+    def copy_rates_from(self, symbol: str, timeframe: int, date_from: Any, count: int) -> Any:
+        return self.read(request_key('copy_rates_from', symbol, timeframe, date_from, count))
+
+    def copy_rates_range(self, symbol: str, timeframe: int, date_from: Any, date_to: Any) -> Any:
+        return self.read(request_key('copy_rates_range', symbol, timeframe, date_from, date_to))
+
+    def copy_ticks_from(self, symbol: str, date_from: Any, count: int, flags: int) -> Any:
+        return self.read(request_key('copy_ticks_from', symbol, date_from, count, flags))
+
+    def copy_ticks_range(self, symbol: str, date_from: Any, date_to: Any, flags: int) -> Any:
+        return self.read(request_key('copy_ticks_range', symbol, date_from, date_to, flags))
+
+    def symbols_get(self, group: Optional[str] = None) -> Any:
+        return self.read(request_key('symbols_get', group))
+
+    def symbol_info(self, symbol: str) -> Any:
+        return self.read(request_key('symbol_info', symbol))
@@ -0,0 +1,127 @@
+"""
+This module contains an in-process LRU cache for `PriceData` keyed on normalized requests. Eviction follows a byte
+budget measured from `PriceData.nbytes`. Requests that may include a still-forming bar expire after a short TTL.
+"""
+import time
+import datetime
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple, Dict, Hashable
+
+from .mt_cache import SETTLE_PERIOD
+from .mt_pricedata import PriceData
+from .mt_utils import MTRequests
+
+RequestKey = Tuple[Hashable, ...]
+
+
+class RequestCache:
+
+    def __init__(self, max_bytes: int, live_ttl: float = 1.0):
+        """
+        Parameters
+        ----------
+            max_bytes: int
+                Memory budget for cached data. Least recently used entries are evicted when exceeded.
+
+            live_ttl: float = 1.0
+                Seconds before entries that may be outdated by new bars expire, i.e. all `pos` requests, which are
+                counted back from the current bar, and `date`/`range` requests ending close to now.
+        """
+        self.max_bytes = max_bytes
+        self.live_ttl = live_ttl
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(
+            symbol: str,
+            resolution: int,
+            request_type: MTRequests,
+            start_date: Optional[datetime.datetime],
+            end_date: Optional[datetime.datetime],
+            start_index: int,
+            num_bars: int) -> RequestKey:
+        """
+        Builds a cache key from a validated request. Parameters ignored by the request type are dropped so they do
+        not split identical requests.
+        """
+        if request_type == MTRequests.POSITION:
+            return symbol, resolution, request_type.value, None, None, start_index, num_bars
+        if request_type == MTRequests.DATE:
+            return symbol, resolution, request_type.value, None, end_date, None, num_bars
+        return symbol, resolution, request_type.value, start_date, end_date, None, None
+
+    @staticmethod
+    def is_live(key: RequestKey) -> bool:
+        """
+        Checks whether the request may change as new bars form. Bars of `pos` requests shift with every new bar,
+        whatever the start index.
+        """
+        _, _, request_type, _, end_date, _, _ = key
+        if request_type == MTRequests.POSITION.value:
+            return True
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return end_date >= now - SETTLE_PERIOD
+
+    def get(self, key: RequestKey) -> Optional[PriceData]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                price_data, nbytes, expires = entry
+                if expires is not None and time.monotonic() > expires:
+                    self.remove(key)
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return price_data
+
+    def contains(self, key: RequestKey) -> bool:
+        """
+        Checks for an unexpired entry without counting a hit or a miss.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry is not None and (entry[2] is None or time.monotonic() <= entry[2])
+
+    def put(self, key: RequestKey, price_data: PriceData) -> None:
+        nbytes = price_data.nbytes
+        if nbytes > self.max_bytes:
+            return
+        expires = time.monotonic() + self.live_ttl if self.is_live(key) else None
+        with self.lock:
+            if key in self.entries:
+                self.remove(key)
+            self.entries[key] = (price_data, nbytes, expires)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                self.remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def remove(self, key: RequestKey) -> None:
+        _, nbytes, _ = self.entries.pop(key)
+        self.nbytes -= nbytes
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns hit, miss and eviction counters with the current number of entries and bytes.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'bytes': self.nbytes
+        }
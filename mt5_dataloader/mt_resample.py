@@ -0,0 +1,114 @@
+"""
+This module contains vectorized helpers to aggregate time-ordered prices into bars of any MTResolutions value. Bars
+are grouped by their opening time and reduced with numpy, without pandas groupby.
+"""
+import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .mt_lazy import LazyModule
+from .mt_utils import MTResolutions
+
+pd = LazyModule('pandas')
+
+# 1970-01-01 is a Thursday. Weekly bars in MT5 open on Sunday.
+EPOCH_WEEKDAY_OFFSET = 3
+
+
+def bar_start(times: np.ndarray, resolution: int) -> np.ndarray:
+    """
+    Returns the opening time of the bar containing each timestamp.
+
+    Parameters
+    ----------
+        times: np.ndarray
+            Epoch seconds (int64)
+
+        resolution: int
+            Target resolution. See MTResolutions
+    """
+    times = np.asarray(times, dtype=np.int64)
+    if resolution == MTResolutions.RESOLUTION_MN1.value:
+        months = times.astype('datetime64[s]').astype('datetime64[M]')
+        return months.astype('datetime64[s]').astype(np.int64)
+    if resolution == MTResolutions.RESOLUTION_W1.value:
+        days = times // 86400
+        return (days - (days - EPOCH_WEEKDAY_OFFSET) % 7) * 86400
+    step = MTResolutions.seconds(resolution)
+    return times - times % step
+
+
+def aggregate(keys: np.ndarray, open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+              spread: np.ndarray, **sums: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Reduces consecutive rows sharing the same key into one bar: first open, max high, min low, last close and
+    minimum spread. Additional keyword columns, e.g. volumes, are summed. Rows must be sorted by key.
+    """
+    if len(keys) == 0:
+        bars = {'time': keys[:0], 'open': open_[:0], 'high': high[:0], 'low': low[:0], 'close': close[:0],
+                'spread': spread[:0]}
+        bars.update({name: values[:0] for name, values in sums.items()})
+        return bars
+
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+
+    bars = {
+        'time': keys[starts],
+        'open': open_[starts],
+        'high': np.maximum.reduceat(high, starts),
+        'low': np.minimum.reduceat(low, starts),
+        'close': close[ends],
+        'spread': np.minimum.reduceat(spread, starts)
+    }
+    bars.update({name: np.add.reduceat(values, starts) for name, values in sums.items()})
+    return bars
+
+
+def can_resample(source: int, target: int) -> bool:
+    """
+    Checks whether bars of the target resolution can be derived exactly from bars of the source resolution.
+    """
+    calendar = (MTResolutions.RESOLUTION_W1.value, MTResolutions.RESOLUTION_MN1.value)
+    if source == target:
+        return True
+    if source in calendar:
+        return False
+    if target in calendar:
+        return MTResolutions.seconds(source) <= MTResolutions.seconds(MTResolutions.RESOLUTION_D1.value)
+    return MTResolutions.seconds(target) % MTResolutions.seconds(source) == 0 and \
+        MTResolutions.seconds(target) > MTResolutions.seconds(source)
+
+
+def sources(target: int) -> List[int]:
+    """
+    Returns resolutions from which the target can be derived, coarsest first.
+    """
+    candidates = [resolution.value for resolution in MTResolutions
+                  if resolution.value != target and can_resample(resolution.value, target)]
+    return sorted(candidates, key=MTResolutions.seconds, reverse=True)
+
+
+def bar_window(start: datetime.datetime, end: datetime.datetime, resolution: int,
+               offset: datetime.timedelta = datetime.timedelta(0)) -> Tuple[datetime.datetime, datetime.datetime]:
+    """
+    Returns the span of finer bars needed to build every complete bar of the target resolution opening within
+    [start, end].
+    """
+    epoch = datetime.datetime(1970, 1, 1)
+    shift = int(offset.total_seconds())
+    times = np.array([(start - epoch) // datetime.timedelta(seconds=1),
+                      (end - epoch) // datetime.timedelta(seconds=1)], dtype=np.int64)
+    lo, hi = bar_start(times - shift, resolution) + shift
+    hi = hi + MTResolutions.seconds(resolution) - 1
+    return epoch + datetime.timedelta(seconds=int(lo)), epoch + datetime.timedelta(seconds=int(hi))
+
+
+def bars_to_frame(bars: Dict[str, np.ndarray]) -> 'pd.DataFrame':
+    """
+    Builds an OHLC frame, in the same layout as `MTDataLoader.rates_to_frame`, from aggregated bars.
+    """
+    index = pd.DatetimeIndex(np.asarray(bars['time'], dtype=np.int64).view('datetime64[s]'), name='date')
+    columns = [col for col in bars.keys() if col != 'time']
+    return pd.DataFrame({col: bars[col] for col in columns}, index=index, columns=columns, copy=False)
@@ -0,0 +1,503 @@
+"""
+This module contains a local data server sharing one terminal connection and its caches across processes. The server
+owns an `MTDataLoader` and answers requests over a Unix socket, or a named pipe on Windows. Bars are returned as
+handles to shared memory blocks owned by the server, so every client maps the same block instead of receiving a copy,
+and identical requests from any process are served from the loader caches without extra terminal calls.
+"""
+import os
+import sys
+import stat
+import getpass
+import tempfile
+import weakref
+import threading
+from collections import OrderedDict
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Listener, Client, Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional, Union, Any, Dict, List, Tuple, Callable
+
+import numpy as np
+
+from .mt_dataloader import MTDataLoader
+from .mt_pricedata import PriceData
+from .mt_requestcache import RequestCache, RequestKey
+from .mt_utils import MTRequests, MTResolutions
+from constants import constants as c
+
+# Bytes of keys generated by servers started without an authkey
+AUTHKEY_BYTES = 32
+
+# Loader methods clients may call. Results of methods other than `get_price_data` are pickled.
+METHODS = ('get_price_data', 'get_symbols', 'categories', 'get_symbol_properties')
+
+# Names of blocks created by servers in this process
+created = set()
+
+# Field name, dtype, shape and byte offset of each array in a block
+Layout = List[Tuple[str, str, Tuple[int, ...], int]]
+
+
+def default_address() -> str:
+    """
+    Per-user socket path, or named pipe on Windows.
+    """
+    if sys.platform == 'win32':
+        return rf'\\.\pipe\mt5_dataloader-{getpass.getuser()}'
+    return os.path.join(tempfile.gettempdir(), f"mt5_dataloader-{os.getuid()}.sock")
+
+
+def authkey_path(address: str) -> str:
+    """
+    File holding the generated key of the server at `address`: next to the socket, or in the per-user temporary
+    directory for named pipes.
+    """
+    if address.startswith('\\\\.\\pipe\\'):
+        return os.path.join(tempfile.gettempdir(), address.rsplit('\\', 1)[-1] + '.key')
+    return address + '.key'
+
+
+def write_authkey(address: str) -> bytes:
+    """
+    Generates a random key and writes it to `authkey_path(address)`, readable by the current user only. An existing
+    file is replaced rather than opened, so that a file or link planted by another user is never written through.
+    """
+    authkey = os.urandom(AUTHKEY_BYTES)
+    path = authkey_path(address)
+    if os.path.lexists(path):
+        os.unlink(path)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_NOFOLLOW', 0) | getattr(os, 'O_BINARY', 0)
+    fd = os.open(path, flags, 0o600)
+    with os.fdopen(fd, 'wb') as file:
+        file.write(authkey)
+    return authkey
+
+
+def read_authkey(address: str) -> bytes:
+    """
+    Reads the key written by the server at `address`. On POSIX, the file must belong to the current user and must not
+    be readable by others.
+    """
+    path = authkey_path(address)
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0) | getattr(os, 'O_BINARY', 0))
+    except FileNotFoundError:
+        raise FileNotFoundError(f"No key found for a data server at {address}. Start the server, or pass the "
+                                f"`authkey` set on it.")
+    with os.fdopen(fd, 'rb') as file:
+        if os.name == 'posix':
+            info = os.fstat(file.fileno())
+            if info.st_uid != os.getuid() or info.st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+                raise PermissionError(f"Refusing key file {path}: it must belong to the current user with mode 0600.")
+        return file.read()
+
+
+def attach(name: str) -> SharedMemory:
+    """
+    Opens a block created by a server. Blocks of a server in another process are not registered with this process's
+    resource tracker, which would otherwise unlink them when this process exits.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    block = SharedMemory(name=name)
+    if os.name == 'posix' and name not in created:
+        resource_tracker.unregister(block._name, 'shared_memory')
+    return block
+
+
+def share(price_data: PriceData) -> Tuple[SharedMemory, Dict[str, Any]]:
+    """
+    Copies the arrays of `price_data` into a new shared memory block, in the compact layout of `PriceData`. Returns
+    the block and a header describing its layout.
+    """
+    prices = price_data.prices if price_data.compact else \
+        np.stack([price_data.column(col) for col in c.PRICE_COLUMNS])
+    arrays = {'time': price_data.times, 'prices': prices, 'spread': price_data.column('spread')}
+    for col in c.VOLUME_COLUMNS:
+        if col in price_data.columns:
+            arrays[col] = price_data.column(col)
+
+    layout: Layout = list()
+    size = 0
+    for name, values in arrays.items():
+        layout.append((name, values.dtype.str, values.shape, size))
+        size += -(-values.nbytes // 8) * 8
+    block = SharedMemory(create=True, size=max(size, 1))
+    created.add(block.name)
+    for (name, dtype, shape, offset), values in zip(layout, arrays.values()):
+        np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)[...] = values
+
+    header = {'name': block.name, 'symbol': price_data.symbol, 'resolution': price_data.resolution,
+              'layout': layout}
+    return block, header
+
+
+def from_block(
+        block: SharedMemory,
+        header: Dict[str, Any],
+        copy: bool = False,
+        on_release: Optional[Callable[[], Any]] = None) -> PriceData:
+    """
+    Builds compact `PriceData` from a block written by `share`. Arrays are views of the block unless `copy` is set.
+    Views share a single base array, so `on_release` is called once no array viewing the block, or any slice or frame
+    built from one, is referenced anymore. The block must stay mapped until then.
+    """
+    base = np.ndarray(len(block.buf), dtype=np.uint8, buffer=block.buf)
+    if on_release is not None and not copy:
+        weakref.finalize(base, on_release)
+    arrays = dict()
+    for name, dtype, shape, offset in header['layout']:
+        dtype = np.dtype(dtype)
+        values = base[offset:offset + int(np.prod(shape)) * dtype.itemsize].view(dtype).reshape(shape)
+        arrays[name] = values.copy() if copy else values
+    time, prices, spread = arrays.pop('time'), arrays.pop('prices'), arrays.pop('spread')
+    return PriceData.from_arrays(header['symbol'], header['resolution'], time, prices, spread, arrays)
+
+
+class MTDataServer:
+
+    def __init__(
+            self,
+            loader: Optional[MTDataLoader] = None,
+            address: Optional[str] = None,
+            authkey: Optional[bytes] = None,
+            max_bytes: int = 1 << 30,
+            **kwargs):
+        """
+        Parameters
+        ----------
+            loader: MTDataLoader = None
+                Loader owning the terminal and caches. If None, a compact loader with a request cache of `max_bytes`
+                is created with the remaining keyword arguments. Without a request cache, every request reaches the
+                terminal.
+
+            address: str = None
+                Socket path, or named pipe on Windows. Defaults to `default_address()`.
+
+            authkey: bytes = None
+                Key clients must present to connect. If None, a random key is generated on `start` and written to
+                `authkey_path(address)` with mode 0600, where clients of the same user read it.
+
+            max_bytes: int = 1 << 30
+                Budget for shared blocks. Least recently requested blocks are unlinked when exceeded. Clients keep
+                the blocks they already mapped.
+        """
+        if loader is None:
+            kwargs.setdefault('compact', True)
+            kwargs.setdefault('request_cache_bytes', max_bytes)
+            loader = MTDataLoader(**kwargs)
+        self.loader = loader
+        self.address = address if address is not None else default_address()
+        self.authkey = authkey
+        self.generated_authkey = authkey is None
+        self.max_bytes = max_bytes
+        # Request key -> (price data, block, header). A block is reused while the loader returns the same object.
+        self.blocks: OrderedDict = OrderedDict()
+        self.nbytes = 0
+        self.requests = 0
+        self.shared = 0
+        # Guards the shared blocks and counters
+        self.lock = threading.Lock()
+        # The terminal API is not thread-safe, so loader calls are serialized. Requests held by the request cache
+        # are answered without waiting for it.
+        self.terminal_lock = threading.Lock()
+        self.listener: Optional[Listener] = None
+        self.thread: Optional[threading.Thread] = None
+        self.closed = threading.Event()
+
+    def start(self) -> 'MTDataServer':
+        """
+        Starts listening and serves clients on a background thread.
+        """
+        if self.listener is not None:
+            return self
+        if sys.platform != 'win32' and os.path.exists(self.address):
+            try:
+                # Any answer, including a failed handshake, means a server is listening
+                Client(self.address).close()
+            except OSError:
+                # Stale socket left by a server that did not shut down
+                os.unlink(self.address)
+            else:
+                raise RuntimeError(f"A data server is already running at {self.address}")
+        if self.generated_authkey:
+            self.authkey = write_authkey(self.address)
+        self.listener = Listener(self.address, authkey=self.authkey)
+        if os.name == 'posix':
+            os.chmod(self.address, 0o600)
+        self.closed.clear()
+        self.thread = threading.Thread(target=self.serve_forever, name='mt5-data-server', daemon=True)
+        self.thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """
+        Accepts clients until `close`. Each client is served on its own thread.
+        """
+        while not self.closed.is_set():
+            try:
+                connection = self.listener.accept()
+            except Exception:
+                # Failed handshake, e.g. a wrong authkey or the connection waking `close`
+                continue
+            if self.closed.is_set():
+                connection.close()
+                break
+            threading.Thread(target=self.serve_client, args=(connection,), daemon=True).start()
+
+    def serve_client(self, connection: Connection) -> None:
+        """
+        Answers requests from one client until it disconnects.
+        """
+        with connection:
+            while True:
+                try:
+                    method, args, kwargs = connection.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    response = ('ok', self.handle(method, args, kwargs))
+                except Exception as e:
+                    response = ('error', e)
+                try:
+                    connection.send(response)
+                except (EOFError, OSError):
+                    return
+
+    def handle(self, method: str, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+        """
+        Runs one request. Returns a block header for `get_price_data`, or the pickled result of other methods.
+        """
+        if method not in METHODS:
+            raise ValueError(f"Invalid method: {method}. Valid methods: {list(METHODS)}")
+        with self.lock:
+            self.requests += 1
+        if method != 'get_price_data':
+            with self.terminal_lock:
+                return getattr(self.loader, method)(*args, **kwargs)
+        return self.get_price_data(*args, **kwargs)
+
+    def get_price_data(
+            self,
+            symbol: str,
+            resolution: Union[str, MTResolutions],
+            request_type: Union[str, MTRequests],
+            start_date: Optional[Any] = None,
+            end_date: Optional[Any] = None,
+            start_index: Optional[int] = 0,
+            num_bars: Optional[int] = 99000,
+            export: Optional[bool] = False) -> Optional[Dict[str, Any]]:
+        """
+        Returns the header of a block holding the requested bars. Requests held by the loader's request cache skip
+        the terminal lock, so they are not delayed by slow requests of other clients.
+        """
+        normalized = MTDataLoader.normalize_request(resolution, request_type, start_date, end_date)
+        key = RequestCache.key(symbol, *normalized, start_index, num_bars)
+
+        cache = self.loader.request_cache
+        price_data = cache.get(key) if cache is not None and not export and cache.contains(key) else None
+        if price_data is None:
+            with self.terminal_lock:
+                price_data = self.loader.get_price_data(symbol, resolution, request_type, start_date, end_date,
+                                                        start_index, num_bars, export)
+        if price_data is None:
+            return None
+
+        with self.lock:
+            entry = self.blocks.get(key)
+            if entry is not None and entry[0] is price_data:
+                self.blocks.move_to_end(key)
+                self.shared += 1
+                return entry[2]
+
+            block, header = share(price_data)
+            self.put(key, price_data, block, header)
+            return header
+
+    def put(self, key: RequestKey, price_data: PriceData, block: SharedMemory, header: Dict[str, Any]) -> None:
+        if key in self.blocks:
+            self.remove(key)
+        self.blocks[key] = (price_data, block, header)
+        self.nbytes += block.size
+        while self.nbytes > self.max_bytes and len(self.blocks) > 1:
+            self.remove(next(iter(self.blocks)))
+
+    def remove(self, key: RequestKey) -> None:
+        _, block, _ = self.blocks.pop(key)
+        self.nbytes -= block.size
+        block.close()
+        block.unlink()
+        created.discard(block.name)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns request counters with the current number of shared blocks and bytes.
+        """
+        return {'requests': self.requests, 'shared': self.shared, 'blocks': len(self.blocks), 'bytes': self.nbytes}
+
+    def close(self) -> None:
+        """
+        Stops accepting clients and unlinks all shared blocks.
+        """
+        self.closed.set()
+        if self.listener is not None:
+            # Closing the listener does not interrupt a blocked accept, so the accept loop is woken by a connection
+            # that fails the handshake. Connecting without the authkey does not wait for the server.
+            try:
+                Client(self.address).close()
+            except OSError:
+                pass
+            self.thread.join()
+            self.listener.close()
+            self.listener = None
+            self.thread = None
+            if self.generated_authkey:
+                try:
+                    os.unlink(authkey_path(self.address))
+                except FileNotFoundError:
+                    pass
+        with self.lock:
+            while self.blocks:
+                self.remove(next(iter(self.blocks)))
+
+    def __enter__(self) -> 'MTDataServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class MTDataClient:
+
+    def __init__(
+            self,
+            address: Optional[str] = None,
+            authkey: Optional[bytes] = None,
+            copy: bool = False):
+        """
+        Parameters
+        ----------
+            address: str = None
+                Address of a running `MTDataServer`. Defaults to `default_address()`.
+
+            authkey: bytes = None
+                Key set on the server. If None, the key generated by the server is read from
+                `authkey_path(address)`.
+
+            copy: bool = False
+                Copies bars out of shared memory. Otherwise returned data are read-only views of blocks owned by the
+                server. A block stays mapped while any array viewing it is referenced, and is unmapped once the last
+                one is released, so the memory held by the client is bounded by the data it still uses.
+        """
+        self.address = address if address is not None else default_address()
+        self.authkey = authkey
+        self.copy = copy
+        self.connection: Optional[Connection] = None
+        # Mapped blocks, and the number of `PriceData` results viewing each
+        self.blocks: Dict[str, SharedMemory] = dict()
+        self.views: Dict[str, int] = dict()
+        # Released from garbage collection, possibly while `lock` is held by the same thread
+        self.blocks_lock = threading.RLock()
+        self.lock = threading.Lock()
+
+    def connect(self) -> None:
+        if self.connection is None:
+            authkey = self.authkey if self.authkey is not None else read_authkey(self.address)
+            self.connection = Client(self.address, authkey=authkey)
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        """
+        Sends one request to the server and returns its result. Exceptions raised by the server are re-raised.
+        """
+        with self.lock:
+            self.connect()
+            self.connection.send((method, args, kwargs))
+            status, result = self.connection.recv()
+        if status == 'error':
+            raise result
+        return result
+
+    def get_price_data(
+            self,
+            symbol: str,
+            resolution: Union[str, MTResolutions],
+            request_type: Union[str, MTRequests],
+            start_date: Optional[Any] = None,
+            end_date: Optional[Any] = None,
+            start_index: Optional[int] = 0,
+            num_bars: Optional[int] = 99000,
+            export: Optional[bool] = False) -> Optional[PriceData]:
+        """
+        Fetches price data through the server. Takes the same parameters as `MTDataLoader.get_price_data` and returns
+        compact `PriceData`.
+        """
+        for attempt in range(2):
+            header = self.call('get_price_data', symbol, resolution, request_type, start_date, end_date, start_index,
+                               num_bars, export)
+            if header is None:
+                print(f"No data available for: {symbol} {MTDataLoader.timeframe(resolution)}")
+                return None
+            with self.blocks_lock:
+                block = self.blocks.get(header['name'])
+                if block is not None:
+                    break
+            try:
+                block = attach(header['name'])
+                break
+            except FileNotFoundError:
+                # Evicted by the server before it was mapped
+                if attempt > 0:
+                    raise
+
+        if self.copy:
+            try:
+                return from_block(block, header, copy=True)
+            finally:
+                if header['name'] not in self.blocks:
+                    block.close()
+
+        name = header['name']
+        with self.blocks_lock:
+            if self.blocks.setdefault(name, block) is not block:
+                # Mapped by another thread meanwhile
+                block.close()
+                block = self.blocks[name]
+            self.views[name] = self.views.get(name, 0) + 1
+        price_data = from_block(block, header, on_release=lambda: self.release(name))
+        for values in (price_data.time, price_data.prices, price_data.spread, *price_data.volumes.values()):
+            values.flags.writeable = False
+        return price_data
+
+    def get_symbols(self, category: str) -> List[str]:
+        return self.call('get_symbols', category)
+
+    def categories(self) -> List[str]:
+        return self.call('categories')
+
+    def get_symbol_properties(self, symbol: str) -> Tuple[float, float]:
+        return self.call('get_symbol_properties', symbol)
+
+    def release(self, name: str) -> None:
+        """
+        Called once the arrays of a result are no longer referenced. Unmaps the block after its last result.
+        """
+        with self.blocks_lock:
+            self.views[name] -= 1
+            if self.views[name] == 0:
+                del self.views[name]
+                self.blocks.pop(name).close()
+
+    def close(self) -> None:
+        """
+        Disconnects. Blocks still referenced by returned data stay mapped until those are released.
+        """
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+    def __enter__(self) -> 'MTDataClient':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
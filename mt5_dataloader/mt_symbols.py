@@ -0,0 +1,164 @@
+"""
+This module contains a cached catalog of broker symbols. Symbols are fetched once with `symbols_get` into a columnar
+table, with an index of path prefixes, memoized category matches and the trade properties of every symbol, so lookups
+do not scan the terminal on every call. The snapshot is refreshed after a time-to-live.
+"""
+import time
+import threading
+from collections import defaultdict
+from typing import Optional, List, Dict, Iterable
+
+import numpy as np
+
+from .mt_backend import MTBackend, shared_connection
+from .mt_lazy import LazyModule
+from constants import constants as c
+
+pd = LazyModule('pandas')
+
+PATH_SEPARATOR = '\\'
+
+
+class SymbolCatalog:
+
+    properties_fields = [c.TICK_VALUE, c.POINT, c.DIGITS, c.CONTRACT_SIZE]
+
+    def __init__(self, ttl: Optional[float] = 300, backend: Optional[MTBackend] = None):
+        """
+        Parameters
+        ----------
+            ttl: float = 300
+                Seconds before the snapshot is refreshed from the terminal. Tick values of cross pairs move with
+                prices, so this should stay short when properties are used for sizing. Never refreshed if None.
+
+            backend: MTBackend = None
+                Terminal backend. Defaults to the shared MetaTrader5 terminal connection, created on first refresh.
+        """
+        self.ttl = ttl
+        self.backend = backend
+        self.snapshot_time = None
+        self.lock = threading.Lock()
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """
+        Drops the snapshot. The next lookup fetches symbols from the terminal.
+        """
+        self.snapshot_time = None
+        self.names = np.array([], dtype=str)
+        self.paths = np.array([], dtype=str)
+        self.property_columns = dict()
+        self.properties_table = None
+        self.rows = dict()
+        self.prefixes = dict()
+        self.category_list = list()
+        self.queries = dict()
+
+    def refresh(self) -> None:
+        """
+        Snapshots all symbols from the terminal and rebuilds the indexes.
+        """
+        if self.backend is None:
+            self.backend = shared_connection()
+        symbols = self.backend.symbols_get()
+        if symbols is None:
+            raise RuntimeError(f"Failed to get symbols from MetaTrader5. Error: {self.backend.last_error()}")
+
+        names = [sym.name for sym in symbols]
+        paths = [sym.path for sym in symbols]
+
+        prefixes = defaultdict(list)
+        for row, path in enumerate(paths):
+            parts = path.split(PATH_SEPARATOR)[:-1]
+            for depth in range(1, len(parts) + 1):
+                prefixes[PATH_SEPARATOR.join(parts[:depth])].append(row)
+
+        self.names = np.array(names, dtype=str)
+        self.paths = np.array(paths, dtype=str)
+        self.property_columns = {field: np.array([getattr(sym, field) for sym in symbols])
+                                 for field in self.properties_fields}
+        self.properties_table = None
+        self.rows = {name: row for row, name in enumerate(names)}
+        self.prefixes = {prefix: np.array(rows) for prefix, rows in prefixes.items()}
+        self.category_list = list(set(PATH_SEPARATOR.join(path.split(PATH_SEPARATOR)[:-1]) for path in paths))
+        self.queries = dict()
+        self.snapshot_time = time.monotonic()
+
+    def ensure_fresh(self) -> None:
+        with self.lock:
+            if self.snapshot_time is None or \
+                    (self.ttl is not None and time.monotonic() - self.snapshot_time > self.ttl):
+                self.refresh()
+
+    def get_symbols(self, category: str) -> List[str]:
+        """
+        Gets list of symbols whose path contains the specified category, e.g. a `SymbolCategories` value.
+
+        Each category is matched once over the snapshot with a vectorized search and memoized until the next refresh.
+        """
+        self.ensure_fresh()
+        rows = self.queries.get(category)
+        if rows is None:
+            rows = np.flatnonzero(np.char.find(self.paths, category) >= 0)
+            self.queries[category] = rows
+        return self.names[rows].tolist()
+
+    def symbols_in(self, prefix: str) -> List[str]:
+        """
+        Gets list of symbols under a path prefix, e.g. a value returned by `categories`, from the prefix index.
+        """
+        self.ensure_fresh()
+        rows = self.prefixes.get(prefix.rstrip(PATH_SEPARATOR))
+        if rows is None:
+            return list()
+        return self.names[rows].tolist()
+
+    def categories(self) -> List[str]:
+        """
+        Gets list of categories derived from symbols path
+        """
+        self.ensure_fresh()
+        return list(self.category_list)
+
+    def __contains__(self, symbol: str) -> bool:
+        self.ensure_fresh()
+        return symbol in self.rows
+
+    def properties(self, symbols: Iterable[str], fields: Optional[List[str]] = None) -> 'pd.DataFrame':
+        """
+        Gets trade properties for several symbols from the snapshot.
+
+        Parameters
+        ----------
+            symbols: List[str]
+                Symbols to look up. Raises KeyError if a symbol is not in the catalog.
+
+            fields: List[str] = None
+                Property names. Defaults to tick value, point, digits and contract size.
+        """
+        self.ensure_fresh()
+        symbols = list(symbols)
+        missing = [symbol for symbol in symbols if symbol not in self.rows]
+        if len(missing) > 0:
+            raise KeyError(f"Symbols not found: {missing}")
+        fields = self.properties_fields if fields is None else fields
+        return self.table().loc[symbols, fields]
+
+    def property_map(self, field: str) -> Dict[str, float]:
+        """
+        Gets a single property for all symbols, keyed by symbol.
+        """
+        self.ensure_fresh()
+        return dict(zip(self.names.tolist(), self.property_columns[field].tolist()))
+
+    def table(self) -> 'pd.DataFrame':
+        """
+        Trade properties of all symbols in the snapshot. Built on first use, so name and category lookups do not import
+        pandas.
+        """
+        table = self.properties_table
+        if table is None:
+            table = pd.DataFrame(self.property_columns, index=pd.Index(self.names.tolist(), name='symbol'),
+                                 columns=self.properties_fields)
+            self.properties_table = table
+        return table
@@ -0,0 +1,122 @@
+"""
+This module contains a compact columnar container for tick data. Ticks returned by MT5 are stored as contiguous numpy
+arrays instead of a wide DataFrame, and can be aggregated into bars of any resolution.
+"""
+from typing import Optional, Union, List
+
+import numpy as np
+
+from .mt_lazy import LazyModule
+from .mt_pricedata import PriceData
+from .mt_resample import bar_start, aggregate, bars_to_frame
+
+pd = LazyModule('pandas')
+
+
+class TickData:
+
+    def __init__(
+            self,
+            symbol: str,
+            time_msc: np.ndarray,
+            bid: np.ndarray,
+            ask: np.ndarray,
+            flags: np.ndarray):
+        """
+        Parameters
+        ----------
+            symbol: str
+                Symbol of specified data
+
+            time_msc: np.ndarray
+                Tick times in epoch milliseconds (int64)
+
+            bid: np.ndarray
+                Bid prices
+
+            ask: np.ndarray
+                Ask prices
+
+            flags: np.ndarray
+                Tick flags bitfield (uint32). See `TICK_FLAG_*` in MT5
+        """
+        self.symbol = symbol
+        self.time_msc = time_msc
+        self.bid = bid
+        self.ask = ask
+        self.flags = flags
+
+    @classmethod
+    def from_ticks(cls, symbol: str, ticks: np.ndarray,
+                   price_dtype: Union[str, np.dtype] = np.float64) -> 'TickData':
+        """
+        Builds tick data from the structured array returned by `copy_ticks_*`.
+        """
+        return cls(
+            symbol,
+            np.ascontiguousarray(ticks['time_msc'], dtype=np.int64),
+            np.ascontiguousarray(ticks['bid'], dtype=price_dtype),
+            np.ascontiguousarray(ticks['ask'], dtype=price_dtype),
+            np.ascontiguousarray(ticks['flags'], dtype=np.uint32)
+        )
+
+    @classmethod
+    def concat(cls, chunks: List['TickData']) -> 'TickData':
+        """
+        Joins consecutive chunks, e.g. from `MTDataLoader.iter_tick_data`.
+        """
+        if len(chunks) == 0:
+            raise ValueError("No chunks to concatenate")
+        return cls(
+            chunks[0].symbol,
+            np.concatenate([chunk.time_msc for chunk in chunks]),
+            np.concatenate([chunk.bid for chunk in chunks]),
+            np.concatenate([chunk.ask for chunk in chunks]),
+            np.concatenate([chunk.flags for chunk in chunks])
+        )
+
+    def __len__(self) -> int:
+        return len(self.time_msc)
+
+    @property
+    def nbytes(self) -> int:
+        return self.time_msc.nbytes + self.bid.nbytes + self.ask.nbytes + self.flags.nbytes
+
+    def info(self) -> None:
+        """
+        Prints data info
+        """
+        print(f"Symbol: {self.symbol}")
+        print(f"Length: {len(self)}")
+        print(f"Memory: {self.nbytes / 1024 ** 2:.2f} MB")
+
+    def to_frame(self) -> 'pd.DataFrame':
+        """
+        Builds a DataFrame indexed by tick time.
+        """
+        index = pd.DatetimeIndex(self.time_msc.view('datetime64[ms]'), name='date')
+        return pd.DataFrame({'bid': self.bid, 'ask': self.ask, 'flags': self.flags}, index=index, copy=False)
+
+    def to_bars(self, resolution: int, point: Optional[float] = None) -> PriceData:
+        """
+        Aggregates ticks into bars built on the bid price, as MT5 does.
+
+        Parameters
+        ----------
+            resolution: int
+                Bar resolution. See MTResolutions
+
+            point: float = None
+                Symbol point size. If specified, spread is expressed in points like MT5 bars, otherwise in price units.
+                Bar spread is the minimum spread within the bar.
+        """
+        valid = self.bid > 0
+        bid = self.bid[valid]
+        spread = self.ask[valid] - bid
+        if point is not None:
+            spread = np.rint(spread / point).astype(np.int32)
+
+        keys = bar_start(self.time_msc[valid] // 1000, resolution)
+        bars = aggregate(keys, bid, bid, bid, bid, spread)
+
+        return PriceData(self.symbol, resolution, bars_to_frame(bars))
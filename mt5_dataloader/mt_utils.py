@@ -1,6 +1,17 @@
-import MetaTrader5 as mt5
 from enum import Enum
 
+# Timeframe values as defined by the MetaTrader5 module (`TIMEFRAME_*`). Kept here so that resolutions can be used
+# without importing MetaTrader5.
+TIMEFRAME_M1 = 1
+TIMEFRAME_M5 = 5
+TIMEFRAME_M15 = 15
+TIMEFRAME_M30 = 30
+TIMEFRAME_H1 = 16385
+TIMEFRAME_H4 = 16388
+TIMEFRAME_D1 = 16408
+TIMEFRAME_W1 = 32769
+TIMEFRAME_MN1 = 49153
+
 
 class MTRequests(Enum):
     POSITION = "pos"
@@ -8,32 +19,65 @@ class MTRequests(Enum):
     RANGE = "range"
     
     
+class MTPriority(Enum):
+    LIVE = 0
+    NORMAL = 1
+    BULK = 2
+
+
+class MTPhases(Enum):
+    VALIDATE = "validate"
+    TERMINAL = "terminal"
+    CONVERT = "convert"
+    SYMBOLS = "symbols"
+    RETRY = "retry"
+    NO_DATA = "nodata"
+
+
 class MTResolutions(Enum): 
-    RESOLUTION_M1 = mt5.TIMEFRAME_M1
-    RESOLUTION_M5 = mt5.TIMEFRAME_M5
-    RESOLUTION_M15 = mt5.TIMEFRAME_M15
-    RESOLUTION_M30 = mt5.TIMEFRAME_M30
-    RESOLUTION_H1 = mt5.TIMEFRAME_H1
-    RESOLUTION_H4 = mt5.TIMEFRAME_H4
-    RESOLUTION_D1 = mt5.TIMEFRAME_D1
-    RESOLUTION_W1 = mt5.TIMEFRAME_W1
-    RESOLUTION_MN1 = mt5.TIMEFRAME_MN1
+    RESOLUTION_M1 = TIMEFRAME_M1
+    RESOLUTION_M5 = TIMEFRAME_M5
+    RESOLUTION_M15 = TIMEFRAME_M15
+    RESOLUTION_M30 = TIMEFRAME_M30
+    RESOLUTION_H1 = TIMEFRAME_H1
+    RESOLUTION_H4 = TIMEFRAME_H4
+    RESOLUTION_D1 = TIMEFRAME_D1
+    RESOLUTION_W1 = TIMEFRAME_W1
+    RESOLUTION_MN1 = TIMEFRAME_MN1
     
     @staticmethod
     def timeframe(resolution): 
         tf_converter = {
-            mt5.TIMEFRAME_M1: "m1",
-            mt5.TIMEFRAME_M5: "m5",
-            mt5.TIMEFRAME_M15: "m15",
-            mt5.TIMEFRAME_M30: "m30",
-            mt5.TIMEFRAME_H1: "h1",
-            mt5.TIMEFRAME_H4: "h4",
-            mt5.TIMEFRAME_D1: "d1",
-            mt5.TIMEFRAME_W1: "w1",
-            mt5.TIMEFRAME_MN1: "mn1"
+            TIMEFRAME_M1: "m1",
+            TIMEFRAME_M5: "m5",
+            TIMEFRAME_M15: "m15",
+            TIMEFRAME_M30: "m30",
+            TIMEFRAME_H1: "h1",
+            TIMEFRAME_H4: "h4",
+            TIMEFRAME_D1: "d1",
+            TIMEFRAME_W1: "w1",
+            TIMEFRAME_MN1: "mn1"
         }
         return tf_converter[resolution]
 
+    @staticmethod
+    def seconds(resolution):
+        """
+        Nominal length of a single bar in seconds. W1 and MN1 use their longest possible span.
+        """
+        sec_converter = {
+            TIMEFRAME_M1: 60,
+            TIMEFRAME_M5: 300,
+            TIMEFRAME_M15: 900,
+            TIMEFRAME_M30: 1800,
+            TIMEFRAME_H1: 3600,
+            TIMEFRAME_H4: 14400,
+            TIMEFRAME_D1: 86400,
+            TIMEFRAME_W1: 604800,
+            TIMEFRAME_MN1: 2678400
+        }
+        return sec_converter[resolution]
+
 
 class SymbolCategories(Enum):
     EU_STOCKS = 'EU'
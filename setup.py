@@ -19,6 +19,10 @@ setup(
         'matplotlib>=3.5.2',
         'MetaTrader5>=5.0.45'
     ],
+    extras_require = {
+        'cache': ['pyarrow>=10.0.0'],
+        'export': ['pyarrow>=10.0.0']
+    },
     include_package_data=True,
     python_requires = '>=3.8'
 )
\ No newline at end of file
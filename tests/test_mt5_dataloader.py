@@ -1,6 +1,9 @@
 import unittest
 from unittest.mock import patch
 from datetime import datetime as dt
+from datetime import timezone
+
+import numpy as np
 
 from mt5_dataloader.mt_dataloader import MTDataLoader
 from mt5_dataloader.mt_utils import MTResolutions
@@ -184,3 +187,118 @@ class TestMTDataLoader(unittest.TestCase):
         )
 
         self.assertIsNone(result)
+
+    def test_rates_to_frame(self):
+        """
+        Tests `rates_to_frame` with a structured array, float32 prices and volume columns.
+        """
+        rates = np.zeros(3, dtype=[('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'),
+                                   ('close', '<f8'), ('tick_volume', '<u8'), ('spread', '<i4'),
+                                   ('real_volume', '<u8')])
+        rates['time'] = [0, 60, 120]
+        rates['open'] = [1, 2, 3]
+
+        result = self.mt_dataloader.rates_to_frame(rates)
+        self.assertEqual(list(result.columns), ['open', 'high', 'low', 'close', 'spread'])
+        self.assertEqual(result.index.name, 'date')
+        self.assertEqual(result.index[1], dt(1970, 1, 1, 0, 1))
+        self.assertEqual(result['open'].sum(), 6)
+
+        result = self.mt_dataloader.rates_to_frame(rates, price_dtype=np.float32, volumes=True)
+        self.assertEqual(result['close'].dtype, np.float32)
+        self.assertIn('tick_volume', result.columns)
+        self.assertIn('real_volume', result.columns)
+
+    @patch("MetaTrader5.copy_rates_from_pos")
+    def test_get_price_data_many(self, mock_rates):
+        """
+        Tests `get_price_data_many` with failing symbols and panel output.
+        """
+        def rates(symbol, *args):
+            if symbol == "MISSING":
+                return None
+            if symbol == "BROKEN":
+                raise RuntimeError("Terminal error")
+            return RATES
+
+        mock_rates.side_effect = rates
+
+        result, failures = self.mt_dataloader.get_price_data_many(
+            symbols=["GBPUSD", "MISSING", "EURUSD", "BROKEN"],
+            resolution=MTResolutions.RESOLUTION_M15,
+            request_type=MTRequests.POSITION
+        )
+        self.assertEqual(sorted(result.keys()), ["EURUSD", "GBPUSD"])
+        self.assertEqual(result["EURUSD"].data['open'].sum(), 6)
+        self.assertIsInstance(failures["MISSING"], LookupError)
+        self.assertIsInstance(failures["BROKEN"], RuntimeError)
+
+        result, failures = self.mt_dataloader.get_price_data_many(
+            symbols=["GBPUSD", "EURUSD"],
+            resolution=MTResolutions.RESOLUTION_M15,
+            request_type=MTRequests.POSITION,
+            panel=True
+        )
+        self.assertEqual(failures, {})
+        self.assertEqual(result[("GBPUSD", "open")].sum(), 6)
+        self.assertEqual(len(result), 3)
+
+    @patch("MetaTrader5.copy_rates_range")
+    def test_iter_price_data(self, mock_rates):
+        """
+        Tests `iter_price_data` splits the range into windows without duplicating boundary bars.
+        """
+        def rates(symbol, resolution, start_date, end_date):
+            # One bar per hour, inclusive of both ends
+            start = int(start_date.replace(tzinfo=timezone.utc).timestamp())
+            end = int(end_date.replace(tzinfo=timezone.utc).timestamp())
+            times = [t for t in range(start - start % 3600, end + 1, 3600) if t >= start]
+            return {"time": times, "open": [1] * len(times), "high": [1] * len(times), "low": [1] * len(times),
+                    "close": [1] * len(times), "spread": [1] * len(times)}
+
+        mock_rates.side_effect = rates
+
+        chunks = list(self.mt_dataloader.iter_price_data(
+            symbol=self.symbol,
+            resolution=MTResolutions.RESOLUTION_H1,
+            start_date=dt(2024, 1, 1),
+            end_date=dt(2024, 1, 3),
+            chunk=10
+        ))
+        self.assertEqual(len(chunks), 5)
+        self.assertTrue(all(len(chunk.data) <= 10 for chunk in chunks))
+
+        index = [t for chunk in chunks for t in chunk.data.index]
+        self.assertEqual(len(index), 49)
+        self.assertEqual(len(set(index)), 49)
+
+        totals = []
+        num_bars = self.mt_dataloader.stream_price_data(
+            symbol=self.symbol,
+            resolution=MTResolutions.RESOLUTION_H1,
+            start_date=dt(2024, 1, 1),
+            end_date=dt(2024, 1, 3),
+            consumer=lambda price: totals.append(price.data['open'].sum()),
+            chunk=10
+        )
+        self.assertEqual(num_bars, 49)
+        self.assertEqual(sum(totals), 49)
+
+        # A window without data in the middle of the range is skipped and reported, not the end of the stream
+        def failing(symbol, resolution, start_date, end_date):
+            return None if start_date <= dt(2024, 1, 2) <= end_date else rates(symbol, resolution, start_date, end_date)
+
+        mock_rates.side_effect = failing
+        events = []
+        self.mt_dataloader.add_hook(events.append)
+        chunks = list(self.mt_dataloader.iter_price_data(
+            symbol=self.symbol,
+            resolution=MTResolutions.RESOLUTION_H1,
+            start_date=dt(2024, 1, 1),
+            end_date=dt(2024, 1, 3),
+            chunk=10
+        ))
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(chunks[-1].data.index[-1], dt(2024, 1, 3))
+        self.assertEqual(sum(len(chunk.data) for chunk in chunks), 39)
+        self.assertEqual([event.phase for event in events if event.operation == 'iter_price_data'], ['nodata'])
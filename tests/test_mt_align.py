@@ -0,0 +1,99 @@
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from mt5_dataloader.mt_align import AlignedBars, merge_times
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import FakeTerminal
+from mt5_dataloader.mt_pricedata import PriceData
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+
+
+class TestAlignedBars(unittest.TestCase):
+    """
+    Tests alignment of symbols with different bar times against a concatenated frame
+    """
+    def setUp(self):
+        loader = MTDataLoader(path="fake", backend=FakeTerminal(), compact=True)
+        data, _ = loader.get_price_data_many(["EURUSD", "GBPUSD", "USDJPY"], MTResolutions.RESOLUTION_H1,
+                                             MTRequests.RANGE, start_date=datetime(2024, 1, 1),
+                                             end_date=datetime(2024, 2, 1))
+        # Knock out different bars of each symbol
+        rng = np.random.default_rng(0)
+        self.data = {symbol: self.subset(price_data, rng.random(len(price_data)) > 0.2)
+                     for symbol, price_data in data.items()}
+        self.data["USDJPY"] = self.data["USDJPY"].between(datetime(2024, 1, 10), None)
+
+    @staticmethod
+    def subset(price_data, keep):
+        return PriceData.from_arrays(price_data.symbol, price_data.resolution, price_data.time[keep],
+                                     price_data.prices[:, keep], price_data.spread[keep])
+
+    def expected(self, data, fill=None):
+        frame = pd.concat({symbol: price_data.data for symbol, price_data in data.items()}, axis=1, sort=True)
+        if fill == 'ffill':
+            frame = frame.ffill()
+        return frame
+
+    def test_merge_times(self):
+        merged = merge_times([np.array([1, 3, 5]), np.array([2, 3, 6]), np.array([], dtype=np.int64)])
+        self.assertEqual(merged.tolist(), [1, 2, 3, 5, 6])
+
+    def test_align(self):
+        for fill in (None, 'ffill'):
+            aligned = AlignedBars(self.data, fill=fill)
+            frame = self.expected(self.data, fill)
+
+            self.assertEqual(aligned.values.shape, (len(frame), 3, 4))
+            np.testing.assert_array_equal(aligned.times, frame.index.values.astype('datetime64[s]').astype(np.int64))
+            for i, symbol in enumerate(aligned.symbols):
+                np.testing.assert_array_equal(aligned.values[:, i], frame[symbol][aligned.fields].to_numpy())
+                np.testing.assert_array_equal(aligned.mask[:, i], frame[(symbol, 'close')].notna().to_numpy()
+                                              if fill is None else np.isin(aligned.times, self.data[symbol].time))
+
+    def test_prev_close(self):
+        aligned = AlignedBars(self.data, fields=['open', 'close', 'spread'], fill='prev_close')
+        close = self.expected(self.data, 'ffill').xs('close', axis=1, level=1)
+        spread = self.expected(self.data, 'ffill').xs('spread', axis=1, level=1)
+        filled = ~aligned.mask & ~np.isnan(aligned.field('close'))
+
+        self.assertTrue(filled.any())
+        np.testing.assert_array_equal(aligned.field('close'), close.to_numpy())
+        np.testing.assert_array_equal(aligned.field('open')[filled], aligned.field('close')[filled])
+        np.testing.assert_array_equal(aligned.field('spread'), spread.to_numpy())
+
+    def test_extend(self):
+        for fill in (None, 'ffill', 'prev_close'):
+            split = datetime(2024, 1, 20)
+            head = {symbol: price_data.between(None, split) for symbol, price_data in self.data.items()}
+            aligned = AlignedBars(head, fill=fill, dtype=np.float32)
+
+            # Append the rest in chunks, with one overlapping bar per symbol
+            tail = {symbol: price_data.between(split, None) for symbol, price_data in self.data.items()}
+            for start in range(0, 300, 50):
+                chunk = {symbol: PriceData.from_arrays(symbol, price_data.resolution, price_data.time[start:start + 51],
+                                                       price_data.prices[:, start:start + 51],
+                                                       price_data.spread[start:start + 51])
+                         for symbol, price_data in tail.items()}
+                aligned.extend(chunk)
+
+            expected = AlignedBars(self.data, fill=fill, dtype=np.float32)
+            np.testing.assert_array_equal(aligned.times, expected.times)
+            np.testing.assert_array_equal(aligned.values, expected.values)
+            np.testing.assert_array_equal(aligned.mask, expected.mask)
+
+    def test_extend_insert(self):
+        data = dict(self.data)
+        data["EURUSD"] = self.data["EURUSD"].between(datetime(2024, 1, 15), None)
+        aligned = AlignedBars(data, fill='ffill')
+        added = aligned.extend({"EURUSD": self.data["EURUSD"].between(None, datetime(2024, 1, 16))})
+
+        expected = AlignedBars(self.data, fill='ffill')
+        self.assertGreater(added, 0)
+        np.testing.assert_array_equal(aligned.times, expected.times)
+        np.testing.assert_array_equal(aligned.values, expected.values)
+        self.assertRaises(ValueError, aligned.extend, {"XAUUSD": self.data["EURUSD"]})
+        self.assertRaises(ValueError, AlignedBars, self.data, fill='zero')
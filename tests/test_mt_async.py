@@ -0,0 +1,152 @@
+import time
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+from mt5_dataloader.mt_async import AsyncMTDataLoader
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+from mt5_dataloader.mt_utils import MTPriority
+
+RATES = {"time": [1, 2, 3],
+         "open": [1, 2, 3],
+         "high": [1, 2, 3],
+         "low": [1, 2, 3],
+         "close": [1, 2, 3],
+         "spread": [1, 2, 3]}
+
+
+class TestAsyncMTDataLoader(unittest.IsolatedAsyncioTestCase):
+    """
+    Tests for the AsyncMTDataLoader class
+    """
+    @patch("MetaTrader5.account_info")
+    def setUp(self, mock_account_info):
+        mock_account_info.return_value = True
+        self.loader = AsyncMTDataLoader(MTDataLoader())
+        self.symbol = "GBPUSD"
+
+    def tearDown(self):
+        self.loader.close()
+
+    @patch("MetaTrader5.copy_rates_from_pos")
+    async def test_coalescing(self, mock_rates):
+        """
+        Tests that identical concurrent requests share one terminal call.
+        """
+        def rates(*args):
+            time.sleep(0.05)
+            return RATES
+
+        mock_rates.side_effect = rates
+
+        results = await asyncio.gather(*[
+            self.loader.get_price_data(self.symbol, MTResolutions.RESOLUTION_H1, MTRequests.POSITION)
+            for _ in range(5)])
+
+        self.assertEqual(mock_rates.call_count, 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(results[0].data['open'].sum(), 6)
+        self.assertEqual(self.loader.inflight, {})
+
+    @patch("MetaTrader5.copy_rates_from_pos")
+    async def test_priority(self, mock_rates):
+        """
+        Tests that live requests run before queued bulk requests.
+        """
+        order = []
+        release = threading.Event()
+
+        def rates(symbol, *args):
+            if symbol == "BLOCK":
+                release.wait()
+            order.append(symbol)
+            return RATES
+
+        mock_rates.side_effect = rates
+
+        blocker = asyncio.ensure_future(
+            self.loader.get_price_data("BLOCK", MTResolutions.RESOLUTION_H1, MTRequests.POSITION))
+        await asyncio.sleep(0.05)
+
+        bulk = [asyncio.ensure_future(self.loader.get_price_data(
+            f"BULK{i}", MTResolutions.RESOLUTION_H1, MTRequests.POSITION, priority=MTPriority.BULK)) for i in range(3)]
+        await asyncio.sleep(0.05)
+        live = asyncio.ensure_future(self.loader.get_price_data(
+            "LIVE", MTResolutions.RESOLUTION_H1, MTRequests.POSITION, priority=MTPriority.LIVE))
+        await asyncio.sleep(0.05)
+
+        release.set()
+        await asyncio.gather(blocker, live, *bulk)
+
+        self.assertEqual(order[:2], ["BLOCK", "LIVE"])
+
+    @patch("MetaTrader5.copy_rates_from_pos")
+    async def test_promotion(self, mock_rates):
+        """
+        Tests that a live request joining a queued bulk request moves it ahead of the bulk backlog, whether it is
+        queued for the terminal or waiting for a bulk slot.
+        """
+        order = []
+        release = threading.Event()
+
+        def rates(symbol, *args):
+            if symbol == "BLOCK":
+                release.wait()
+            order.append(symbol)
+            return RATES
+
+        mock_rates.side_effect = rates
+
+        for max_bulk_pending in (8, 2):
+            with self.subTest(max_bulk_pending=max_bulk_pending):
+                order.clear()
+                release.clear()
+                self.loader.max_bulk_pending = max_bulk_pending
+                self.loader.bulk_slots = None
+                calls = mock_rates.call_count
+
+                def request(symbol, priority=MTPriority.BULK):
+                    return asyncio.ensure_future(self.loader.get_price_data(
+                        symbol, MTResolutions.RESOLUTION_H1, MTRequests.POSITION, priority=priority))
+
+                blocker = request("BLOCK")
+                await asyncio.sleep(0.05)
+                bulk = [request(f"BULK{i}") for i in range(3)] + [request("SHARED")]
+                await asyncio.sleep(0.05)
+                live = request("SHARED", MTPriority.LIVE)
+                await asyncio.sleep(0.05)
+
+                release.set()
+                results = await asyncio.gather(blocker, live, *bulk)
+
+                self.assertEqual(order[:2], ["BLOCK", "SHARED"])
+                self.assertIs(results[1], results[-1])
+                self.assertEqual(mock_rates.call_count - calls, 5)
+                self.assertEqual(self.loader.inflight, {})
+
+    @patch("MetaTrader5.copy_rates_from_pos")
+    async def test_bulk_backpressure(self, mock_rates):
+        """
+        Tests that bulk requests beyond the limit wait before reaching the terminal queue.
+        """
+        release = threading.Event()
+
+        def rates(*args):
+            release.wait()
+            return RATES
+
+        mock_rates.side_effect = rates
+        self.loader.max_bulk_pending = 2
+
+        bulk = [asyncio.ensure_future(self.loader.get_price_data(
+            f"BULK{i}", MTResolutions.RESOLUTION_H1, MTRequests.POSITION, priority=MTPriority.BULK)) for i in range(5)]
+        await asyncio.sleep(0.05)
+
+        self.assertLessEqual(self.loader.jobs.qsize(), 1)
+
+        release.set()
+        results = await asyncio.gather(*bulk)
+        self.assertEqual(len(results), 5)
@@ -0,0 +1,83 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from mt5_dataloader import mt_backend
+from mt5_dataloader.mt_backend import SharedConnection, shared_connection
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import FakeTerminal
+from mt5_dataloader.mt_lazy import LazyModule
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+
+
+class TestSharedConnection(unittest.TestCase):
+    """
+    Tests deferred terminal launch and connection sharing
+    """
+    def setUp(self):
+        self.backend = FakeTerminal()
+        self.backend.account_info = MagicMock(return_value=None)
+        self.backend.initialize = MagicMock(return_value=True)
+
+    def test_deferred_launch(self):
+        mt_dataloader = MTDataLoader(path="fake", backend=self.backend)
+        self.backend.initialize.assert_not_called()
+
+        mt_dataloader.get_price_data("GBPUSD", MTResolutions.RESOLUTION_H1, MTRequests.POSITION, num_bars=10)
+        mt_dataloader.get_price_data("GBPUSD", MTResolutions.RESOLUTION_H1, MTRequests.POSITION, num_bars=10)
+        self.backend.initialize.assert_called_once_with("fake")
+
+    def test_shared_across_loaders(self):
+        connection = SharedConnection(self.backend, "fake")
+        loaders = [MTDataLoader(path="fake", backend=connection) for _ in range(3)]
+        for loader in loaders:
+            loader.launch_mt5()
+        self.backend.initialize.assert_called_once_with("fake")
+
+    def test_failed_launch(self):
+        self.backend.initialize.return_value = False
+        self.backend.last_error = MagicMock(return_value=(-10003, "IPC initialize failed"))
+        connection = SharedConnection(self.backend, "fake")
+        with self.assertRaisesRegex(RuntimeError, "IPC initialize failed"):
+            connection.copy_rates_from_pos("GBPUSD", MTResolutions.RESOLUTION_H1.value, 0, 10)
+        self.assertFalse(connection.connected)
+
+        # The launch is retried on the next call
+        self.backend.initialize.return_value = True
+        self.assertEqual(len(connection.copy_rates_from_pos("GBPUSD", MTResolutions.RESOLUTION_H1.value, 0, 10)), 10)
+        self.assertTrue(connection.connected)
+
+    @patch.object(mt_backend, "default_connection", None)
+    def test_shared_connection_path(self):
+        connection = shared_connection()
+        self.assertIs(shared_connection("C:/MT5/terminal64.exe"), connection)
+        self.assertIs(shared_connection("C:/MT5/terminal64.exe"), connection)
+        self.assertIs(shared_connection(), connection)
+        self.assertEqual(connection.path, "C:/MT5/terminal64.exe")
+        # A path not yet connected is replaced
+        self.assertIs(shared_connection("D:/Other/terminal64.exe"), connection)
+        self.assertEqual(connection.path, "D:/Other/terminal64.exe")
+
+        connection.connected = True
+        self.assertIs(shared_connection("D:/Other/./terminal64.exe"), connection)
+        self.assertRaises(RuntimeError, shared_connection, "C:/MT5/terminal64.exe")
+
+    @patch.dict("os.environ", clear=True)
+    @patch.object(mt_backend, "default_connection", None)
+    def test_unset_env_path(self):
+        """
+        Tests that a loader created without MT5_PATH does not pin an empty path on the shared connection.
+        """
+        MTDataLoader()
+        self.assertIsNone(mt_backend.default_connection.path)
+        loader = MTDataLoader(path="C:/MT5/terminal64.exe")
+        self.assertEqual(loader.connection.path, "C:/MT5/terminal64.exe")
+
+
+class TestLazyModule(unittest.TestCase):
+
+    def test_loaded_on_first_use(self):
+        module = LazyModule("json")
+        self.assertFalse(module.loaded)
+        self.assertEqual(module.dumps([1]), "[1]")
+        self.assertTrue(module.loaded)
@@ -0,0 +1,144 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime as dt, timedelta
+
+from mt5_dataloader.mt_backfill import BackfillScheduler
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import FakeTerminal
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+from mt5_dataloader.mt_utils import SymbolCategories
+
+
+class FlakyTerminal(FakeTerminal):
+    """
+    Raises on the first `failures` range requests.
+    """
+    def __init__(self, failures, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    def copy_rates_range(self, *args):
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("Terminal busy")
+        return super().copy_rates_range(*args)
+
+
+class TestBackfillScheduler(unittest.TestCase):
+    """
+    Tests planning, checkpoints and retries of the BackfillScheduler class
+    """
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.checkpoint = os.path.join(self.path, "checkpoint.json")
+        self.backend = FakeTerminal(num_symbols=20)
+        self.mt_dataloader = MTDataLoader(path="fake", backend=self.backend)
+        self.spec = dict(start_date=dt(2024, 1, 1), end_date=dt(2024, 3, 31), symbols=["EURUSD", "GBPUSD"],
+                         resolutions=[MTResolutions.RESOLUTION_H1, MTResolutions.RESOLUTION_D1],
+                         chunk=timedelta(days=30))
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def scheduler(self, loader=None, **kwargs):
+        return BackfillScheduler(loader or self.mt_dataloader, self.checkpoint, verbose=False, backoff=0.01, **kwargs)
+
+    def test_resume(self):
+        scheduler = self.scheduler()
+        self.assertEqual(scheduler.plan(**self.spec), 16)
+        scheduler.run(max_jobs=5)
+
+        collected = []
+        resumed = self.scheduler(consumer=collected.append)
+        self.assertEqual(resumed.plan(**self.spec), 11)
+        progress = resumed.run()
+        self.assertEqual(progress["done"], 16)
+        self.assertEqual(progress["eta"], 0)
+        self.assertEqual(len(collected), 11)
+        self.assertIn("h1", resumed.throughput())
+
+        expected = self.mt_dataloader.get_price_data("GBPUSD", MTResolutions.RESOLUTION_H1, MTRequests.RANGE,
+                                                     start_date=dt(2024, 1, 1), end_date=dt(2024, 3, 31))
+        self.assertEqual(sum(state["bars"] for job_id, state in resumed.states.items() if job_id.startswith(
+            "GBPUSD/h1")), len(expected))
+
+    def test_journal(self):
+        """
+        Tests that an interrupted run resumes from the journal, and that the checkpoint is only rewritten at the end.
+        """
+        def consumer(price_data):
+            if len(collected) == 2:
+                raise KeyboardInterrupt
+            collected.append(price_data)
+
+        collected = []
+        scheduler = self.scheduler(consumer=consumer)
+        scheduler.plan(**self.spec)
+        with open(self.checkpoint) as f:
+            planned = f.read()
+        self.assertRaises(KeyboardInterrupt, scheduler.run)
+        with open(self.checkpoint) as f:
+            self.assertEqual(f.read(), planned)
+        with open(scheduler.journal_path) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        resumed = self.scheduler()
+        self.assertEqual(resumed.plan(**self.spec), 14)
+        self.assertFalse(os.path.exists(resumed.journal_path))
+        self.assertEqual(resumed.run()["done"], 16)
+        self.assertFalse(os.path.exists(resumed.journal_path))
+
+    def test_new_symbols(self):
+        """
+        Tests that symbols added to a plan are merged into its checkpoint instead of resetting it.
+        """
+        spec = dict(self.spec, symbols=["EURUSD"])
+        scheduler = self.scheduler()
+        self.assertEqual(scheduler.plan(**spec), 8)
+        scheduler.run()
+
+        self.assertEqual(self.scheduler().plan(**self.spec), 8)
+        # Symbols dropped from a plan keep their states in the checkpoint
+        scheduler = self.scheduler()
+        self.assertEqual(scheduler.plan(**dict(self.spec, symbols=["GBPUSD"])), 8)
+        scheduler.run()
+        self.assertEqual(self.scheduler().plan(**self.spec), 0)
+        # Other date ranges start over
+        self.assertEqual(self.scheduler().plan(**dict(self.spec, end_date=dt(2024, 4, 30))), 20)
+
+    def test_retries(self):
+        loader = MTDataLoader(path="fake", backend=FlakyTerminal(2))
+        scheduler = self.scheduler(loader)
+        scheduler.plan(dt(2024, 1, 1), dt(2024, 1, 10), symbols=["EURUSD"], resolutions=[MTResolutions.RESOLUTION_H1])
+        progress = scheduler.run()
+        self.assertEqual(scheduler.states["EURUSD/h1/20240101000000"]["attempts"], 3)
+        self.assertEqual(progress["done"], 1)
+
+        scheduler = self.scheduler(max_attempts=2)
+        scheduler.plan(dt(2024, 1, 1), dt(2024, 1, 10), symbols=["UNKNOWN"], resolutions=[MTResolutions.RESOLUTION_H1])
+        progress = scheduler.run()
+        # No data is not retried
+        self.assertEqual(scheduler.states["UNKNOWN/h1/20240101000000"]["state"], "empty")
+        self.assertEqual(scheduler.states["UNKNOWN/h1/20240101000000"]["attempts"], 1)
+        self.assertEqual(progress["empty"], 1)
+
+        scheduler = self.scheduler(MTDataLoader(path="fake", backend=FlakyTerminal(5)), max_attempts=2)
+        scheduler.plan(dt(2024, 1, 1), dt(2024, 1, 10), symbols=["GBPUSD"], resolutions=[MTResolutions.RESOLUTION_H1])
+        self.assertEqual(scheduler.run()["failed"], 1)
+        self.assertEqual(scheduler.states["GBPUSD/h1/20240101000000"]["attempts"], 2)
+
+        # An error of an earlier attempt does not mark a job without data as failed
+        scheduler = self.scheduler(MTDataLoader(path="fake", backend=FlakyTerminal(1)), max_attempts=2)
+        scheduler.plan(dt(2024, 1, 1), dt(2024, 1, 10), symbols=["UNKNOWN"], resolutions=[MTResolutions.RESOLUTION_H1])
+        scheduler.run()
+        self.assertEqual(scheduler.states["UNKNOWN/h1/20240101000000"]["state"], "empty")
+        self.assertNotIn("error", scheduler.states["UNKNOWN/h1/20240101000000"])
+
+    def test_categories(self):
+        scheduler = self.scheduler()
+        scheduler.plan(dt(2024, 1, 1), dt(2024, 1, 10), categories=[SymbolCategories.FX_MAJORS.value],
+                       resolutions=[MTResolutions.RESOLUTION_D1])
+        self.assertEqual(len(scheduler.jobs), 6)
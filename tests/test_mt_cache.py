@@ -0,0 +1,170 @@
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from datetime import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from mt5_dataloader.mt_cache import BarCache
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import FakeTerminal
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+
+
+def make_rates(start: dt, periods: int, freq: str = 'h') -> dict:
+    times = pd.date_range(start=start, periods=periods, freq=freq)
+    values = list(range(periods))
+    return {"time": ((times - pd.Timestamp(0)) // pd.Timedelta(seconds=1)).tolist(),
+            "open": values,
+            "high": values,
+            "low": values,
+            "close": values,
+            "spread": values,
+            "tick_volume": values,
+            "real_volume": [0] * periods}
+
+
+class TestBarCache(unittest.TestCase):
+    """
+    Tests for the BarCache class
+    """
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache = BarCache(self.root)
+        self.symbol = "GBPUSD"
+        self.resolution = MTResolutions.RESOLUTION_H1.value
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_missing(self):
+        """
+        Tests that only uncovered head and tail ranges are reported as missing.
+        """
+        data = MTDataLoader.rates_to_frame(make_rates(dt(2024, 1, 10), 24))
+        self.cache.write(self.symbol, self.resolution, data, dt(2024, 1, 10), dt(2024, 1, 11))
+
+        self.assertEqual(self.cache.missing(self.symbol, self.resolution, dt(2024, 1, 10), dt(2024, 1, 11)), [])
+
+        gaps = self.cache.missing(self.symbol, self.resolution, dt(2024, 1, 1), dt(2024, 1, 20))
+        self.assertEqual(len(gaps), 2)
+        self.assertEqual(gaps[0][0], dt(2024, 1, 1))
+        self.assertLess(gaps[0][1], dt(2024, 1, 10))
+        self.assertGreater(gaps[1][0], dt(2024, 1, 11))
+        self.assertEqual(gaps[1][1], dt(2024, 1, 20))
+
+    def test_read_across_months(self):
+        """
+        Tests that bars spanning several monthly partitions are merged back in order.
+        """
+        data = MTDataLoader.rates_to_frame(make_rates(dt(2024, 1, 31), 48))
+        self.cache.write(self.symbol, self.resolution, data, dt(2024, 1, 31), dt(2024, 2, 2))
+
+        result = self.cache.read(self.symbol, self.resolution, dt(2024, 1, 31), dt(2024, 2, 2))
+        self.assertEqual(len(result), 48)
+        self.assertTrue(result.index.is_monotonic_increasing)
+
+    def test_invalidate(self):
+        """
+        Tests that invalidation removes coverage and stored bars.
+        """
+        data = MTDataLoader.rates_to_frame(make_rates(dt(2024, 1, 10), 24))
+        self.cache.write(self.symbol, self.resolution, data, dt(2024, 1, 10), dt(2024, 1, 11))
+
+        self.cache.invalidate(symbol=self.symbol)
+
+        self.assertEqual(self.cache.covered(self.symbol, self.resolution), [])
+        self.assertEqual(self.cache.size(), 0)
+
+    def test_size_cap(self):
+        """
+        Tests that least recently used series are evicted once the size cap is exceeded.
+        """
+        data = MTDataLoader.rates_to_frame(make_rates(dt(2024, 1, 10), 24))
+        self.cache.write("EURUSD", self.resolution, data, dt(2024, 1, 10), dt(2024, 1, 11))
+        self.cache.max_bytes = self.cache.size()
+        self.cache.write(self.symbol, self.resolution, data, dt(2024, 1, 10), dt(2024, 1, 11))
+
+        self.assertEqual(self.cache.covered("EURUSD", self.resolution), [])
+        self.assertNotEqual(self.cache.covered(self.symbol, self.resolution), [])
+
+
+class TestCachedPriceData(unittest.TestCase):
+    """
+    Tests `MTDataLoader.get_price_data` with the on-disk cache enabled
+    """
+    @patch("MetaTrader5.account_info")
+    def setUp(self, mock_account_info):
+        mock_account_info.return_value = True
+        self.root = tempfile.mkdtemp()
+        self.mt_dataloader = MTDataLoader(cache_dir=self.root)
+        self.symbol = "GBPUSD"
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    @patch("MetaTrader5.copy_rates_range")
+    def test_gap_fill(self, mock_rates):
+        """
+        Tests that repeated requests are served from disk and extended requests only fetch the missing tail.
+        """
+        mock_rates.return_value = make_rates(dt(2024, 1, 1), 24)
+
+        result = self.mt_dataloader.get_price_data(
+            symbol=self.symbol,
+            resolution=MTResolutions.RESOLUTION_H1,
+            request_type=MTRequests.RANGE,
+            start_date=dt(2024, 1, 1),
+            end_date=dt(2024, 1, 1, 23)
+        )
+        self.assertEqual(len(result.data), 24)
+        self.assertEqual(mock_rates.call_count, 1)
+
+        # Fully cached
+        result = self.mt_dataloader.get_price_data(
+            symbol=self.symbol,
+            resolution=MTResolutions.RESOLUTION_H1,
+            request_type=MTRequests.RANGE,
+            start_date=dt(2024, 1, 1),
+            end_date=dt(2024, 1, 1, 23)
+        )
+        self.assertEqual(len(result.data), 24)
+        self.assertEqual(mock_rates.call_count, 1)
+
+        # Extended tail
+        mock_rates.return_value = make_rates(dt(2024, 1, 2), 24)
+        result = self.mt_dataloader.get_price_data(
+            symbol=self.symbol,
+            resolution=MTResolutions.RESOLUTION_H1,
+            request_type=MTRequests.RANGE,
+            start_date=dt(2024, 1, 1),
+            end_date=dt(2024, 1, 2, 23)
+        )
+        self.assertEqual(len(result.data), 48)
+        self.assertEqual(mock_rates.call_count, 2)
+        self.assertGreater(mock_rates.call_args[0][2], dt(2024, 1, 1, 23))
+
+    def test_loader_settings(self):
+        """
+        Tests that loaders with different dtype and volume settings share the cache without reading each other's
+        columns.
+        """
+        backend = FakeTerminal()
+        request = dict(symbol=self.symbol, resolution=MTResolutions.RESOLUTION_H1, request_type=MTRequests.RANGE,
+                       start_date=dt(2024, 1, 1))
+        MTDataLoader(path="fake", backend=backend, cache_dir=self.root).get_price_data(
+            **request, end_date=dt(2024, 1, 10))
+
+        for kwargs in (dict(price_dtype=np.float32, volumes=True), dict(compact=True, volumes=True), dict()):
+            with self.subTest(**kwargs):
+                expected = MTDataLoader(path="fake", backend=backend, **kwargs).get_price_data(
+                    **request, end_date=dt(2024, 1, 20))
+                # Extends the cached series
+                result = MTDataLoader(path="fake", backend=backend, cache_dir=self.root, **kwargs).get_price_data(
+                    **request, end_date=dt(2024, 1, 20))
+                pd.testing.assert_frame_equal(result.data, expected.data, check_index_type=False)
+                self.assertFalse(result.data.isna().any().any())
+
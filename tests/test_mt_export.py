@@ -0,0 +1,82 @@
+import shutil
+import tempfile
+import unittest
+from datetime import datetime as dt, timedelta
+
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_export import MTExporter
+from mt5_dataloader.mt_fake import FakeTerminal
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+
+
+class TestExport(unittest.TestCase):
+    """
+    Tests exporting PriceData to partitioned files
+    """
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.mt_dataloader = MTDataLoader(path="fake", backend=FakeTerminal(), export_dir=self.path)
+        self.symbol = "GBPUSD"
+        self.resolution = MTResolutions.RESOLUTION_H1
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_formats(self):
+        price = self.mt_dataloader.get_price_data(self.symbol, self.resolution, MTRequests.RANGE,
+                                                  start_date=dt(2024, 1, 1), end_date=dt(2024, 3, 15))
+        for fmt in ("parquet", "feather", "npy"):
+            for compact in (False, True):
+                with self.subTest(fmt=fmt, compact=compact):
+                    with MTExporter(f"{self.path}/{fmt}{compact}", fmt=fmt) as exporter:
+                        data = price if not compact else \
+                            type(price).from_rates(price.symbol, price.resolution, price.data)
+                        exporter.export(data)
+                    self.assertEqual(len(exporter.parts(self.symbol, self.resolution.value)), 3)
+                    self.assertTrue(exporter.read(self.symbol, self.resolution.value).equals(price.data))
+
+    def test_append(self):
+        """
+        Tests that overlapping exports only add new bars as new part files.
+        """
+        start = dt(2024, 1, 1)
+        for days in (10, 20, 20, 40):
+            self.mt_dataloader.get_price_data(self.symbol, self.resolution, MTRequests.RANGE, start_date=start,
+                                              end_date=start + timedelta(days=days), export=True)
+        self.mt_dataloader.exporter.flush()
+
+        expected = self.mt_dataloader.get_price_data(self.symbol, self.resolution, MTRequests.RANGE,
+                                                     start_date=start, end_date=start + timedelta(days=40))
+        exported = self.mt_dataloader.exporter.read(self.symbol, self.resolution.value)
+        self.assertTrue(exported.equals(expected.data))
+        # Jan (3 exports) + Feb (1 export)
+        self.assertEqual(len(self.mt_dataloader.exporter.parts(self.symbol, self.resolution.value)), 4)
+
+    def test_older_range(self):
+        """
+        Tests that exporting an older range, then a range overlapping both, adds only the missing bars.
+        """
+        exporter = MTExporter(self.path, fmt="npy")
+        first = self.mt_dataloader.get_price_data(self.symbol, self.resolution, MTRequests.RANGE,
+                                                  start_date=dt(2024, 3, 1), end_date=dt(2024, 3, 20))
+        older = self.mt_dataloader.get_price_data(self.symbol, self.resolution, MTRequests.RANGE,
+                                                  start_date=dt(2024, 1, 10), end_date=dt(2024, 2, 10))
+        spanning = self.mt_dataloader.get_price_data(self.symbol, self.resolution, MTRequests.RANGE,
+                                                     start_date=dt(2024, 1, 1), end_date=dt(2024, 3, 31))
+        self.assertEqual(exporter.write(first), len(first.data))
+        self.assertEqual(exporter.write(older), len(older.data))
+        self.assertEqual(len(exporter.ranges(self.symbol, self.resolution.value)), 2)
+        self.assertEqual(exporter.write(spanning), len(spanning.data) - len(first.data) - len(older.data))
+        self.assertEqual(exporter.write(older), 0)
+
+        self.assertEqual(len(exporter.ranges(self.symbol, self.resolution.value)), 1)
+        self.assertTrue(exporter.read(self.symbol, self.resolution.value).equals(spanning.data))
+        # The manifest is reloaded by new exporters
+        reopened = MTExporter(self.path, fmt="npy")
+        self.assertEqual(reopened.last_time(self.symbol, self.resolution.value), int(spanning.times[-1]))
+
+    def test_export_requires_directory(self):
+        mt_dataloader = MTDataLoader(path="fake", backend=FakeTerminal())
+        self.assertRaises(ValueError, lambda: mt_dataloader.get_price_data(
+            self.symbol, self.resolution, MTRequests.POSITION, export=True))
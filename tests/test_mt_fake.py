@@ -0,0 +1,63 @@
+import unittest
+from datetime import datetime as dt
+
+import numpy as np
+
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import FakeTerminal, RATES_DTYPE
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+from mt5_dataloader.mt_utils import SymbolCategories
+
+
+class TestFakeTerminal(unittest.TestCase):
+    """
+    Tests MTDataLoader against the synthetic terminal backend. Runs without MetaTrader5.
+    """
+    def setUp(self):
+        self.backend = FakeTerminal(num_symbols=50)
+        self.mt_dataloader = MTDataLoader(path="fake", backend=self.backend)
+        self.symbol = "GBPUSD"
+
+    def test_rates_layout(self):
+        rates = self.backend.copy_rates_range(self.symbol, MTResolutions.RESOLUTION_H1.value,
+                                              dt(2024, 1, 1), dt(2024, 1, 8))
+        self.assertEqual(rates.dtype, RATES_DTYPE)
+        self.assertTrue(np.all(rates['high'] >= np.maximum(rates['open'], rates['close'])))
+        self.assertTrue(np.all(rates['low'] <= np.minimum(rates['open'], rates['close'])))
+        # Weekend bars are skipped. 2024-01-01 is a Monday.
+        self.assertEqual(len(rates), 5 * 24 + 1)
+
+    def test_request_types(self):
+        """
+        Tests that every request type returns consistent bars for the same timestamps.
+        """
+        position = self.mt_dataloader.get_price_data(
+            self.symbol, MTResolutions.RESOLUTION_M15, MTRequests.POSITION, num_bars=500)
+        self.assertEqual(len(position.data), 500)
+
+        end_date = position.data.index[-1].to_pydatetime()
+        date = self.mt_dataloader.get_price_data(
+            self.symbol, MTResolutions.RESOLUTION_M15, MTRequests.DATE, end_date=end_date, num_bars=500)
+        self.assertTrue(date.data.equals(position.data))
+
+        start_date = position.data.index[0].to_pydatetime()
+        range_ = self.mt_dataloader.get_price_data(
+            self.symbol, MTResolutions.RESOLUTION_M15, MTRequests.RANGE, start_date=start_date, end_date=end_date)
+        self.assertTrue(range_.data.equals(position.data))
+
+    def test_unknown_symbol(self):
+        result = self.mt_dataloader.get_price_data("UNKNOWN", MTResolutions.RESOLUTION_M15, MTRequests.POSITION)
+        self.assertIsNone(result)
+
+    def test_symbols(self):
+        self.assertEqual(self.mt_dataloader.get_symbols(SymbolCategories.FX_MAJORS.value),
+                         ['EURUSD', 'GBPUSD', 'USDCHF', 'USDJPY', 'USDCAD', 'AUDUSD'])
+        self.assertEqual(len(self.mt_dataloader.categories()), len(SymbolCategories))
+        self.assertEqual(self.mt_dataloader.get_symbol_properties("USDJPY"), (1.0, 0.001))
+
+    def test_ticks(self):
+        ticks = self.mt_dataloader.get_tick_data(
+            self.symbol, MTRequests.RANGE, start_date=dt(2024, 1, 2), end_date=dt(2024, 1, 2, 0, 10))
+        self.assertEqual(len(ticks), 10 * 60 * 4 + 4)
+        self.assertTrue(np.all(ticks.ask > ticks.bid))
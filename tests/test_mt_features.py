@@ -0,0 +1,116 @@
+import unittest
+from unittest import mock
+from datetime import datetime as dt
+
+import numpy as np
+
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import FakeTerminal
+from mt5_dataloader.mt_features import FeaturePipeline, Feature
+from mt5_dataloader.mt_live import LiveBars
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+
+FEATURES = ['returns', 'log_returns', 'atr_14', 'volatility_20', 'spread_mean_10', 'spread_std_10']
+
+
+class TestFeatures(unittest.TestCase):
+    """
+    Tests vectorized and incremental features against pandas computed from scratch
+    """
+    def setUp(self):
+        self.backend = FakeTerminal()
+        self.mt_dataloader = MTDataLoader(path="fake", backend=self.backend, compact=True)
+        self.symbols = ["GBPUSD", "EURUSD", "USDJPY"]
+
+    def get(self, symbol, start=dt(2024, 5, 1), end=dt(2024, 5, 10)):
+        return self.mt_dataloader.get_price_data(symbol, MTResolutions.RESOLUTION_M1, MTRequests.RANGE,
+                                                 start_date=start, end_date=end)
+
+    @staticmethod
+    def expected(price_data):
+        df = price_data.data
+        previous = df['close'].shift()
+        true_range = np.maximum(df['high'], previous.fillna(df['high'])) - np.minimum(df['low'],
+                                                                                      previous.fillna(df['low']))
+        log_returns = np.log(df['close'] / previous)
+        return {
+            'returns': df['close'].pct_change(),
+            'log_returns': log_returns,
+            'atr_14': true_range.rolling(14).mean(),
+            'volatility_20': log_returns.rolling(20).std(),
+            'spread_mean_10': df['spread'].rolling(10).mean(),
+            'spread_std_10': df['spread'].rolling(10).std(),
+        }
+
+    def assert_features(self, features, expected):
+        self.assertEqual(set(features), set(expected))
+        for name, values in expected.items():
+            np.testing.assert_allclose(features[name], values.to_numpy(), rtol=1e-7, atol=1e-12, err_msg=name)
+
+    def test_parse(self):
+        self.assertEqual(Feature.parse('atr_14'), Feature('atr', 14))
+        self.assertEqual(Feature.parse('spread_std_10').name, 'spread_std_10')
+        self.assertEqual(Feature.parse('returns'), Feature('returns'))
+        with self.assertRaises(ValueError):
+            Feature.parse('atr')
+        with self.assertRaises(ValueError):
+            Feature.parse('volatility_1')
+        with self.assertRaises(ValueError):
+            Feature.parse('momentum_5')
+
+    def test_compute_many(self):
+        data = {symbol: self.get(symbol) for symbol in self.symbols}
+        # Different lengths, so that windows must not cross series
+        data["EURUSD"] = data["EURUSD"].slice(0, 7)
+        results = FeaturePipeline(FEATURES).compute(data)
+        for symbol, price_data in data.items():
+            self.assert_features(results[(symbol, price_data.resolution)], self.expected(price_data))
+
+        # Several passes of concatenated series
+        with mock.patch('mt5_dataloader.mt_features.BATCH_ROWS', 1000):
+            results = FeaturePipeline(FEATURES).compute(data)
+        for symbol, price_data in data.items():
+            self.assert_features(results[(symbol, price_data.resolution)], self.expected(price_data))
+
+        single = data["GBPUSD"].features(FEATURES)
+        self.assert_features(single, self.expected(data["GBPUSD"]))
+
+    def test_incremental(self):
+        full = {symbol: self.get(symbol) for symbol in self.symbols}
+        pipeline = FeaturePipeline(FEATURES)
+        pipeline.compute({symbol: price_data.slice(0, 5) for symbol, price_data in full.items()})
+
+        # Overlapping chunks, including a single bar, a replaced last bar and bars already stored
+        for lo, hi in ((4, 6), (6, 7), (7, 7), (3, 500), (499, 3000), (3000, 3001), (2900, len(full["GBPUSD"]))):
+            updated = pipeline.update([price_data.slice(lo, hi) for price_data in full.values()])
+            self.assertEqual(len(updated), len(self.symbols) if hi > lo else 0)
+
+        for symbol, price_data in full.items():
+            self.assert_features(pipeline.get(symbol, price_data.resolution), self.expected(price_data))
+
+    def test_live(self):
+        live = LiveBars(self.mt_dataloader, size=300)
+        live.subscribe("GBPUSD", MTResolutions.RESOLUTION_M1)
+        pipeline = FeaturePipeline(FEATURES)
+        pipeline.update(live.window("GBPUSD", MTResolutions.RESOLUTION_M1))
+
+        stored = pipeline.states[("GBPUSD", MTResolutions.RESOLUTION_M1.value)]
+        for seconds in (30, 60, 600):
+            self.backend.now += seconds
+            live.update()
+            length = stored.length
+            pipeline.update(live.window("GBPUSD", MTResolutions.RESOLUTION_M1))
+            self.assertEqual(stored.length, length + (self.backend.now // 60 - (self.backend.now - seconds) // 60))
+
+        window = live.window("GBPUSD", MTResolutions.RESOLUTION_M1, 100)
+        features = pipeline.get("GBPUSD", MTResolutions.RESOLUTION_M1.value)
+        expected = self.expected(self.mt_dataloader.get_price_data(
+            "GBPUSD", MTResolutions.RESOLUTION_M1, MTRequests.POSITION, num_bars=stored.length))
+        for name, values in features.items():
+            np.testing.assert_allclose(values[-len(window):], expected[name].to_numpy()[-len(window):], rtol=1e-7,
+                                       atol=1e-12, err_msg=name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import FakeTerminal
+from mt5_dataloader.mt_integrity import check, repair, slots
+from mt5_dataloader.mt_pricedata import PriceData
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+
+
+class TestIntegrity(unittest.TestCase):
+    """
+    Tests integrity checks and repairs against synthetic bars with injected defects
+    """
+    def setUp(self):
+        self.backend = FakeTerminal()
+        self.mt_dataloader = MTDataLoader(path="fake", backend=self.backend, compact=True)
+        self.symbol = "GBPUSD"
+
+    def get(self, resolution, start=datetime(2024, 1, 1), end=datetime(2024, 3, 1)):
+        return self.mt_dataloader.get_price_data(self.symbol, resolution, MTRequests.RANGE,
+                                                 start_date=start, end_date=end)
+
+    def defective(self, clean):
+        """
+        Copy of `clean` with a gap, a duplicate, a swapped pair, a weekend bar, an invalid and a zero-range bar and a
+        spread outlier.
+        """
+        time = clean.time.copy()
+        prices = clean.prices.copy()
+        spread = clean.spread.copy()
+        keep = np.ones(len(time), dtype=bool)
+        keep[100:103] = False
+        order = np.flatnonzero(keep)
+        order = np.insert(order, 200, order[199])
+        order[[300, 301]] = order[[301, 300]]
+        time, prices, spread = time[order], prices[:, order], spread[order]
+
+        # Saturday 2024-01-06 00:00
+        time[400] = 1704499200
+        prices[1, 500] = prices[2, 500] - 1.0
+        prices[:, 600] = prices[0, 600]
+        spread[700] = 10000
+        return PriceData.from_arrays(self.symbol, clean.resolution, time, prices, spread)
+
+    def test_clean(self):
+        for resolution in MTResolutions:
+            report = check(self.get(resolution, start=datetime(2020, 1, 1)))
+            self.assertTrue(report.ok, (resolution, report.summary()))
+
+    def test_defects(self):
+        clean = self.get(MTResolutions.RESOLUTION_H1)
+        report = check(self.defective(clean))
+
+        self.assertFalse(report.ok)
+        self.assertEqual(report.non_monotonic.tolist(), [301, 400])
+        self.assertEqual(report.duplicates.tolist(), [200])
+        self.assertEqual(report.outside_calendar.tolist(), [400])
+        self.assertEqual(report.invalid_ohlc.tolist(), [500])
+        self.assertEqual(report.zero_range.tolist(), [600])
+        self.assertEqual(report.spread_outliers.tolist(), [700])
+        # Three removed bars, and the bar replaced by the weekend bar
+        self.assertEqual(report.missing.tolist(), [3, 1])
+        self.assertEqual(report.summary()['missing'], 4)
+
+    def test_slots(self):
+        # Friday 23:00 is followed by Monday 00:00
+        times = np.array([1704499200 - 3600, 1704672000])
+        self.assertEqual(np.diff(slots(times, MTResolutions.RESOLUTION_H1.value)).tolist(), [1])
+        self.assertEqual(np.diff(slots(times, MTResolutions.RESOLUTION_H1.value, calendar=None)).tolist(), [49])
+
+    def test_repair(self):
+        clean = self.get(MTResolutions.RESOLUTION_H1)
+        repaired = repair(self.defective(clean), fill=True)
+
+        self.assertTrue(repaired.compact)
+        self.assertEqual(len(repaired), len(clean))
+        np.testing.assert_array_equal(repaired.time, clean.time)
+        self.assertTrue(check(repaired).invalid_ohlc.size == 0)
+
+        filled = np.flatnonzero(repaired.prices[0] != clean.prices[0])
+        self.assertEqual(filled.tolist(), [100, 101, 102, 402, 502])
+        np.testing.assert_array_equal(repaired.prices[:, 100], np.full(4, clean.prices[3, 99]))
+
+        self.assertIs(repair(clean), clean)
+        repaired = repair(self.defective(clean))
+        self.assertEqual(len(repaired), len(clean) - 5)
+        self.assertTrue(check(repaired, spread_threshold=1e6).summary()['missing'] == 5)
+
+    def test_repair_frame(self):
+        clean = self.get(MTResolutions.RESOLUTION_D1)
+        data = clean.data.iloc[[0, 1, 1, 3, 4]]
+        repaired = repair(PriceData(self.symbol, clean.resolution, data), fill=True)
+
+        self.assertFalse(repaired.compact)
+        self.assertTrue(repaired.data.index.equals(clean.data.index[:5]))
+        self.assertEqual(repaired.data['open'].iloc[2], data['close'].iloc[2])
+        self.assertEqual(repaired.data['spread'].iloc[2], data['spread'].iloc[2])
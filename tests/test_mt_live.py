@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import FakeTerminal
+from mt5_dataloader.mt_live import BarRing, LiveBars
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+
+
+class TestLiveBars(unittest.TestCase):
+    """
+    Tests incremental updates of live bars against full requests
+    """
+    def setUp(self):
+        self.backend = FakeTerminal()
+        self.mt_dataloader = MTDataLoader(path="fake", backend=self.backend)
+        self.live = LiveBars(self.mt_dataloader, size=500)
+        self.symbol = "GBPUSD"
+
+    def expected(self):
+        return self.mt_dataloader.get_price_data(self.symbol, MTResolutions.RESOLUTION_M1, MTRequests.POSITION,
+                                                 num_bars=500).data
+
+    def test_incremental_update(self):
+        self.assertEqual(self.live.subscribe(self.symbol, MTResolutions.RESOLUTION_M1), 500)
+
+        # Same bar: only the forming bar is replaced
+        self.backend.now += 30
+        self.assertEqual(self.live.update(), {(self.symbol, MTResolutions.RESOLUTION_M1.value): 0})
+        self.assertTrue(self.live.window(self.symbol, MTResolutions.RESOLUTION_M1).data.equals(self.expected()))
+
+        for minutes in (1, 7, 45, 300):
+            self.backend.now += minutes * 60
+            calls = self.backend.calls
+            new_bars = self.live.update()[(self.symbol, MTResolutions.RESOLUTION_M1.value)]
+            self.assertEqual(new_bars, minutes)
+            self.assertLessEqual(self.backend.calls - calls, 10)
+            self.assertTrue(self.live.window(self.symbol, MTResolutions.RESOLUTION_M1).data.equals(self.expected()))
+
+    def test_window_views(self):
+        self.live.subscribe(self.symbol, MTResolutions.RESOLUTION_M1)
+        window = self.live.window(self.symbol, MTResolutions.RESOLUTION_M1, num_bars=100)
+        self.assertEqual(len(window), 100)
+        self.assertTrue(np.shares_memory(window.prices, self.live.rings[(self.symbol, 1)].prices))
+
+    def test_ring_wraps(self):
+        ring = BarRing(4)
+        rates = self.backend.copy_rates_from_pos(self.symbol, MTResolutions.RESOLUTION_M1.value, 0, 10)
+        for i in range(10):
+            ring.write(rates[i:i + 1])
+        time, prices, _, _ = ring.window()
+        np.testing.assert_array_equal(time, rates['time'][-4:])
+        np.testing.assert_array_equal(prices[3], rates['close'][-4:])
@@ -0,0 +1,45 @@
+import unittest
+
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import FakeTerminal
+from mt5_dataloader.mt_metrics import MetricsAggregator
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+from mt5_dataloader.mt_utils import SymbolCategories
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    Tests loader instrumentation hooks and the MetricsAggregator class
+    """
+    def setUp(self):
+        self.mt_dataloader = MTDataLoader(path="fake", backend=FakeTerminal(num_symbols=20))
+        self.metrics = MetricsAggregator()
+        self.mt_dataloader.add_hook(self.metrics)
+
+    def test_price_phases(self):
+        for _ in range(3):
+            self.mt_dataloader.get_price_data("GBPUSD", MTResolutions.RESOLUTION_M1, MTRequests.POSITION, num_bars=500)
+        self.mt_dataloader.get_price_data("UNKNOWN", MTResolutions.RESOLUTION_M1, MTRequests.POSITION)
+
+        summary = self.metrics.summary()
+        self.assertEqual(summary.at[("get_price_data", "validate"), "count"], 4)
+        self.assertEqual(summary.at[("get_price_data", "terminal"), "count"], 3)
+        self.assertEqual(summary.at[("get_price_data", "terminal"), "bars"], 1500)
+        self.assertEqual(summary.at[("get_price_data", "convert"), "bars"], 1500)
+        self.assertGreater(summary.at[("get_price_data", "terminal"), "bytes"], 0)
+        self.assertEqual(self.metrics.count("get_price_data", "nodata"), 1)
+
+    def test_symbols_and_retries(self):
+        self.mt_dataloader.get_symbols(SymbolCategories.FX_MAJORS.value)
+        self.mt_dataloader.categories()
+        self.assertRaises(Exception, lambda: self.mt_dataloader.get_symbol_properties("UNKNOWN"))
+
+        self.assertEqual(self.metrics.count("get_symbols", "symbols"), 1)
+        self.assertEqual(self.metrics.count("categories", "symbols"), 1)
+        self.assertEqual(self.metrics.count("get_symbol_properties", "retry"), 2)
+
+    def test_remove_hook(self):
+        self.mt_dataloader.remove_hook(self.metrics)
+        self.mt_dataloader.get_price_data("GBPUSD", MTResolutions.RESOLUTION_M1, MTRequests.POSITION, num_bars=10)
+        self.assertTrue(self.metrics.summary().empty)
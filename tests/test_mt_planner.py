@@ -0,0 +1,83 @@
+import unittest
+from datetime import datetime as dt
+
+import numpy as np
+
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import FakeTerminal
+from mt5_dataloader.mt_planner import RequestPlanner, BarRequest, merge_spans
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+
+
+class TestRequestPlanner(unittest.TestCase):
+    """
+    Tests that planned batches match requests made one by one, with fewer terminal calls
+    """
+    def setUp(self):
+        self.backend = FakeTerminal()
+        self.mt_dataloader = MTDataLoader(path="fake", backend=self.backend, compact=True)
+        self.planner = RequestPlanner(self.mt_dataloader)
+        self.symbol = "GBPUSD"
+        self.resolution = MTResolutions.RESOLUTION_M1
+
+    def requests(self):
+        return [
+            BarRequest(self.symbol, self.resolution, MTRequests.RANGE, dt(2024, 6, 3), dt(2024, 6, 5)),
+            BarRequest(self.symbol, self.resolution, MTRequests.RANGE, dt(2024, 6, 4), dt(2024, 6, 7)),
+            BarRequest(self.symbol, self.resolution, MTRequests.RANGE, dt(2024, 6, 7, 0, 1), dt(2024, 6, 10)),
+            BarRequest(self.symbol, self.resolution, MTRequests.RANGE, dt(2024, 5, 1), dt(2024, 5, 2)),
+            BarRequest(self.symbol, self.resolution, MTRequests.POSITION, start_index=0, num_bars=5000),
+            BarRequest(self.symbol, self.resolution, MTRequests.POSITION, start_index=100, num_bars=20000),
+            BarRequest(self.symbol, self.resolution, MTRequests.DATE, end_date=dt(2024, 6, 20), num_bars=1000),
+            BarRequest(self.symbol, self.resolution, MTRequests.DATE, end_date=dt(2024, 5, 1, 12), num_bars=100),
+            BarRequest(self.symbol, self.resolution, MTRequests.DATE, end_date=dt(2024, 5, 1, 10), num_bars=50),
+            BarRequest("EURUSD", self.resolution, MTRequests.RANGE, dt(2024, 6, 3), dt(2024, 6, 5)),
+        ]
+
+    def test_merge_spans(self):
+        self.assertEqual(merge_spans([(10, 20), (0, 5), (15, 30), (90, 100), (31, 40)], 1),
+                         [(0, 5), (10, 40), (90, 100)])
+
+    def test_matches_single_requests(self):
+        requests = self.requests()
+        results, report = self.planner.run(requests)
+
+        calls = self.backend.calls
+        for request, result in zip(requests, results):
+            expected = self.mt_dataloader.get_price_data(**request._asdict())
+            np.testing.assert_array_equal(result.time, expected.time)
+            np.testing.assert_array_equal(result.prices, expected.prices)
+        self.assertEqual(self.backend.calls - calls, len(requests))
+
+        # Position call, two merged range spans and EURUSD. Date requests are spanned by the position and May calls.
+        self.assertEqual(report.calls, 4)
+        self.assertEqual(report.calls_saved, 6)
+        self.assertEqual(report.bars_requested, sum(len(result) for result in results))
+        self.assertGreater(report.bars_saved, 0)
+
+    def test_views(self):
+        requests = [
+            dict(symbol=self.symbol, resolution=self.resolution, request_type='range', start_date=dt(2024, 6, 3),
+                 end_date=dt(2024, 6, 10)),
+            dict(symbol=self.symbol, resolution=self.resolution, request_type='range', start_date=dt(2024, 6, 4),
+                 end_date=dt(2024, 6, 5))]
+        (outer, inner), report = self.planner.run(requests)
+        self.assertEqual(report.calls, 1)
+        self.assertTrue(np.shares_memory(outer.prices, inner.prices))
+
+    def test_frames_and_missing(self):
+        loader = MTDataLoader(path="fake", backend=self.backend)
+        requests = [
+            BarRequest(self.symbol, self.resolution, MTRequests.RANGE, dt(2024, 6, 3), dt(2024, 6, 5)),
+            BarRequest(self.symbol, self.resolution, MTRequests.RANGE, dt(2024, 6, 4), dt(2024, 6, 5)),
+            BarRequest("UNKNOWN", self.resolution, MTRequests.RANGE, dt(2024, 6, 4), dt(2024, 6, 5))]
+        results, report = RequestPlanner(loader).run(requests)
+        expected = loader.get_price_data(**requests[1]._asdict())
+        self.assertTrue(results[1].data.equals(expected.data))
+        self.assertIsNone(results[2])
+        self.assertEqual(report.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
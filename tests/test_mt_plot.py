@@ -0,0 +1,90 @@
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import FakeTerminal
+from mt5_dataloader.mt_plot import lttb, ohlc_buckets, PricePlot
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+
+try:
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+except ImportError:
+    plt = None
+
+
+class TestDownsampling(unittest.TestCase):
+    """
+    Tests LTTB and OHLC re-aggregation
+    """
+    def test_lttb(self):
+        x = np.arange(10000)
+        y = np.sin(x / 500.0)
+        y[4321] = 10.0
+        selected = lttb(x, y, 100)
+
+        self.assertEqual(len(selected), 100)
+        self.assertEqual(selected[0], 0)
+        self.assertEqual(selected[-1], 9999)
+        self.assertTrue(np.all(np.diff(selected) > 0))
+        # Spikes survive downsampling
+        self.assertIn(4321, selected)
+        np.testing.assert_array_equal(lttb(x[:50], y[:50], 100), np.arange(50))
+
+    def test_ohlc_buckets(self):
+        time = np.array([0, 60, 120, 180, 600, 660], dtype=np.int64)
+        open_ = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+        high = open_ + 1
+        low = open_ - 1
+        close = open_ + 0.5
+        start, span, o, h, l, c = ohlc_buckets(time, open_, high, low, close, 3)
+
+        self.assertEqual(span, 221)
+        self.assertEqual(start.tolist(), [0, 442])
+        self.assertEqual(o.tolist(), [1.0, 5.0])
+        self.assertEqual(h.tolist(), [5.0, 7.0])
+        self.assertEqual(l.tolist(), [0.0, 4.0])
+        self.assertEqual(c.tolist(), [4.5, 6.5])
+
+
+@unittest.skipIf(plt is None, "matplotlib is not installed")
+class TestPricePlot(unittest.TestCase):
+    """
+    Tests that plots draw a bounded number of points and redraw on zoom
+    """
+    def setUp(self):
+        loader = MTDataLoader(path="fake", backend=FakeTerminal(), compact=True)
+        self.price_data = loader.get_price_data("GBPUSD", MTResolutions.RESOLUTION_M1, MTRequests.RANGE,
+                                                start_date=datetime(2024, 1, 1), end_date=datetime(2024, 3, 1))
+        self.fig, self.ax = plt.subplots()
+
+    def tearDown(self):
+        plt.close(self.fig)
+
+    def test_line(self):
+        plot = PricePlot(self.price_data, self.ax, points=500)
+        self.assertEqual(len(plot.artists[0].get_xdata()), 500)
+
+        # Zoom into one day
+        day = self.price_data.between(datetime(2024, 2, 1), datetime(2024, 2, 2))
+        self.ax.set_xlim(plot.to_num(day.time[0]), plot.to_num(day.time[-1]))
+        x = plot.artists[0].get_xdata()
+        self.assertEqual(len(x), 500)
+        self.assertLessEqual(x[0], plot.to_num(day.time[0]))
+        self.assertGreaterEqual(x[-1], plot.to_num(day.time[-1]))
+        self.assertLess(x[-1] - x[0], 2)
+
+    def test_candle(self):
+        plot = PricePlot(self.price_data, self.ax, kind='candle', points=200)
+        wicks, bodies = plot.artists
+        self.assertLessEqual(len(wicks.get_segments()), 200)
+        self.assertEqual(len(bodies.get_paths()), len(wicks.get_segments()))
+        self.assertAlmostEqual(max(segment[1][1] for segment in wicks.get_segments()),
+                               self.price_data.column('high').max())
+
+        self.assertRaises(ValueError, PricePlot, self.price_data, self.ax, kind='bar')
+        self.assertRaises(ValueError, PricePlot, self.price_data, self.ax, src='volume')
@@ -0,0 +1,130 @@
+import os
+import unittest
+import multiprocessing
+import multiprocessing.dummy
+from multiprocessing.shared_memory import SharedMemory
+from unittest.mock import patch
+
+import numpy as np
+
+from mt5_dataloader.mt_backend import SharedConnection, MetaTrader5Backend
+from mt5_dataloader.mt_fake import FakeTerminal
+from mt5_dataloader.mt_pool import MTTerminalPool
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+
+RATES_DTYPE = [('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+               ('tick_volume', '<u8'), ('spread', '<i4'), ('real_volume', '<u8')]
+
+
+def make_rates(symbol, resolution, *args):
+    if symbol == "MISSING":
+        return None
+    rates = np.zeros(3, dtype=RATES_DTYPE)
+    rates['time'] = [0, 60, 120]
+    rates['open'] = [1, 2, 3]
+    rates['spread'] = resolution
+    return rates
+
+
+class UnreachableTerminal(FakeTerminal):
+    """
+    Terminal that fails to launch from `terminal_bad`.
+    """
+    def account_info(self):
+        return None
+
+    def initialize(self, path):
+        return path != "terminal_bad"
+
+
+class CrashingTerminal(FakeTerminal):
+    """
+    Terminal whose process exits when asked for `CRASH`.
+    """
+    def copy_rates_from_pos(self, symbol, *args):
+        if symbol == "CRASH":
+            os._exit(3)
+        return super().copy_rates_from_pos(symbol, *args)
+
+
+class TestMTTerminalPool(unittest.TestCase):
+    """
+    Tests for the MTTerminalPool class. Workers run as threads so terminal calls can be patched, each with its own
+    connection as it would have in its own process.
+    """
+    @patch("mt5_dataloader.mt_dataloader.shared_connection", lambda path: SharedConnection(MetaTrader5Backend(), path))
+    @patch("MetaTrader5.copy_rates_from_pos")
+    @patch("MetaTrader5.account_info")
+    def test_get_price_data_many(self, mock_account_info, mock_rates):
+        mock_account_info.return_value = True
+        mock_rates.side_effect = make_rates
+
+        with MTTerminalPool(["terminal_a", "terminal_b"], context=multiprocessing.dummy) as pool:
+            results, failures = pool.get_price_data_many(
+                symbols=["GBPUSD", "EURUSD", "MISSING"],
+                resolutions=[MTResolutions.RESOLUTION_M1, MTResolutions.RESOLUTION_H1],
+                request_type=MTRequests.POSITION
+            )
+
+        self.assertEqual(len(results), 4)
+        self.assertEqual(len(failures), 2)
+        self.assertIsInstance(failures[("MISSING", MTResolutions.RESOLUTION_M1.value)], LookupError)
+
+        price = results[("EURUSD", MTResolutions.RESOLUTION_H1.value)]
+        self.assertEqual(price.data['open'].sum(), 6)
+        self.assertEqual(price.data['spread'].iloc[0], MTResolutions.RESOLUTION_H1.value)
+        self.assertEqual(mock_rates.call_count, 6)
+
+    @patch("mt5_dataloader.mt_pool.POLL_SECONDS", 0.1)
+    def test_worker_exit(self):
+        """
+        Tests that jobs of a worker process that exits fail instead of being waited for.
+        """
+        with MTTerminalPool(["terminal_a", "terminal_b"], context=multiprocessing.get_context('spawn'),
+                            backend=CrashingTerminal(), compact=True) as pool:
+            # Jobs alternate between workers, so the second worker gets CRASH then USDJPY
+            results, failures = pool.get_price_data_many(
+                symbols=["GBPUSD", "CRASH", "EURUSD", "USDJPY"], resolutions=[MTResolutions.RESOLUTION_H1],
+                request_type=MTRequests.POSITION, num_bars=10)
+
+            self.assertEqual(sorted(symbol for symbol, _ in results), ["EURUSD", "GBPUSD"])
+            self.assertEqual(sorted(symbol for symbol, _ in failures), ["CRASH", "USDJPY"])
+            self.assertIn("exited with code 3", str(failures[("CRASH", MTResolutions.RESOLUTION_H1.value)]))
+            self.assertEqual(pool.workers[1].exitcode, 3)
+
+    def test_failed_start(self):
+        """
+        Tests that jobs of a worker that fails to start fail while the other workers' jobs complete.
+        """
+        with MTTerminalPool(["terminal_a", "terminal_bad"], context=multiprocessing.dummy,
+                            backend=UnreachableTerminal(), compact=True) as pool:
+            results, failures = pool.get_price_data_many(
+                symbols=["GBPUSD", "EURUSD", "USDJPY", "AUDUSD"], resolutions=[MTResolutions.RESOLUTION_H1],
+                request_type=MTRequests.POSITION, num_bars=10)
+
+        self.assertEqual(sorted(symbol for symbol, _ in results), ["GBPUSD", "USDJPY"])
+        self.assertEqual(sorted(symbol for symbol, _ in failures), ["AUDUSD", "EURUSD"])
+        self.assertIn("failed to start", str(failures[("EURUSD", MTResolutions.RESOLUTION_H1.value)]))
+
+    def test_stale_results(self):
+        """
+        Tests that results left over from an earlier batch are dropped and their blocks freed.
+        """
+        with MTTerminalPool(["terminal_a"], context=multiprocessing.dummy, backend=FakeTerminal(),
+                            compact=True) as pool:
+            request = dict(resolutions=[MTResolutions.RESOLUTION_H1], request_type=MTRequests.POSITION, num_bars=10)
+            first, _ = pool.get_price_data_many(symbols=["GBPUSD"], **request)
+
+            # A result of the first batch arriving late
+            block = SharedMemory(create=True, size=8)
+            block.close()
+            pool.results.put((0, 0, block.name, [('time', '<i8')], 1, None))
+            second, failures = pool.get_price_data_many(symbols=["EURUSD"], **request)
+
+        self.assertEqual(list(second), [("EURUSD", MTResolutions.RESOLUTION_H1.value)])
+        self.assertEqual(failures, {})
+        self.assertRaises(FileNotFoundError, SharedMemory, name=block.name)
+        self.assertFalse(np.array_equal(first[("GBPUSD", MTResolutions.RESOLUTION_H1.value)].prices,
+                                        second[("EURUSD", MTResolutions.RESOLUTION_H1.value)].prices))
+
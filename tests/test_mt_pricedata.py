@@ -0,0 +1,53 @@
+import unittest
+from datetime import datetime as dt
+
+import numpy as np
+
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import FakeTerminal
+from mt5_dataloader.mt_pricedata import PriceData
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+
+
+class TestCompactPriceData(unittest.TestCase):
+    """
+    Tests array-backed PriceData against DataFrame-backed PriceData
+    """
+    def setUp(self):
+        backend = FakeTerminal()
+        self.frame = MTDataLoader(path="fake", backend=backend, volumes=True).get_price_data(
+            "GBPUSD", MTResolutions.RESOLUTION_M5, MTRequests.POSITION, num_bars=5000)
+        self.compact = MTDataLoader(path="fake", backend=backend, volumes=True, compact=True).get_price_data(
+            "GBPUSD", MTResolutions.RESOLUTION_M5, MTRequests.POSITION, num_bars=5000)
+
+    def test_lazy_frame(self):
+        self.assertTrue(self.compact.compact)
+        self.assertIsNone(self.compact._data)
+        self.assertEqual(len(self.compact), 5000)
+        # Time, OHLC, spread and two volume columns
+        self.assertEqual(self.compact.nbytes, 5000 * (8 + 4 * 8 + 4 + 2 * 8))
+        self.assertIsNone(self.compact._data)
+
+        self.assertTrue(self.compact.data.equals(self.frame.data))
+        self.assertTrue(np.shares_memory(self.compact.values, self.compact.prices))
+
+    def test_between(self):
+        start, end = self.frame.data.index[100].to_pydatetime(), dt(2024, 6, 27)
+        expected = self.frame.data.loc[start:end]
+
+        for price in (self.frame, self.compact):
+            selected = price.between(start, end)
+            self.assertTrue(selected.data.equals(expected))
+        self.assertTrue(np.shares_memory(self.compact.between(start, end).prices, self.compact.prices))
+
+    def test_resample(self):
+        resampled = self.compact.resample(MTResolutions.RESOLUTION_H1)
+        self.assertTrue(resampled.compact)
+        self.assertTrue(resampled.data.equals(self.frame.resample(MTResolutions.RESOLUTION_H1).data))
+
+    def test_set_data(self):
+        price = PriceData.from_rates("GBPUSD", MTResolutions.RESOLUTION_M5.value, self.frame.data)
+        price.data = self.frame.data.iloc[:10]
+        self.assertFalse(price.compact)
+        self.assertEqual(len(price), 10)
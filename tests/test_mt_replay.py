@@ -0,0 +1,53 @@
+import shutil
+import tempfile
+import unittest
+from datetime import datetime as dt
+
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import FakeTerminal
+from mt5_dataloader.mt_replay import ReplayBackend
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+from mt5_dataloader.mt_utils import SymbolCategories
+
+
+class TestReplay(unittest.TestCase):
+    """
+    Tests recording terminal responses and replaying them offline
+    """
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.requests = [
+            ("GBPUSD", MTResolutions.RESOLUTION_M5, MTRequests.POSITION, None, None),
+            ("EURUSD", MTResolutions.RESOLUTION_H1, MTRequests.DATE, None, dt(2024, 3, 1)),
+            ("USDJPY", MTResolutions.RESOLUTION_D1, MTRequests.RANGE, dt(2023, 1, 1), dt(2024, 1, 1)),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def load(self, loader):
+        prices = [loader.get_price_data(symbol, resolution, request, start_date=start, end_date=end, num_bars=1000)
+                  for symbol, resolution, request, start, end in self.requests]
+        return prices, loader.get_symbols(SymbolCategories.FX_MAJORS.value), loader.get_symbol_properties("USDJPY")
+
+    def test_replay(self):
+        recorder = MTDataLoader(path="fake", backend=FakeTerminal(num_symbols=20), record_path=self.path)
+        recorded_prices, recorded_symbols, recorded_properties = self.load(recorder)
+        self.assertIsNone(recorder.get_price_data("UNKNOWN", MTResolutions.RESOLUTION_H1, MTRequests.POSITION))
+        recorder.backend.close()
+
+        replay = MTDataLoader(path="fake", backend=ReplayBackend(self.path))
+        prices, symbols, properties = self.load(replay)
+
+        for recorded, price in zip(recorded_prices, prices):
+            self.assertTrue(price.data.equals(recorded.data))
+        self.assertEqual(symbols, recorded_symbols)
+        self.assertEqual(properties, recorded_properties)
+        self.assertIsNone(replay.get_price_data("UNKNOWN", MTResolutions.RESOLUTION_H1, MTRequests.POSITION))
+
+    def test_unrecorded_request(self):
+        MTDataLoader(path="fake", backend=FakeTerminal(), record_path=self.path).backend.close()
+        replay = MTDataLoader(path="fake", backend=ReplayBackend(self.path))
+        self.assertRaises(LookupError, lambda: replay.get_price_data(
+            "GBPUSD", MTResolutions.RESOLUTION_H1, MTRequests.POSITION))
@@ -0,0 +1,77 @@
+import unittest
+from unittest.mock import patch
+from datetime import datetime as dt
+
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+
+RATES = {"time": [1, 2, 3],
+         "open": [1, 2, 3],
+         "high": [1, 2, 3],
+         "low": [1, 2, 3],
+         "close": [1, 2, 3],
+         "spread": [1, 2, 3]}
+
+
+class TestRequestCache(unittest.TestCase):
+    """
+    Tests `MTDataLoader.get_price_data` with the in-process request cache enabled
+    """
+    @patch("MetaTrader5.account_info")
+    def setUp(self, mock_account_info):
+        mock_account_info.return_value = True
+        self.mt_dataloader = MTDataLoader(request_cache_bytes=10 * 1024 ** 2, live_ttl=60)
+        self.symbol = "GBPUSD"
+
+    @patch("MetaTrader5.copy_rates_range")
+    def test_normalized_hits(self, mock_rates):
+        """
+        Tests that requests differing only in representation share one entry.
+        """
+        mock_rates.return_value = RATES
+
+        first = self.mt_dataloader.get_price_data(
+            self.symbol, MTResolutions.RESOLUTION_H1, MTRequests.RANGE,
+            start_date=dt(2024, 1, 1), end_date=dt(2024, 2, 1))
+        second = self.mt_dataloader.get_price_data(
+            self.symbol, MTResolutions.RESOLUTION_H1.value, "range",
+            start_date=dt(2024, 1, 1).date(), end_date=dt(2024, 2, 1), num_bars=10)
+
+        self.assertIs(first, second)
+        self.assertEqual(mock_rates.call_count, 1)
+        stats = self.mt_dataloader.request_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    @patch("MetaTrader5.copy_rates_from_pos")
+    def test_live_ttl(self, mock_rates):
+        """
+        Tests that position requests expire, including those starting behind the current bar.
+        """
+        mock_rates.return_value = RATES
+        self.mt_dataloader.request_cache.live_ttl = 0
+
+        self.mt_dataloader.get_price_data(self.symbol, MTResolutions.RESOLUTION_H1, MTRequests.POSITION)
+        self.mt_dataloader.get_price_data(self.symbol, MTResolutions.RESOLUTION_H1, MTRequests.POSITION)
+        self.assertEqual(mock_rates.call_count, 2)
+
+        self.mt_dataloader.get_price_data(self.symbol, MTResolutions.RESOLUTION_H1, MTRequests.POSITION, start_index=1)
+        self.mt_dataloader.get_price_data(self.symbol, MTResolutions.RESOLUTION_H1, MTRequests.POSITION, start_index=1)
+        self.assertEqual(mock_rates.call_count, 4)
+
+    @patch("MetaTrader5.copy_rates_from_pos")
+    def test_byte_budget(self, mock_rates):
+        """
+        Tests that least recently used entries are evicted once the budget is exceeded.
+        """
+        mock_rates.return_value = RATES
+
+        first = self.mt_dataloader.get_price_data(self.symbol, MTResolutions.RESOLUTION_H1, MTRequests.POSITION)
+        self.mt_dataloader.request_cache.max_bytes = self.mt_dataloader.request_cache.nbytes
+        self.mt_dataloader.get_price_data("EURUSD", MTResolutions.RESOLUTION_H1, MTRequests.POSITION)
+
+        stats = self.mt_dataloader.request_cache.stats()
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['entries'], 1)
+        self.assertIsNot(
+            self.mt_dataloader.get_price_data(self.symbol, MTResolutions.RESOLUTION_H1, MTRequests.POSITION), first)
@@ -0,0 +1,170 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from datetime import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_pricedata import PriceData
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+
+# Pandas rules matching MT5 bar boundaries, used as the reference implementation
+PANDAS_RULES = {
+    MTResolutions.RESOLUTION_M5: '5min',
+    MTResolutions.RESOLUTION_M15: '15min',
+    MTResolutions.RESOLUTION_M30: '30min',
+    MTResolutions.RESOLUTION_H1: '1h',
+    MTResolutions.RESOLUTION_H4: '4h',
+    MTResolutions.RESOLUTION_D1: '1D',
+    MTResolutions.RESOLUTION_W1: 'W-SAT',
+    MTResolutions.RESOLUTION_MN1: 'MS',
+}
+
+
+def make_m1(start: dt, periods: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Random walk M1 bars with weekends and random minutes missing, as in broker history.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start=start, periods=periods, freq='min', name='date')
+    keep = (index.dayofweek < 5) & (rng.random(periods) > 0.05)
+    index = index[keep]
+    close = 1.1 + np.cumsum(rng.normal(0, 1e-4, len(index)))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + rng.random(len(index)) * 1e-4,
+        'low': np.minimum(open_, close) - rng.random(len(index)) * 1e-4,
+        'close': close,
+        'spread': rng.integers(0, 20, len(index)).astype(np.int32)
+    }, index=index)
+
+
+def reference(data: pd.DataFrame, resolution: MTResolutions) -> pd.DataFrame:
+    rule = PANDAS_RULES[resolution]
+    kwargs = {'closed': 'left', 'label': 'left'} if rule == 'W-SAT' else {}
+    bars = data.resample(rule, **kwargs).agg(
+        {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'spread': 'min'})
+    if rule == 'W-SAT':
+        bars.index = bars.index + pd.Timedelta(days=1)
+    return bars.dropna()
+
+
+class TestResampleParity(unittest.TestCase):
+    """
+    Parity of derived bars against reference bars for every coarser resolution
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.m1 = PriceData("GBPUSD", MTResolutions.RESOLUTION_M1.value, make_m1(dt(2024, 1, 1), 100_000))
+
+    def test_parity(self):
+        for resolution in PANDAS_RULES:
+            with self.subTest(resolution=resolution):
+                derived = self.m1.resample(resolution).data
+                expected = reference(self.m1.data, resolution)
+
+                self.assertEqual(len(derived), len(expected))
+                np.testing.assert_array_equal(
+                    derived.index.values.astype('datetime64[s]'), expected.index.values.astype('datetime64[s]'))
+                for col in ['open', 'high', 'low', 'close', 'spread']:
+                    np.testing.assert_allclose(derived[col].to_numpy(), expected[col].to_numpy())
+
+    def test_weekly_anchor(self):
+        """
+        Tests that weekly bars open on Sunday and monthly bars on the first day of the month.
+        """
+        weekly = self.m1.resample(MTResolutions.RESOLUTION_W1).data
+        monthly = self.m1.resample(MTResolutions.RESOLUTION_MN1).data
+
+        self.assertTrue(all(day == 6 for day in weekly.index.dayofweek))
+        self.assertTrue(all(day == 1 for day in monthly.index.day))
+
+    def test_offset(self):
+        """
+        Tests session offsets shift bar boundaries.
+        """
+        daily = self.m1.resample(MTResolutions.RESOLUTION_D1, offset=pd.Timedelta(hours=2).to_pytimedelta()).data
+
+        self.assertTrue(all(hour == 2 for hour in daily.index.hour))
+
+    def test_invalid_resample(self):
+        """
+        Tests that resolutions which do not divide evenly are rejected.
+        """
+        h1 = self.m1.resample(MTResolutions.RESOLUTION_H1)
+        self.assertRaises(ValueError, lambda: h1.resample(MTResolutions.RESOLUTION_M30))
+        w1 = self.m1.resample(MTResolutions.RESOLUTION_W1)
+        self.assertRaises(ValueError, lambda: w1.resample(MTResolutions.RESOLUTION_MN1))
+
+
+class TestDerivedRequests(unittest.TestCase):
+    """
+    Tests that cached finer bars serve coarser requests without calling the terminal
+    """
+    @patch("MetaTrader5.account_info")
+    def setUp(self, mock_account_info):
+        mock_account_info.return_value = True
+        self.root = tempfile.mkdtemp()
+        self.mt_dataloader = MTDataLoader(cache_dir=self.root, derive_resolutions=True)
+        self.symbol = "GBPUSD"
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    @patch("MetaTrader5.copy_rates_range")
+    def test_derived_range(self, mock_rates):
+        data = make_m1(dt(2024, 1, 1), 60 * 24 * 7)
+        times = (data.index - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+        mock_rates.return_value = {"time": times, **{col: data[col].to_numpy() for col in data.columns},
+                                   "tick_volume": np.ones(len(data), dtype=np.uint64),
+                                   "real_volume": np.zeros(len(data), dtype=np.uint64)}
+
+        self.mt_dataloader.get_price_data(
+            symbol=self.symbol,
+            resolution=MTResolutions.RESOLUTION_M1,
+            request_type=MTRequests.RANGE,
+            start_date=dt(2024, 1, 1),
+            end_date=dt(2024, 1, 7, 23, 59)
+        )
+        self.assertEqual(mock_rates.call_count, 1)
+
+        result = self.mt_dataloader.get_price_data(
+            symbol=self.symbol,
+            resolution=MTResolutions.RESOLUTION_H1,
+            request_type=MTRequests.RANGE,
+            start_date=dt(2024, 1, 2, 10, 30),
+            end_date=dt(2024, 1, 3)
+        )
+        self.assertEqual(mock_rates.call_count, 1)
+        self.assertEqual(result.data.index[0], dt(2024, 1, 2, 11))
+        self.assertEqual(result.data.index[-1], dt(2024, 1, 3))
+        expected_high = data.loc['2024-01-02 11:00':'2024-01-02 11:59', 'high'].max()
+        self.assertAlmostEqual(result.data['high'].iloc[0], expected_high)
+
+
+@unittest.skipUnless(os.environ.get('MT5_PARITY_SYMBOL'), "Requires a MetaTrader5 terminal")
+class TestTerminalParity(unittest.TestCase):
+    """
+    Compares derived bars against bars provided by the terminal. Set `MT5_PARITY_SYMBOL` to run.
+    """
+    def test_terminal_parity(self):
+        mt_dataloader = MTDataLoader()
+        symbol = os.environ['MT5_PARITY_SYMBOL']
+        start_date, end_date = dt(2024, 1, 1), dt(2024, 3, 1)
+        m1 = mt_dataloader.get_price_data(symbol, MTResolutions.RESOLUTION_M1, MTRequests.RANGE,
+                                          start_date=start_date, end_date=end_date)
+
+        for resolution in [MTResolutions.RESOLUTION_M15, MTResolutions.RESOLUTION_H1, MTResolutions.RESOLUTION_H4,
+                           MTResolutions.RESOLUTION_D1]:
+            with self.subTest(resolution=resolution):
+                expected = mt_dataloader.get_price_data(symbol, resolution, MTRequests.RANGE,
+                                                        start_date=start_date, end_date=end_date).data
+                derived = m1.resample(resolution).data.reindex(expected.index)
+                for col in ['open', 'high', 'low', 'close']:
+                    np.testing.assert_allclose(derived[col].to_numpy(), expected[col].to_numpy())
@@ -0,0 +1,124 @@
+import gc
+import os
+import sys
+import stat
+import tempfile
+import unittest
+from datetime import datetime
+from multiprocessing import AuthenticationError
+
+import numpy as np
+
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import FakeTerminal
+from mt5_dataloader.mt_server import MTDataServer, MTDataClient, authkey_path
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+
+
+@unittest.skipIf(sys.platform == 'win32', "Uses a Unix socket")
+class TestDataServer(unittest.TestCase):
+    """
+    Tests serving bars to several clients from one loader
+    """
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.address = os.path.join(self.tmp.name, "server.sock")
+        self.backend = FakeTerminal()
+        loader = MTDataLoader(path="fake", backend=self.backend, compact=True, request_cache_bytes=1 << 28)
+        self.server = MTDataServer(loader, address=self.address).start()
+        self.clients = [MTDataClient(self.address) for _ in range(3)]
+
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+        self.server.close()
+        self.tmp.cleanup()
+
+    def request(self, client, symbol="GBPUSD"):
+        return client.get_price_data(symbol, MTResolutions.RESOLUTION_H1, MTRequests.RANGE,
+                                     start_date=datetime(2023, 1, 1), end_date=datetime(2023, 6, 1))
+
+    def test_shared_request(self):
+        expected = MTDataLoader(path="fake", backend=FakeTerminal(), compact=True).get_price_data(
+            "GBPUSD", MTResolutions.RESOLUTION_H1, MTRequests.RANGE, start_date=datetime(2023, 1, 1),
+            end_date=datetime(2023, 6, 1))
+
+        results = [self.request(client) for client in self.clients]
+        calls = self.backend.calls
+        results.append(self.request(self.clients[0]))
+
+        self.assertEqual(self.backend.calls, calls)
+        self.assertEqual(self.server.stats()['blocks'], 1)
+        self.assertEqual(self.server.stats()['shared'], 3)
+        for price_data in results:
+            self.assertTrue(price_data.compact)
+            np.testing.assert_array_equal(price_data.time, expected.time)
+            np.testing.assert_array_equal(price_data.prices, expected.prices)
+            self.assertFalse(price_data.prices.flags.writeable)
+        self.assertTrue(results[0].data.equals(expected.data))
+
+    def test_copy(self):
+        client = MTDataClient(self.address, copy=True)
+        self.clients.append(client)
+        price_data = self.request(client)
+
+        self.assertTrue(price_data.prices.flags.writeable)
+        self.assertEqual(client.blocks, {})
+        self.server.close()
+        self.assertGreater(price_data.prices.sum(), 0)
+
+    def test_eviction(self):
+        self.server.max_bytes = 1
+        self.request(self.clients[0], "GBPUSD")
+        first = self.request(self.clients[1], "EURUSD")
+        second = self.request(self.clients[1], "GBPUSD")
+
+        self.assertEqual(self.server.stats()['blocks'], 1)
+        # Evicted blocks stay readable in clients that mapped them
+        self.assertGreater(first.prices.sum(), 0)
+        self.assertEqual(second.symbol, "GBPUSD")
+
+    def test_release(self):
+        client = self.clients[0]
+        for symbol in ("GBPUSD", "EURUSD", "USDJPY"):
+            self.request(client, symbol)
+        gc.collect()
+        self.assertEqual(client.blocks, {})
+
+        price_data = self.request(client)
+        prices = price_data.prices[:10]
+        del price_data
+        gc.collect()
+        self.assertEqual(len(client.blocks), 1)
+        self.server.max_bytes = 1
+        self.request(self.clients[1], "EURUSD")
+        client.close()
+        # Slices keep the block mapped after eviction and close
+        self.assertGreater(prices.sum(), 0)
+        del prices
+        gc.collect()
+        self.assertEqual(client.blocks, {})
+        self.assertEqual(client.views, {})
+
+    def test_errors(self):
+        client = self.clients[0]
+        self.assertIsNone(self.request(client, "MISSING"))
+        self.assertEqual(client.get_symbols("FX Majors")[:2], ["EURUSD", "GBPUSD"])
+        self.assertRaises(ValueError, client.call, "launch_mt5")
+        self.assertRaises(RuntimeError, MTDataServer(self.server.loader, address=self.address).start)
+
+    def test_authkey(self):
+        path = authkey_path(self.address)
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+        self.assertEqual(stat.S_IMODE(os.stat(self.address).st_mode), 0o600)
+
+        self.assertRaises(AuthenticationError, self.request, MTDataClient(self.address, authkey=b'wrong'))
+        # The server keeps serving clients with the right key
+        self.assertEqual(self.request(self.clients[0]).symbol, "GBPUSD")
+
+        os.chmod(path, 0o644)
+        self.assertRaises(PermissionError, self.request, MTDataClient(self.address))
+        self.server.close()
+        self.assertFalse(os.path.exists(path))
+        self.assertRaises(FileNotFoundError, self.request, MTDataClient(self.address))
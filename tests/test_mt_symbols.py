@@ -0,0 +1,100 @@
+import unittest
+from collections import namedtuple
+from unittest.mock import patch
+
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_fake import FakeTerminal
+from mt5_dataloader.mt_symbols import SymbolCatalog
+from mt5_dataloader.mt_utils import SymbolCategories
+
+SymbolInfo = namedtuple("SymbolInfo", ["name", "path", "trade_tick_value", "point", "digits", "trade_contract_size"])
+
+SYMBOLS = (
+    SymbolInfo("EURUSD", "Forex\\FX Majors\\EURUSD", 1.0, 0.00001, 5, 100000),
+    SymbolInfo("GBPUSD", "Forex\\FX Majors\\GBPUSD", 1.0, 0.00001, 5, 100000),
+    SymbolInfo("EURGBP", "Forex\\FX Minors\\EURGBP", 1.27, 0.00001, 5, 100000),
+    SymbolInfo("US500", "Indices Spot\\US500", 0.01, 0.01, 2, 1),
+)
+
+
+class TestSymbolCatalog(unittest.TestCase):
+    """
+    Tests for the SymbolCatalog class
+    """
+    @patch("MetaTrader5.symbols_get")
+    def test_single_snapshot(self, mock_symbols):
+        """
+        Tests that repeated lookups are served from one snapshot.
+        """
+        mock_symbols.return_value = SYMBOLS
+        catalog = SymbolCatalog()
+
+        self.assertEqual(catalog.get_symbols(SymbolCategories.FX_MAJORS.value), ["EURUSD", "GBPUSD"])
+        self.assertEqual(catalog.get_symbols("Forex"), ["EURUSD", "GBPUSD", "EURGBP"])
+        self.assertEqual(catalog.symbols_in("Forex\\FX Minors"), ["EURGBP"])
+        self.assertEqual(sorted(catalog.categories()), ["Forex\\FX Majors", "Forex\\FX Minors", "Indices Spot"])
+        self.assertEqual(mock_symbols.call_count, 1)
+
+    @patch("MetaTrader5.symbols_get")
+    def test_ttl_refresh(self, mock_symbols):
+        """
+        Tests that the snapshot is refreshed once expired.
+        """
+        mock_symbols.return_value = SYMBOLS
+        catalog = SymbolCatalog(ttl=0)
+
+        catalog.get_symbols("Forex")
+        catalog.get_symbols("Forex")
+        self.assertEqual(mock_symbols.call_count, 2)
+
+    @patch("MetaTrader5.symbols_get")
+    def test_properties(self, mock_symbols):
+        """
+        Tests batched property lookups.
+        """
+        mock_symbols.return_value = SYMBOLS
+        catalog = SymbolCatalog()
+
+        properties = catalog.properties(["US500", "EURGBP"])
+        self.assertEqual(list(properties.index), ["US500", "EURGBP"])
+        self.assertEqual(properties.at["EURGBP", "trade_tick_value"], 1.27)
+        self.assertEqual(properties.at["US500", "digits"], 2)
+        self.assertRaises(KeyError, lambda: catalog.properties(["XAUUSD"]))
+
+
+class TestLoaderSymbols(unittest.TestCase):
+    """
+    Tests symbol lookups on MTDataLoader
+    """
+    @patch("MetaTrader5.account_info")
+    def setUp(self, mock_account_info):
+        mock_account_info.return_value = True
+        self.mt_dataloader = MTDataLoader()
+        MTDataLoader.symbol_catalog.invalidate()
+
+    def tearDown(self):
+        MTDataLoader.symbol_catalog.invalidate()
+
+    @patch("MetaTrader5.symbols_get")
+    def test_get_symbol_properties(self, mock_symbols):
+        mock_symbols.return_value = SYMBOLS
+
+        self.assertEqual(self.mt_dataloader.get_symbol_properties("GBPUSD"), (1.0, 0.00001))
+        self.assertEqual(self.mt_dataloader.get_symbols(SymbolCategories.INDICES_SPOT.value), ["US500"])
+
+    @patch("MetaTrader5.symbols_get")
+    def test_class_methods(self, mock_symbols):
+        """
+        Tests that symbol lookups still work on the class, using the class-level catalog.
+        """
+        mock_symbols.return_value = SYMBOLS
+        self.assertEqual(MTDataLoader.get_symbols(SymbolCategories.INDICES_SPOT.value), ["US500"])
+        self.assertEqual(len(MTDataLoader.categories()), 3)
+        self.assertEqual(MTDataLoader.get_symbol_properties("GBPUSD"), (1.0, 0.00001))
+        self.assertEqual(mock_symbols.call_count, 1)
+
+        # Instances with their own backend do not use the class-level catalog
+        loader = MTDataLoader(path="fake", backend=FakeTerminal())
+        self.assertEqual(loader.get_symbol_properties("USDJPY"), (1.0, 0.001))
+        self.assertNotIn("USDJPY", MTDataLoader.get_symbols("Forex"))
+        self.assertEqual(mock_symbols.call_count, 1)
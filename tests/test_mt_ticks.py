@@ -0,0 +1,108 @@
+import unittest
+from unittest.mock import patch
+from datetime import datetime as dt
+
+import numpy as np
+
+from mt5_dataloader.mt_dataloader import MTDataLoader
+from mt5_dataloader.mt_ticks import TickData
+from mt5_dataloader.mt_utils import MTResolutions
+from mt5_dataloader.mt_utils import MTRequests
+
+TICKS_DTYPE = [('time', '<i8'), ('bid', '<f8'), ('ask', '<f8'), ('last', '<f8'), ('volume', '<u8'),
+               ('time_msc', '<i8'), ('flags', '<u4'), ('volume_real', '<f8')]
+
+
+def make_ticks(time_msc, bid, ask) -> np.ndarray:
+    ticks = np.zeros(len(time_msc), dtype=TICKS_DTYPE)
+    ticks['time_msc'] = time_msc
+    ticks['time'] = np.asarray(time_msc) // 1000
+    ticks['bid'] = bid
+    ticks['ask'] = ask
+    ticks['flags'] = 6
+    return ticks
+
+
+class TestTickData(unittest.TestCase):
+    """
+    Tests for the TickData class
+    """
+    def test_to_bars(self):
+        """
+        Tests aggregation of ticks into M1 bars.
+        """
+        ticks = make_ticks(
+            time_msc=[0, 10_000, 59_999, 60_000, 61_000, 185_000],
+            bid=[1.0, 3.0, 2.0, 5.0, 4.0, 7.0],
+            ask=[1.2, 3.1, 2.2, 5.3, 4.1, 7.1]
+        )
+        data = TickData.from_ticks("GBPUSD", ticks)
+        price = data.to_bars(MTResolutions.RESOLUTION_M1.value, point=0.1)
+
+        self.assertEqual(list(price.data['open']), [1.0, 5.0, 7.0])
+        self.assertEqual(list(price.data['high']), [3.0, 5.0, 7.0])
+        self.assertEqual(list(price.data['low']), [1.0, 4.0, 7.0])
+        self.assertEqual(list(price.data['close']), [2.0, 4.0, 7.0])
+        self.assertEqual(list(price.data['spread']), [1, 1, 1])
+        self.assertEqual(price.data.index[2], dt(1970, 1, 1, 0, 3))
+
+    def test_compact_dtypes(self):
+        """
+        Tests that tick data is stored as contiguous compact arrays.
+        """
+        ticks = make_ticks([0, 1, 2], [1.0, 1.0, 1.0], [1.1, 1.1, 1.1])
+        data = TickData.from_ticks("GBPUSD", ticks, price_dtype=np.float32)
+
+        self.assertEqual(data.time_msc.dtype, np.int64)
+        self.assertEqual(data.bid.dtype, np.float32)
+        self.assertEqual(data.flags.dtype, np.uint32)
+        self.assertTrue(data.bid.flags['C_CONTIGUOUS'])
+        self.assertEqual(data.nbytes, 3 * (8 + 4 + 4 + 4))
+
+
+class TestTickRequests(unittest.TestCase):
+    """
+    Tests tick requests on MTDataLoader
+    """
+    @patch("MetaTrader5.account_info")
+    def setUp(self, mock_account_info):
+        mock_account_info.return_value = True
+        self.mt_dataloader = MTDataLoader()
+        self.symbol = "GBPUSD"
+
+    def test_invalid_request(self):
+        """
+        Tests that position requests are rejected for ticks.
+        """
+        self.assertRaises(
+            ValueError,
+            lambda: self.mt_dataloader.get_tick_data(symbol=self.symbol, request_type=MTRequests.POSITION)
+        )
+
+    @patch("MetaTrader5.copy_ticks_range")
+    def test_iter_tick_data(self, mock_ticks):
+        """
+        Tests that ticks on window boundaries are yielded exactly once.
+        """
+        # Ticks every 500ms over 10 minutes
+        all_ticks = make_ticks(np.arange(0, 600_000, 500), 1.0, 1.1)
+
+        def ticks(symbol, start_date, end_date, flags):
+            # Inclusive of the whole end second
+            lo = int((start_date - dt(1970, 1, 1)).total_seconds()) * 1000
+            hi = int((end_date - dt(1970, 1, 1)).total_seconds()) * 1000 + 1000
+            return all_ticks[(all_ticks['time_msc'] >= lo) & (all_ticks['time_msc'] < hi)]
+
+        mock_ticks.side_effect = ticks
+
+        chunks = list(self.mt_dataloader.iter_tick_data(
+            symbol=self.symbol,
+            start_date=dt(1970, 1, 1),
+            end_date=dt(1970, 1, 1, 0, 9, 59),
+            chunk=dt(1970, 1, 1, 0, 2) - dt(1970, 1, 1)
+        ))
+        self.assertEqual(len(chunks), 5)
+
+        data = TickData.concat(chunks)
+        self.assertEqual(len(data), len(all_ticks))
+        self.assertTrue(np.all(np.diff(data.time_msc) > 0))